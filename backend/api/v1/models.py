@@ -7,6 +7,9 @@ class WebsiteAnalyzeRequest(BaseModel):
 class SinglePageAnalyzeRequest(BaseModel):
     url: str  # Complete URL of the page to analyze
 
+class BatchAnalyzeRequest(BaseModel):
+    urls: List[str]  # Domains (website target) or page URLs (page target)
+
 class MetaInfo(BaseModel):
     content: str
     content_length: int
@@ -15,18 +18,147 @@ class HeadingInfo(BaseModel):
     content: str
     count: int
 
+class CacheInfo(BaseModel):
+    status: str  # "hit", "miss" or "revalidated"
+    age_seconds: float
+    revalidated_pages: int = 0  # Pages confirmed unchanged via 304
+
+class PageTimingInfo(BaseModel):
+    connect_ms: float  # DNS lookup, TCP connect and TLS; 0 on a reused connection
+    ttfb_ms: float  # Request sent until response headers arrived
+    download_ms: float
+    parse_ms: float
+    extract_ms: float
+    links_ms: float  # Resolving and classifying hrefs
+    bytes_downloaded: int
+    retries: int = 0
+
 class PageAnalysis(BaseModel):
     url: str
     meta_title: MetaInfo
     meta_description: MetaInfo
     external_links: List[str]  # Only external links
     external_domains: List[str]
+    external_domain_counts: Optional[Dict[str, int]] = None  # External links per domain, repeats included
     social_links: List[str]
     headings: Dict[str, List[HeadingInfo]]
     heading_counts: Dict[str, int]
+    cache: Optional[CacheInfo] = None
+    timings: Optional[PageTimingInfo] = None
+
+class CrawlRate(BaseModel):
+    requests_per_second: float  # Rate the politeness scheduler settled on
+    concurrency: int
+    crawl_delay: Optional[float] = None  # From robots.txt, if present
+    throttled_responses: int = 0  # 429/503 responses received
+
+class IncrementalStats(BaseModel):
+    new_pages: int
+    changed_pages: int
+    unchanged_pages: int  # Served from the stored crawl state (304 or same content hash)
+    previous_crawl_at: Optional[float] = None  # Unix timestamp of the previous crawl
+
+class DiscoveryInfo(BaseModel):
+    method: str  # "sitemap" or "links"
+    sitemap_urls: int = 0  # Same-host page URLs listed in the sitemaps
+    sitemaps_read: int = 0
+    head_verified: bool = False  # Sitemap URLs confirmed with HEAD before counting
+
+class TransferStats(BaseModel):
+    bytes_downloaded: int
+    bytes_saved: int = 0  # Declared Content-Length of bodies skipped or cut short
+    skipped_bodies: int = 0  # Non-HTML responses closed after the headers
+    truncated_pages: int = 0  # Bodies cut off at the size cap
+    early_stopped_pages: int = 0  # Head-only reads stopped after </head>
+
+class ClusterInfo(BaseModel):
+    pattern: str  # URL pattern, e.g. /products/{n}/*
+    size: int  # Members seen, fetched or not
+    sampled: int  # Members fetched
+    near_duplicates: int
+    template: bool  # Remaining members are no longer fetched
+
+class DuplicateStats(BaseModel):
+    duplicate_pages: int  # Fetched pages that near-duplicated an earlier one
+    skipped_pages: int  # Template cluster members never fetched
+    clusters: List[ClusterInfo]
+
+class PhaseTiming(BaseModel):
+    total_ms: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+class QueueDepth(BaseModel):
+    max: int
+    mean: float
+
+class CrawlTimings(BaseModel):
+    elapsed_ms: float
+    pages: int
+    requests: int
+    retries: int
+    status_codes: Dict[str, int]  # "error" counts requests that got no response
+    bytes_downloaded: int
+    phases: Dict[str, PhaseTiming]  # connect, ttfb, download, parse, extract, links
+    network_ms: float
+    processing_ms: float
+    bound: str  # "network" or "processing", whichever the pages spent more time in
+    queue_depth: QueueDepth  # Frontier size sampled as workers take URLs
+
+class LinkedPage(BaseModel):
+    url: str
+    inbound_links: int  # Distinct crawled pages linking here
+
+class ExternalDomain(BaseModel):
+    domain: str
+    links: int  # Links to the domain, repeats included
+    pages: int  # Crawled pages linking to it
+
+class LinkGraphStats(BaseModel):
+    pages: int  # Crawled pages in the graph
+    discovered_urls: int  # Internal URLs seen, crawled or not
+    internal_links: int  # Distinct page-to-page links
+    max_depth: int
+    depth_counts: Dict[int, int]  # Clicks from the start page -> crawled pages
+    unreachable_pages: int  # Crawled pages no chain of crawled links leads to
+    orphan_count: int  # Crawled pages with no inbound links from other crawled pages
+    orphan_pages: List[str]
+    most_linked_pages: List[LinkedPage]
+    external_domains: int
+    top_external_domains: List[ExternalDomain]
 
 class WebsiteAnalysis(BaseModel):
     domain: str
     total_pages: int
     analyzed_pages: int
     pages: List[PageAnalysis]
+    crawl_rate: Optional[CrawlRate] = None
+    cache: Optional[CacheInfo] = None
+    incremental: Optional[IncrementalStats] = None
+    discovery: Optional[DiscoveryInfo] = None
+    transfer: Optional[TransferStats] = None
+    duplicates: Optional[DuplicateStats] = None
+    timings: Optional[CrawlTimings] = None
+    link_graph: Optional[LinkGraphStats] = None
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str  # "queued", "running", "completed" or "failed"
+    domain: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempts: int = 0  # Runs started; more than one means the crawl was resumed
+    pages_fetched: int = 0
+    pages_analyzed: int = 0
+    error: Optional[str] = None
+    summary: Optional[Dict] = None  # WebsiteAnalysis fields other than pages, once completed
+
+class JobPages(BaseModel):
+    job_id: str
+    offset: int
+    limit: int
+    total: int  # Pages analyzed so far
+    pages: List[PageAnalysis]
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from api.v1.services.client_pool import ClientPool, ClientPoolSettings
+from api.v1.services.crawler import CrawlSettings
+from api.v1.services.politeness import PolitenessScheduler
+from api.v1.services.website_scraper import WebsiteScraperService
+
+logger = logging.getLogger(__name__)
+
+BATCH_TARGETS = ('website', 'page')
+
+
+@dataclass
+class BatchSettings:
+    """Tunables for analyzing many domains or pages in one run"""
+    target: str = 'website'  # 'website' crawls each domain, 'page' analyzes each URL alone
+    processes: int = field(default_factory=lambda: os.cpu_count() or 1)
+    concurrency: int = 8  # Targets analyzed at once inside each worker process
+    domain_timeout: float = 120.0  # Seconds before one target is abandoned
+    max_pages_to_count: int = 500
+    max_pages_to_analyze: int = 20
+    crawl_settings: CrawlSettings = field(default_factory=lambda: CrawlSettings(max_concurrency=4))
+    log_level: int = logging.WARNING  # Worker processes are quiet unless something goes wrong
+
+
+def read_targets(lines: Iterable[str]) -> List[str]:
+    """Targets from a one-per-line list; blank lines and # comments are skipped, duplicates dropped"""
+    targets = []
+    for line in lines:
+        target = line.strip()
+        if target and not target.startswith('#'):
+            targets.append(target)
+    return list(dict.fromkeys(targets))
+
+
+def completed_targets(path: str) -> Set[str]:
+    """Targets that already have a successful result in an NDJSON output file"""
+    done = set()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short when the previous run was interrupted
+                    continue
+                if record.get('type') == 'result' and record.get('success'):
+                    done.add(record['url'])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+async def _analyze_target(url: str, settings: BatchSettings, client_pool: ClientPool,
+                          scheduler: PolitenessScheduler) -> Dict:
+    started = time.monotonic()
+    record = {'type': 'result', 'url': url}
+    try:
+        scraper = WebsiteScraperService(
+            url,
+            max_pages_to_count=settings.max_pages_to_count,
+            max_pages_to_analyze=settings.max_pages_to_analyze,
+            is_single_page=settings.target == 'page',
+            crawl_settings=settings.crawl_settings,
+            client_pool=client_pool,
+            scheduler=scheduler
+        )
+        data = await asyncio.wait_for(scraper.analyze_website_async(), settings.domain_timeout)
+        if settings.target == 'website' and not data.get('total_pages'):
+            raise Exception(f"No pages could be fetched from {url}")
+        record.update(success=True, data=data)
+    except asyncio.TimeoutError:
+        record.update(success=False, timed_out=True, error=f"Timed out after {settings.domain_timeout:g} seconds")
+    except Exception as e:
+        record.update(success=False, error=str(e))
+    record['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return record
+
+
+async def _analyze_chunk_async(chunk: List[Tuple[int, str]], settings: BatchSettings) -> List[Dict]:
+    client_pool = ClientPool(ClientPoolSettings(per_host_connections=settings.crawl_settings.per_host_concurrency))
+    # Targets on the same host share its robots.txt and rate limit
+    scheduler = PolitenessScheduler()
+    semaphore = asyncio.Semaphore(settings.concurrency)
+
+    async def run(index: int, url: str) -> Dict:
+        async with semaphore:
+            return dict(await _analyze_target(url, settings, client_pool, scheduler), index=index)
+
+    try:
+        return await asyncio.gather(*(run(index, url) for index, url in chunk))
+    finally:
+        await client_pool.aclose()
+
+
+def _init_worker(log_level: int):
+    logging.basicConfig(level=log_level)
+    logging.getLogger().setLevel(log_level)
+
+
+def _analyze_chunk(chunk: List[Tuple[int, str]], settings: BatchSettings) -> List[Dict]:
+    """Process pool entry point: one event loop analyzing a chunk of targets concurrently"""
+    return asyncio.run(_analyze_chunk_async(chunk, settings))
+
+
+def _failed_chunk(chunk: List[Tuple[int, str]], error: str) -> List[Dict]:
+    return [{'type': 'result', 'index': index, 'url': url, 'success': False, 'error': error} for index, url in chunk]
+
+
+class BatchRunner:
+    """
+    Analyzes many targets across a process pool, each worker running its own
+    event loop and client pool. Results stream back as they finish. A failing
+    or timed-out target only affects its own record; if a worker process
+    dies, the chunks that were still running are retried once on a new pool.
+    """
+
+    def __init__(self, targets: List[str], settings: Optional[BatchSettings] = None,
+                 skip: Optional[Set[str]] = None):
+        self.settings = settings or BatchSettings()
+        if self.settings.target not in BATCH_TARGETS:
+            raise ValueError(f"Unknown batch target: {self.settings.target}")
+        skip = skip or set()
+        self.targets = [(index, url) for index, url in enumerate(targets) if url not in skip]
+        self.skipped = len(targets) - len(self.targets)
+        self.stats = {
+            'targets': len(targets),
+            'skipped': self.skipped,  # Already completed by a previous run
+            'succeeded': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'pages_counted': 0,
+            'pages_analyzed': 0
+        }
+
+    def _chunks(self) -> List[List[Tuple[int, str]]]:
+        # Chunks of one worker's concurrency keep every process busy without long stragglers
+        size = max(1, self.settings.concurrency)
+        return [self.targets[i:i + size] for i in range(0, len(self.targets), size)]
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=max(1, self.settings.processes),
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.settings.log_level,)
+        )
+
+    def _count(self, record: Dict):
+        if record['success']:
+            self.stats['succeeded'] += 1
+            data = record['data']
+            if self.settings.target == 'page':
+                self.stats['pages_counted'] += 1
+                self.stats['pages_analyzed'] += 1
+            else:
+                self.stats['pages_counted'] += data.get('total_pages', 0)
+                self.stats['pages_analyzed'] += data.get('analyzed_pages', 0)
+        else:
+            self.stats['failed'] += 1
+            if record.get('timed_out'):
+                self.stats['timed_out'] += 1
+
+    def summary(self, elapsed: float) -> Dict:
+        completed = self.stats['succeeded'] + self.stats['failed']
+        return dict(
+            self.stats,
+            type='summary',
+            completed=completed,
+            processes=self.settings.processes,
+            elapsed_seconds=round(elapsed, 3),
+            targets_per_second=round(completed / elapsed, 3) if elapsed else 0.0,
+            pages_per_second=round(self.stats['pages_analyzed'] / elapsed, 3) if elapsed else 0.0
+        )
+
+    async def iter_results(self) -> AsyncIterator[Dict]:
+        """Yield one 'result' record per target as it completes, then a 'summary' record"""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        # (chunk, attempts so far); a chunk is retried once if its worker process dies
+        pending_chunks = [(chunk, 0) for chunk in self._chunks()]
+        while pending_chunks:
+            pool = self._new_pool()
+            futures = {
+                loop.run_in_executor(pool, _analyze_chunk, chunk, self.settings): (chunk, attempts)
+                for chunk, attempts in pending_chunks
+            }
+            pending_chunks = []
+            try:
+                waiting = set(futures)
+                while waiting:
+                    done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        chunk, attempts = futures[future]
+                        try:
+                            records = future.result()
+                        except BrokenProcessPool:
+                            # Every unfinished chunk fails with the pool; rerun them on a fresh one
+                            if attempts < 1:
+                                pending_chunks.append((chunk, attempts + 1))
+                                continue
+                            records = _failed_chunk(chunk, "Worker process crashed")
+                        except Exception as e:
+                            records = _failed_chunk(chunk, f"Worker error: {str(e)}")
+                        for record in records:
+                            self._count(record)
+                            yield record
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+            if pending_chunks:
+                logger.warning(f"Batch worker process crashed; retrying {len(pending_chunks)} chunks")
+        yield self.summary(time.monotonic() - started)
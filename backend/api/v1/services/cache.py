@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheSettings:
+    """Result cache tunables"""
+    result_ttl: float = 300.0  # Seconds a cached analysis is served without recrawling
+    max_age: float = 7 * 24 * 3600.0  # Seconds any entry is kept for revalidation
+    max_entries: int = 1024  # In-memory LRU size
+    sqlite_path: Optional[str] = None  # Optional on-disk tier
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+
+class MemoryCache:
+    """LRU cache bounded by entry count and age"""
+
+    def __init__(self, max_entries: int, max_age: float):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.age > self.max_age:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache tier; values are stored as JSON"""
+
+    def __init__(self, path: str, max_age: float):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM cache WHERE stored_at < ?", (time.time() - max_age,))
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute("SELECT stored_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        entry = CacheEntry(json.loads(row[1]), row[0])
+        if entry.age > self.max_age:
+            return None
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, stored_at, value) VALUES (?, ?, ?)",
+                (key, entry.stored_at, json.dumps(entry.value))
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for analysis results and per-page revalidation data.
+    Whole results are keyed on the normalized URL, crawl limits and the
+    settings that shape the output; page entries keep ETag/Last-Modified so
+    stale pages can be revalidated with 304s. The memory tier is used on the
+    event loop; SQLite reads and commits run in a worker thread.
+    """
+
+    def __init__(self, settings: Optional[CacheSettings] = None):
+        self.settings = settings or CacheSettings()
+        self.memory = MemoryCache(self.settings.max_entries, self.settings.max_age)
+        self.disk = SQLiteCache(self.settings.sqlite_path, self.settings.max_age) if self.settings.sqlite_path else None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def settings_key(*settings: Any) -> str:
+        """Short fingerprint of the settings a cached value depends on"""
+        return hashlib.blake2b(repr(settings).encode('utf-8'), digest_size=8).hexdigest()
+
+    @staticmethod
+    def result_key(normalized_url: str, is_single_page: bool, max_pages_to_count: int, max_pages_to_analyze: int,
+                   settings_key: str = '') -> str:
+        if is_single_page:
+            return f"page-result:{settings_key}:{normalized_url}"
+        return f"site-result:{settings_key}:{normalized_url}:{max_pages_to_count}:{max_pages_to_analyze}"
+
+    @staticmethod
+    def page_key(normalized_url: str, settings_key: str = '') -> str:
+        return f"page:{settings_key}:{normalized_url}"
+
+    async def _get(self, key: str) -> Optional[CacheEntry]:
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                # Promote disk hits into the memory tier
+                self.memory.set(key, entry)
+        return entry
+
+    async def _set(self, key: str, value: Any):
+        entry = CacheEntry(value, time.time())
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, entry)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.warning(f"Failed to write cache entry {key} to disk: {str(e)}")
+
+    async def get_result(self, key: str) -> Optional[CacheEntry]:
+        """Return a fresh cached result, or None if missing or older than result_ttl"""
+        entry = await self._get(key)
+        if entry is None or entry.age > self.settings.result_ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def set_result(self, key: str, result: Dict):
+        await self._set(key, result)
+
+    async def get_page(self, normalized_url: str, settings_key: str = '') -> Optional[Dict]:
+        entry = await self._get(self.page_key(normalized_url, settings_key))
+        return entry.value if entry else None
+
+    async def set_page(self, normalized_url: str, page_entry: Dict, settings_key: str = ''):
+        await self._set(self.page_key(normalized_url, settings_key), page_entry)
+
+    def stats(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_entries': len(self.memory),
+            'disk': self.disk.path if self.disk else None
+        }
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+_shared_cache: Optional[AnalysisCache] = None
+
+
+def get_shared_analysis_cache() -> AnalysisCache:
+    """Process-wide cache used by the API; ANALYSIS_CACHE_DB enables the SQLite tier"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = AnalysisCache(CacheSettings(sqlite_path=os.environ.get('ANALYSIS_CACHE_DB')))
+    return _shared_cache
+
+
+def close_shared_analysis_cache():
+    global _shared_cache
+    if _shared_cache is not None:
+        _shared_cache.close()
+        _shared_cache = None
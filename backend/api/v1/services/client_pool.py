@@ -0,0 +1,304 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import ssl
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 support is optional (needs the `h2` package)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# Highest per_host_concurrency the API accepts; the shared pool allows that many connections per host
+MAX_PER_HOST_CONNECTIONS = 16
+
+
+@dataclass
+class ClientPoolSettings:
+    """Connection pool tunables shared by every crawl using the pool"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    per_host_connections: int = MAX_PER_HOST_CONNECTIONS
+    http2: bool = False
+    dns_ttl: float = 300.0
+    dns_cache_size: int = 1024
+
+
+class DNSCache:
+    """TTL- and size-bounded cache of resolved addresses, shared by all connections"""
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, List[str]]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+
+    async def resolve(self, host: str, port: int, timeout: Optional[float] = None) -> List[str]:
+        """Return the addresses for host, resolving at most once per TTL; the lookup is bounded by timeout"""
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        # Concurrent lookups for the same host share one resolution
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The caller that started the lookup was cancelled, not this one; look it up again
+                return await self.resolve(host, port, timeout)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            infos = await asyncio.wait_for(
+                asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout
+            )
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            self._entries[key] = (time.monotonic() + self.ttl, addresses)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            future.set_result(addresses)
+            return addresses
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            # Cancelled mid-lookup (e.g. a client disconnected): release anyone waiting on it
+            if not future.done():
+                future.cancel()
+            del self._pending[key]
+
+    def stats(self) -> Dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore network backend that resolves hosts through the DNSCache.
+    TLS still uses the original hostname for SNI and certificate checks,
+    since httpcore starts TLS on the stream after connect_tcp returns.
+    """
+
+    def __init__(self, dns_cache: DNSCache):
+        self.dns_cache = dns_cache
+        self.connections_opened = 0
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if _is_ip_address(host):
+            addresses = [host]
+        else:
+            try:
+                addresses = await self.dns_cache.resolve(host, port, timeout)
+            except asyncio.TimeoutError:
+                raise httpcore.ConnectTimeout(f"Timed out resolving {host}")
+            except OSError as e:
+                raise httpcore.ConnectError(f"Could not resolve {host}: {str(e)}")
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                stream = await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+                self.connections_opened += 1
+                return stream
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        raise last_error or httpcore.ConnectError(f"No addresses found for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that frees the per-host connection slot once closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+@lru_cache(maxsize=None)
+def _ssl_context() -> ssl.SSLContext:
+    """Default verifying SSL context; loading the CA bundle takes tens of ms, so pools share one"""
+    return httpx.create_ssl_context()
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """Keep-alive transport with a DNS cache, per-host connection limits and reuse metrics"""
+
+    def __init__(self, settings: ClientPoolSettings, dns_cache: DNSCache):
+        limits = httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+        super().__init__(verify=_ssl_context(), limits=limits, http2=settings.http2)
+        self.network_backend = CachingNetworkBackend(dns_cache)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=settings.http2,
+            network_backend=self.network_backend,
+        )
+        self.per_host_connections = settings.per_host_connections
+        self.requests = 0
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._known_streams: "weakref.WeakSet" = weakref.WeakSet()
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_connections)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._host_semaphore(request.url.host)
+        await semaphore.acquire()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        self.requests += 1
+        stream = response.extensions.get('network_stream')
+        if stream is not None:
+            if stream in self._known_streams:
+                self.pool_hits += 1
+            else:
+                self.pool_misses += 1
+                self._known_streams.add(stream)
+
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+
+class ClientPool:
+    """
+    Application-level HTTP client shared across WebsiteScraperService instances,
+    so repeat domains skip DNS lookups and TCP/TLS handshakes.
+    """
+
+    def __init__(self, settings: Optional[ClientPoolSettings] = None):
+        self.settings = settings or ClientPoolSettings()
+        if self.settings.http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            self.settings.http2 = False
+        self.dns_cache = DNSCache(self.settings.dns_ttl, self.settings.dns_cache_size)
+        self._transport: Optional[PooledTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._transport = PooledTransport(self.settings, self.dns_cache)
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                transport=self._transport,
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._transport = None
+
+    def metrics(self) -> Dict:
+        transport = self._transport
+        return {
+            'requests': transport.requests if transport else 0,
+            'pool_hits': transport.pool_hits if transport else 0,
+            'pool_misses': transport.pool_misses if transport else 0,
+            'connections_opened': transport.network_backend.connections_opened if transport else 0,
+            'dns_cache': self.dns_cache.stats(),
+            'http2': self.settings.http2
+        }
+
+
+_shared_pool: Optional[ClientPool] = None
+
+
+def get_shared_client_pool() -> ClientPool:
+    """Process-wide pool used by the API; created on first use"""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = ClientPool()
+    return _shared_pool
+
+
+async def close_shared_client_pool():
+    global _shared_pool
+    if _shared_pool is not None:
+        await _shared_pool.aclose()
+        _shared_pool = None
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = os.path.join(tempfile.gettempdir(), 'website-analyzer-state')
+
+
+def content_hasher():
+    """Hash object for building a content_hash from text chunks as they are downloaded"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_hash(text: str) -> str:
+    """Stable fingerprint of a page body, used to spot unchanged pages without validators"""
+    hasher = content_hasher()
+    hasher.update(text.encode('utf-8', errors='replace'))
+    return hasher.hexdigest()
+
+
+class CrawlState:
+    """
+    What the previous crawl of a domain learned: visited URLs and, per page,
+    validators, content hash, links and the PageAnalysis dict.
+    """
+
+    def __init__(self, domain: str, pages: Optional[Dict[str, Dict]] = None,
+                 visited: Optional[List[str]] = None, crawled_at: Optional[float] = None):
+        self.domain = domain
+        self.pages: Dict[str, Dict] = pages or {}
+        self.visited: List[str] = visited or []
+        self.crawled_at = crawled_at
+        self._visited_this_run: Dict[str, None] = {}
+        self.new_pages = 0
+        self.changed_pages = 0
+        self.unchanged_pages = 0
+
+    def known_page(self, normalized_url: str) -> Optional[Dict]:
+        return self.pages.get(normalized_url)
+
+    def record_page(self, normalized_url: str, entry: Dict, unchanged: bool):
+        """Store what this run learned about a page and count it as new, changed or unchanged"""
+        previous = self.pages.get(normalized_url)
+        if previous is None:
+            self.new_pages += 1
+        elif unchanged:
+            self.unchanged_pages += 1
+            # Pages fetched but not analyzed this run keep their earlier analysis
+            if entry.get('analysis') is None:
+                entry['analysis'] = previous.get('analysis')
+        else:
+            self.changed_pages += 1
+        self.pages[normalized_url] = entry
+        self._visited_this_run[normalized_url] = None
+
+    def finish_run(self):
+        self.visited = list(self._visited_this_run)
+        self.crawled_at = time.time()
+
+    def stats(self, previous_crawl_at: Optional[float]) -> Dict:
+        return {
+            'new_pages': self.new_pages,
+            'changed_pages': self.changed_pages,
+            'unchanged_pages': self.unchanged_pages,
+            'previous_crawl_at': previous_crawl_at
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'domain': self.domain,
+            'crawled_at': self.crawled_at,
+            'visited': self.visited,
+            'pages': self.pages
+        }
+
+
+class CrawlStateStore:
+    """Persists one JSON state file per domain"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.environ.get('CRAWL_STATE_DIR', DEFAULT_STATE_DIR)
+
+    def _path(self, domain: str) -> str:
+        safe_name = re.sub(r'[^A-Za-z0-9._-]', '_', domain)
+        return os.path.join(self.directory, f'{safe_name}.json')
+
+    def load(self, domain: str) -> CrawlState:
+        path = self._path(domain)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return CrawlState(domain)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable crawl state {path}: {str(e)}")
+            return CrawlState(domain)
+        return CrawlState(domain, data.get('pages'), data.get('visited'), data.get('crawled_at'))
+
+    def save(self, state: CrawlState):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(state.domain)
+        # Write to a temp file first so an interrupted save never corrupts the state
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state.to_dict(), f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,692 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+from api.v1.services.client_pool import ClientPool, ClientPoolSettings
+from api.v1.services.crawl_state import content_hasher
+from api.v1.services.dedup import DuplicateDetector
+from api.v1.services.extraction import ExtractedPage
+from api.v1.services.frontier import FingerprintSet, Frontier, FrontierEntry, url_fingerprint
+from api.v1.services.link_graph import LinkGraph
+from api.v1.services.links import LinkSettings, PageLinks
+from api.v1.services.metrics import CrawlMetrics, PageTimings
+from api.v1.services.parse_stage import ParseJob, ParseStage, decode_body
+from api.v1.services.sitemap import SitemapDiscovery
+from api.v1.services.politeness import HostThrottle, PolitenessScheduler, PolitenessSettings, parse_retry_after, THROTTLE_STATUSES
+
+if TYPE_CHECKING:
+    from api.v1.services.website_scraper import WebsiteScraperService
+
+logger = logging.getLogger(__name__)
+
+# httpx logs every request at INFO; keep crawl logs readable
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# HTTP status codes to retry on, with exponential backoff
+RETRY_STATUSES = {500, 502, 503, 504}
+
+# Responses worth retrying once the host's Retry-After / backoff has passed
+RETRYABLE_STATUSES = RETRY_STATUSES | THROTTLE_STATUSES
+
+
+@dataclass
+class CrawlSettings:
+    """Tunables for the async crawl engine"""
+    max_concurrency: int = 10  # Worker pool size for a single crawl
+    per_host_concurrency: int = 4  # Simultaneous requests to any one host
+    request_timeout: float = 15.0  # Increased timeout for e-commerce pages
+    max_retries: int = 2
+    max_throttle_retries: int = 3  # Extra patience for 429/503 with Retry-After
+    backoff_factor: float = 0.3
+    politeness: PolitenessSettings = field(default_factory=PolitenessSettings)
+    links: LinkSettings = field(default_factory=LinkSettings)  # Social and excluded hosts, excluded file types
+    use_sitemaps: bool = True  # Seed and count pages from sitemaps when the site has them
+    verify_sitemap_urls: bool = False  # HEAD each sitemap URL before counting it
+    max_sitemaps: int = 50
+    frontier_order: str = 'bfs'  # 'bfs' (reproducible, level by level) or 'priority' (sitemap priority)
+    visited_memory_limit: int = 1_000_000  # Visited fingerprints kept in memory before spilling
+    visited_spill_dir: Optional[str] = None  # Spill directory; None keeps everything in memory
+    extraction_engine: str = 'lxml'  # 'lxml' (single pass over parser events) or 'bs4' (BeautifulSoup tree)
+    stream_responses: bool = True  # Check headers before downloading and parse bodies as they arrive
+    max_body_bytes: int = 5 * 1024 * 1024  # Stop reading a response body after this many bytes
+    # Only title and meta description; stop reading after </head>. No links are followed, so a
+    # website crawl only reaches the start page and its sitemap URLs (use_sitemaps)
+    head_only: bool = False
+    detect_duplicates: bool = True  # Skip near-duplicate pages and sample templated URL clusters
+    near_duplicate_threshold: float = 0.9  # Estimated content similarity that counts as a duplicate
+    cluster_sample_size: int = 3  # Members fetched before a URL cluster can be declared a template
+    record_timings: bool = False  # Add per-page and per-crawl 'timings' sections to the results
+    build_link_graph: bool = True  # Add a site-wide 'link_graph' section: inbound links, orphans, depth, domains
+    link_graph_top: int = 20  # Entries in each of the link graph's top lists
+    parse_mode: str = 'inline'  # 'inline', 'process' (parse pool of worker processes) or 'thread' (free-threaded builds)
+    parse_workers: Optional[int] = None  # Parse pool size; None uses every core
+
+
+@dataclass
+class FetchedPage:
+    """A page that has been downloaded once and parsed at most once"""
+    url: str
+    final_url: str
+    status_code: int
+    content_type: str
+    text: str
+    extracted: Optional[ExtractedPage] = field(default=None, repr=False)
+    links: List[str] = field(default_factory=list, repr=False)
+    # The same links classified, when they were resolved from this page's markup
+    classified_links: Optional[PageLinks] = field(default=None, repr=False)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Set when a conditional request came back 304 and the cached analysis is reused
+    not_modified: bool = False
+    cached_analysis: Optional[Dict] = field(default=None, repr=False)
+    # Incremental mode: body hash, and whether it matched the previous crawl
+    content_hash: Optional[str] = None
+    unchanged: bool = False
+    # Streaming: body cut off at max_body_bytes
+    truncated: bool = False
+    # Parse stage: the undecoded body, until a parse worker has extracted it
+    body: Optional[bytes] = field(default=None, repr=False)
+    encoding: Optional[str] = None
+    timings: PageTimings = field(default_factory=PageTimings, repr=False)
+
+    @property
+    def is_html(self) -> bool:
+        return any(t in self.content_type for t in HTML_CONTENT_TYPES)
+
+    @property
+    def is_markup(self) -> bool:
+        return self.is_html or 'xml' in self.content_type
+
+
+class CrawlCheckpoint(ABC):
+    """
+    Durable record of a crawl's finished pages, so an interrupted crawl can
+    resume. The engine records each fetched page with its same-host links;
+    on resume those pages are replayed through the frontier instead of
+    being fetched again, which restores the frontier and counters exactly.
+    """
+
+    @abstractmethod
+    def completed_page(self, url: str) -> Optional[Dict]:
+        """{'links', 'analysis', 'external_domains'} for a page finished by an earlier run, else None"""
+
+    @abstractmethod
+    async def record_page(self, entry: FrontierEntry, links: List[str], page_analysis: Optional[Dict],
+                          external_domains: Optional[Dict[str, int]] = None):
+        """Durably record a fetched page before its results are reported"""
+
+
+class AsyncCrawlEngine:
+    """
+    Concurrent crawler: a bounded pool of workers pulls URLs from the frontier,
+    fetches them with httpx and hands parsing and analysis to the scraper.
+    """
+
+    def __init__(self, scraper: 'WebsiteScraperService', settings: Optional[CrawlSettings] = None,
+                 checkpoint: Optional['CrawlCheckpoint'] = None):
+        self.scraper = scraper
+        self.settings = settings or CrawlSettings()
+        self.checkpoint = checkpoint
+        # A shared scheduler keeps robots.txt and each host's learned rate between crawls
+        self.scheduler = scraper.scheduler or PolitenessScheduler(
+            self.settings.politeness,
+            per_host_concurrency=self.settings.per_host_concurrency
+        )
+        self.revalidated_pages = 0
+        self.sitemaps_read = 0
+        self.metrics = CrawlMetrics()
+        self.parse_stage = None
+        if self.settings.parse_mode != 'inline':
+            self.parse_stage = ParseStage(self.settings.parse_mode, self.settings.parse_workers)
+        self.transfer = {
+            'bytes_downloaded': 0,
+            'bytes_saved': 0,  # Declared Content-Length never downloaded
+            'skipped_bodies': 0,  # Non-markup responses closed after the headers
+            'truncated_pages': 0,
+            'early_stopped_pages': 0
+        }
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Borrow the scraper's shared client pool, or use a private one for this crawl"""
+        if self.scraper.client_pool is not None:
+            yield self.scraper.client_pool.client
+            return
+        pool = ClientPool(ClientPoolSettings(
+            max_connections=self.settings.max_concurrency,
+            max_keepalive_connections=self.settings.max_concurrency,
+            per_host_connections=self.settings.per_host_concurrency,
+        ))
+        try:
+            yield pool.client
+        finally:
+            await pool.aclose()
+
+    async def _throttle_for(self, client: httpx.AsyncClient, url: str) -> HostThrottle:
+        return await self.scheduler.throttle_for(client, url, self.settings.politeness,
+                                                 self.settings.per_host_concurrency)
+
+    async def _make_request(self, client: httpx.AsyncClient, url: str,
+                            headers: Optional[Dict[str, str]] = None, method: str = 'GET',
+                            log_errors: bool = True, stream: bool = False,
+                            timings: Optional[PageTimings] = None) -> Optional[httpx.Response]:
+        """
+        Make a politely scheduled request with retries and error handling.
+        With stream=True only the headers have been read; the caller reads
+        the body and must close the response. Connection and first-byte
+        times are added to `timings` when given.
+        """
+        # Optional lookups (e.g. a missing sitemap.xml) shouldn't be logged as errors
+        log = logger.error if log_errors else logger.debug
+        attempt = 0
+        while True:
+            throttle = await self._throttle_for(client, url)
+            await throttle.acquire()
+            started = time.monotonic()
+            status_code = None
+            retry_after = None
+            abandoned = False
+            try:
+                request = client.build_request(
+                    method, url, headers=headers, timeout=self.settings.request_timeout,
+                    extensions={'trace': timings.trace} if timings is not None else None
+                )
+                response = await client.send(request, stream=stream)
+                status_code = response.status_code
+                retry_after = parse_retry_after(response.headers.get('retry-after'))
+
+                max_attempts = (self.settings.max_throttle_retries if status_code in THROTTLE_STATUSES
+                                else self.settings.max_retries)
+                if status_code in RETRYABLE_STATUSES and attempt < max_attempts:
+                    attempt += 1
+                    self.metrics.record_retry()
+                    if timings is not None:
+                        timings.retries += 1
+                    await response.aclose()
+                    if retry_after is None:
+                        await asyncio.sleep(self.settings.backoff_factor * (2 ** (attempt - 1)))
+                    continue
+
+                # Handle common e-commerce platform redirects
+                if response.history:
+                    final_url = str(response.url)
+                    if final_url != url:
+                        logger.info(f"Redirected from {url} to {final_url}")
+
+                # Conditional request answered from our cached copy
+                if response.status_code == 304 and headers:
+                    return response
+
+                if not response.is_success:
+                    await response.aclose()
+                response.raise_for_status()
+                return response
+
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                if status_code == 404:
+                    log(f"Page not found (404): {url}")
+                elif status_code == 403:
+                    log(f"Access forbidden (403) - Website may be blocking automated access: {url}")
+                elif status_code == 429:
+                    log(f"Too many requests (429) - Rate limited by the website: {url}")
+                else:
+                    log(f"HTTP error {status_code} requesting {url}: {str(e)}")
+                return None
+
+            except httpx.TimeoutException:
+                log(f"Request timed out for {url}")
+                return None
+
+            except httpx.TooManyRedirects:
+                log(f"Too many redirects for {url}")
+                return None
+
+            except httpx.HTTPError as e:
+                log(f"Error requesting {url}: {str(e)}")
+                return None
+
+            except asyncio.CancelledError:
+                # A cancelled request says nothing about the host; other crawls share its rate
+                abandoned = True
+                raise
+
+            finally:
+                if abandoned:
+                    throttle.release_slot()
+                else:
+                    throttle.release(status_code, time.monotonic() - started, retry_after)
+                    self.metrics.record_response(status_code)
+
+    async def fetch_page(self, client: httpx.AsyncClient, url: str) -> Optional[FetchedPage]:
+        """Download a page once; parsing happens separately off the event loop"""
+        # Revalidate a previously analyzed copy instead of downloading it again
+        cached = await self.scraper._cached_page(url)
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        stream = self.settings.stream_responses
+        timings = PageTimings()
+        response = await self._make_request(client, url, headers or None, stream=stream, timings=timings)
+        if response is None:
+            return None
+
+        if response.status_code == 304 and cached:
+            if stream:
+                await response.aclose()
+            self.revalidated_pages += 1
+            return FetchedPage(
+                url=url,
+                final_url=str(response.url),
+                status_code=response.status_code,
+                content_type=cached['content_type'],
+                text='',
+                links=list(cached['links']),
+                etag=cached.get('etag'),
+                last_modified=cached.get('last_modified'),
+                content_hash=cached.get('content_hash'),
+                not_modified=True,
+                cached_analysis=cached['analysis'],
+                timings=timings,
+            )
+
+        page = FetchedPage(
+            url=url,
+            final_url=str(response.url),
+            status_code=response.status_code,
+            content_type=response.headers.get('content-type', '').lower(),
+            text='',
+            etag=response.headers.get('etag'),
+            last_modified=response.headers.get('last-modified'),
+            timings=timings,
+        )
+        if not stream:
+            if self._uses_parse_stage(page):
+                page.body, page.encoding = response.content, response.encoding
+            else:
+                page.text = response.text
+            self._record_download(response, page)
+            return page
+
+        try:
+            await self._read_body(response, page)
+        except httpx.HTTPError as e:
+            logger.error(f"Error reading response body for {url}: {str(e)}")
+            return None
+        finally:
+            await response.aclose()
+            self._record_download(response, page)
+        return page
+
+    def _record_download(self, response: httpx.Response, page: FetchedPage):
+        timings = page.timings
+        if timings.headers_received is not None:
+            # Body read time, less any parsing done while the body streamed in
+            elapsed = time.perf_counter() - timings.headers_received
+            timings.add('download', max(0.0, elapsed - timings.phases['parse']))
+        timings.bytes_downloaded = response.num_bytes_downloaded
+        self.transfer['bytes_downloaded'] += response.num_bytes_downloaded
+
+    def _uses_parse_stage(self, page: FetchedPage) -> bool:
+        # Head-only reads stop after </head>, which needs the extractor on the fetch path
+        return self.parse_stage is not None and page.is_markup and not self.settings.head_only
+
+    async def _read_body(self, response: httpx.Response, page: FetchedPage):
+        """
+        Read a streamed body into the page. Non-markup bodies are never read;
+        HTML is decoded and fed to the extractor chunk by chunk, so the full
+        text is only kept when the page needs it. With a parse stage the raw
+        bytes are kept for the parse workers instead. Reading stops at
+        max_body_bytes or once the extractor has everything it needs.
+        """
+        try:
+            declared_length = int(response.headers.get('content-length', ''))
+        except ValueError:
+            declared_length = None
+
+        # Images, PDFs etc. are counted but never parsed
+        if not page.is_markup:
+            self.transfer['skipped_bodies'] += 1
+            self.transfer['bytes_saved'] += declared_length or 0
+            return
+
+        raw = self._uses_parse_stage(page)
+        extractor = None if raw else self.scraper._incremental_extractor(page)
+        # Parse workers hash the decoded body themselves
+        hasher = content_hasher() if self.scraper.crawl_state is not None and not raw else None
+        chunks: List = []
+        stopped_early = False
+        async for chunk in (response.aiter_bytes() if raw else response.aiter_text()):
+            if hasher is not None:
+                hasher.update(chunk.encode('utf-8', errors='replace'))
+            if extractor is not None:
+                with page.timings.phase('parse'):
+                    extractor.feed(chunk)
+            else:
+                chunks.append(chunk)
+            if extractor is not None and extractor.done:
+                self.transfer['early_stopped_pages'] += 1
+                stopped_early = True
+                break
+            if response.num_bytes_downloaded >= self.settings.max_body_bytes:
+                logger.warning(f"Response body for {page.url} exceeds {self.settings.max_body_bytes} bytes; truncating")
+                self.transfer['truncated_pages'] += 1
+                page.truncated = stopped_early = True
+                break
+
+        if stopped_early and declared_length:
+            self.transfer['bytes_saved'] += max(0, declared_length - response.num_bytes_downloaded)
+        if hasher is not None:
+            page.content_hash = hasher.hexdigest()
+        if raw:
+            page.body, page.encoding = b''.join(chunks), response.encoding
+        elif extractor is not None:
+            with page.timings.phase('parse'):
+                page.extracted = extractor.close()
+        else:
+            page.text = ''.join(chunks)
+
+    async def _parse_in_stage(self, page: FetchedPage):
+        """Extract a raw body in the parse pool; on failure the page is decoded for parsing here"""
+        body, page.body = page.body, None
+        parsed = await self.parse_stage.parse(ParseJob(
+            url=page.url,
+            body=body,
+            encoding=page.encoding,
+            content_type=page.content_type,
+            engine=self.settings.extraction_engine,
+            sketch=self.scraper._sketch_pages,
+            hash_content=self.scraper.crawl_state is not None
+        ))
+        if parsed is None:
+            page.text = decode_body(body, page.encoding)
+            return
+        page.extracted = parsed.extracted
+        page.content_hash = parsed.content_hash
+        page.timings.add('parse', parsed.parse_seconds)
+        page.timings.add('extract', parsed.extract_seconds)
+
+    async def _process_page(self, page: FetchedPage, analyze: bool) -> Optional[Dict]:
+        """Parse (and optionally analyze) a page in a worker thread so the event loop stays free"""
+        if page.body is not None:
+            await self._parse_in_stage(page)
+        if page.not_modified:
+            page_analysis = self.scraper._process_page(page, analyze)
+        else:
+            page_analysis = await asyncio.to_thread(self.scraper._process_page, page, analyze)
+        await self.scraper._remember_page(page, page_analysis)
+        self.metrics.record_page(page.timings)
+        # Attached after the page is remembered, so cached analyses never carry stale timings
+        if page_analysis is not None and self.settings.record_timings:
+            page_analysis = dict(page_analysis, timings=page.timings.as_dict())
+        return page_analysis
+
+    async def analyze_single_page(self, url: str) -> Optional[Dict]:
+        async with self._client() as client:
+            page = await self.fetch_page(client, url)
+            if page is None:
+                return None
+            return await self._process_page(page, True)
+
+    async def _fetch_sitemap(self, client: httpx.AsyncClient, url: str) -> Optional[bytes]:
+        """A sitemap body, read no further than max_body_bytes"""
+        response = await self._make_request(client, url, log_errors=False, stream=True)
+        if response is None:
+            return None
+        chunks: List[bytes] = []
+        try:
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                if response.num_bytes_downloaded >= self.settings.max_body_bytes:
+                    logger.warning(f"Sitemap {url} exceeds {self.settings.max_body_bytes} bytes; truncating")
+                    break
+        finally:
+            await response.aclose()
+        return b''.join(chunks)[:self.settings.max_body_bytes]
+
+    async def _discover_sitemap_pages(self, client: httpx.AsyncClient) -> List[Dict]:
+        """Page URLs listed in the site's sitemaps (robots.txt entries or /sitemap.xml)"""
+        scraper = self.scraper
+        # Loads robots.txt for the host, which is where Sitemap: entries live
+        await self._throttle_for(client, scraper.domain)
+        discovery = SitemapDiscovery(
+            scraper,
+            lambda url: self._fetch_sitemap(client, url),
+            max_urls=scraper.max_pages_to_count,
+            max_sitemaps=self.settings.max_sitemaps,
+            max_bytes=self.settings.max_body_bytes
+        )
+        entries = await discovery.discover(self.scheduler.sitemaps_for(scraper.base_domain))
+        self.sitemaps_read = discovery.sitemaps_read
+        return entries
+
+    async def _verify_exists(self, client: httpx.AsyncClient, url: str) -> bool:
+        """Cheap existence check for counting: HEAD instead of GET"""
+        response = await self._make_request(client, url, method='HEAD', log_errors=False)
+        return response is not None
+
+    async def iter_crawl(self) -> AsyncIterator[Dict]:
+        """
+        Crawl the scraper's domain with a bounded worker pool, yielding
+        {'type': 'page', 'page': ...} records as pages are analyzed and a
+        final {'type': 'summary', ...} record. Analyses are not accumulated.
+        """
+        records = self._crawl_records()
+        try:
+            async for entry, record in records:
+                yield record if entry is None else {'type': 'page', 'sequence': entry.sequence, 'page': record}
+        finally:
+            await records.aclose()
+
+    async def _crawl_records(self) -> AsyncIterator[Tuple[Optional[FrontierEntry], Dict]]:
+        """(frontier entry, page analysis) pairs as pages are analyzed, then (None, summary record)"""
+        scraper = self.scraper
+        frontier = Frontier(
+            self.settings.frontier_order,
+            FingerprintSet(self.settings.visited_spill_dir, self.settings.visited_memory_limit)
+        )
+        # Bounded so a slow consumer applies backpressure to the workers
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.settings.max_concurrency * 2)
+        state = {'claimed_pages': 0, 'total_pages': 0, 'claimed_analyses': 0, 'analyzed_pages': 0,
+                 'duplicate_pages': 0}
+        # Pages known to exist; with a sitemap most are counted without being downloaded
+        counted = FingerprintSet(self.settings.visited_spill_dir, self.settings.visited_memory_limit)
+        discovery = {'method': 'links', 'sitemap_urls': 0, 'sitemaps_read': 0, 'head_verified': False}
+        duplicates = None
+        if self.settings.detect_duplicates and not self.settings.head_only:
+            duplicates = DuplicateDetector(self.settings.near_duplicate_threshold, self.settings.cluster_sample_size)
+        link_graph = None
+        if self.settings.build_link_graph and not self.settings.head_only:
+            link_graph = LinkGraph(scraper._normalize_url(scraper.domain), self.settings.link_graph_top)
+        frontier.add(scraper._normalize_url(scraper.domain), depth=0, priority=1.0)
+
+        def release_claims(analyze: bool):
+            state['claimed_pages'] -= 1
+            if analyze:
+                state['claimed_analyses'] -= 1
+
+        async def fetch_claimed(client: httpx.AsyncClient, entry: FrontierEntry,
+                                analyze: bool) -> Optional[Tuple[Optional[Dict], List[str], Optional[Dict]]]:
+            """(page analysis, same-host links, external domain counts), or None if the page doesn't count"""
+            # Resumed crawl: pages finished before the interruption are replayed, not refetched
+            replayed = self.checkpoint.completed_page(entry.url) if self.checkpoint is not None else None
+            if replayed is not None:
+                external_domains = replayed.get('external_domains')
+                if external_domains is None and replayed['analysis'] is not None:
+                    # Checkpointed before external link counts were stored
+                    external_domains = replayed['analysis'].get('external_domain_counts')
+                return replayed['analysis'] if analyze else None, replayed['links'], external_domains
+
+            page = await self.fetch_page(client, entry.url)
+            if page is None:
+                return None
+            page_analysis = await self._process_page(page, analyze)
+            links = scraper._classified_links(page)
+            next_urls = [scraper._normalize_url(link) for link in links.internal]
+            duplicate_of = None
+            if duplicates is not None and page.extracted is not None:
+                duplicate_of = duplicates.add_page(entry.url, page.extracted.sketch)
+            # Capped so a site of endless near-identical pages still ends at the page limit
+            if duplicate_of is not None and state['duplicate_pages'] < scraper.max_pages_to_count:
+                logger.debug(f"{entry.url} is a near-duplicate of {duplicate_of}")
+                state['duplicate_pages'] += 1
+                # Its links are still followed, but it spends no page or analysis budget
+                if state['analyzed_pages'] < scraper.max_pages_to_analyze:
+                    for url in next_urls:
+                        frontier.add(url, depth=entry.depth + 1)
+                return None
+            if self.checkpoint is not None:
+                await self.checkpoint.record_page(entry, next_urls, page_analysis, links.domain_counts)
+            return page_analysis, next_urls, links.domain_counts
+
+        async def handle(client: httpx.AsyncClient, entry: FrontierEntry):
+            if state['claimed_pages'] >= scraper.max_pages_to_count:
+                return
+            # The sitemap already counted the site; only fetch what still needs analysis
+            if discovery['method'] == 'sitemap' and state['claimed_analyses'] >= scraper.max_pages_to_analyze:
+                return
+            # Further members of a template cluster are tallied but never fetched
+            if duplicates is not None and not duplicates.should_fetch(entry.url):
+                return
+            state['claimed_pages'] += 1
+            # Analysis slots are claimed in frontier order so reruns analyze the same pages
+            analyze = state['claimed_analyses'] < scraper.max_pages_to_analyze
+            if analyze:
+                state['claimed_analyses'] += 1
+
+            # Failed pages give their budget back, so a few errors don't end the crawl early
+            try:
+                fetched = await fetch_claimed(client, entry, analyze)
+            except Exception:
+                release_claims(analyze)
+                raise
+            if fetched is None:
+                release_claims(analyze)
+                return
+            page_analysis, next_urls, external_domains = fetched
+            state['total_pages'] += 1
+            normalized_url = scraper._normalize_url(entry.url)
+            counted.add(url_fingerprint(normalized_url))
+            if link_graph is not None:
+                link_graph.add_page(normalized_url, next_urls, external_domains)
+
+            if page_analysis:
+                state['analyzed_pages'] += 1
+                await results.put((entry, page_analysis))
+            elif analyze:
+                state['claimed_analyses'] -= 1
+
+            # Continue crawling if we haven't hit the analysis limit
+            if state['analyzed_pages'] < scraper.max_pages_to_analyze:
+                for url in next_urls:
+                    frontier.add(url, depth=entry.depth + 1)
+
+        async def worker(client: httpx.AsyncClient):
+            while True:
+                entry = await frontier.get()
+                self.metrics.observe_queue(len(frontier))
+                try:
+                    await handle(client, entry)
+                except Exception as e:
+                    logger.error(f"Error processing {entry.url}: {str(e)}")
+                finally:
+                    frontier.task_done(entry)
+
+        async def seed_from_sitemaps(client: httpx.AsyncClient):
+            entries = await self._discover_sitemap_pages(client)
+            if not entries:
+                return
+            if self.settings.verify_sitemap_urls:
+                exists = await asyncio.gather(*(self._verify_exists(client, e['url']) for e in entries))
+                entries = [e for e, ok in zip(entries, exists) if ok]
+                if not entries:
+                    return
+                discovery['head_verified'] = True
+            discovery.update(method='sitemap', sitemap_urls=len(entries), sitemaps_read=self.sitemaps_read)
+            for sitemap_entry in entries:
+                counted.add(url_fingerprint(sitemap_entry['url']))
+                # Sitemap pages sit one level below the home page
+                frontier.add(sitemap_entry['url'], depth=1, priority=sitemap_entry['priority'])
+
+        async def run():
+            async with self._client() as client:
+                if self.settings.use_sitemaps:
+                    await seed_from_sitemaps(client)
+                if self.settings.head_only and discovery['method'] != 'sitemap':
+                    logger.warning(f"Head-only crawl of {scraper.domain} has no sitemap; only the start page is analyzed")
+                workers = [asyncio.create_task(worker(client)) for _ in range(self.settings.max_concurrency)]
+                try:
+                    await frontier.join()
+                finally:
+                    for task in workers:
+                        task.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+            # Sentinel: the crawl is complete
+            await results.put(None)
+
+        runner = asyncio.create_task(run())
+        self.metrics.registry.add_gauge('webscraper_active_crawls', 1)
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                yield item
+            await runner
+        finally:
+            self.metrics.registry.add_gauge('webscraper_active_crawls', -1)
+            # Consumer went away (e.g. client disconnected): stop crawling
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+
+        total_pages = state['total_pages']
+        if discovery['method'] == 'sitemap':
+            total_pages = min(len(counted), scraper.max_pages_to_count)
+        yield None, {
+            'type': 'summary',
+            'domain': scraper.base_domain,
+            'total_pages': total_pages,
+            'analyzed_pages': state['analyzed_pages'],
+            'crawl_rate': self.scheduler.stats(scraper.base_domain, self.settings.politeness,
+                                               self.settings.per_host_concurrency),
+            'discovery': discovery,
+            'transfer': dict(self.transfer),
+            'duplicates': duplicates.stats() if duplicates is not None else None,
+            'timings': self.metrics.summary() if self.settings.record_timings else None,
+            'link_graph': link_graph.stats() if link_graph is not None else None
+        }
+
+    async def crawl(self) -> Dict:
+        """Crawl the scraper's domain and collect the full analysis"""
+        pages: List[Tuple[Tuple, Dict]] = []
+        summary: Dict = {}
+        async for entry, record in self._crawl_records():
+            if entry is not None:
+                pages.append((entry.key, record))
+            else:
+                summary = record
+        # Report pages in frontier order, independent of which fetch finished first
+        pages.sort(key=lambda item: item[0])
+        return {
+            'domain': summary['domain'],
+            'total_pages': summary['total_pages'],
+            'analyzed_pages': summary['analyzed_pages'],
+            'pages': [page for _, page in pages],
+            'crawl_rate': summary['crawl_rate'],
+            'discovery': summary['discovery'],
+            'transfer': summary['transfer'],
+            'duplicates': summary['duplicates'],
+            'timings': summary['timings'],
+            'link_graph': summary['link_graph']
+        }
@@ -0,0 +1,170 @@
+import heapq
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+SKETCH_SIZE = 64  # Bottom-k MinHash size: Jaccard estimates within about +-0.1
+MAX_WORDS = 2048  # Words sketched per page; the page start is enough to recognise a template
+MAX_TAGS = 1024  # Tags sketched per page
+TEXT_SHINGLE = 3  # Words per text shingle
+TAG_SHINGLE = 4  # Tag names per structure shingle
+MIN_TEXT_WORDS = 50  # Pages with less main-content text than this are also compared on structure
+
+# Site chrome shared by every page of a site; its text, tags and link text are left out of sketches
+BOILERPLATE_TAGS = frozenset(('nav', 'header', 'footer', 'aside', 'a'))
+BOILERPLATE_ROLES = frozenset(('navigation', 'banner', 'contentinfo', 'complementary', 'menu', 'menubar'))
+
+_DIGITS = re.compile(r'\d+')
+
+
+def _shingle_hashes(items: List[str], width: int, separator: str) -> Set[int]:
+    shingles = zip(*(items[offset:] for offset in range(width)))
+    return {zlib.crc32(separator.join(shingle).encode('utf-8', errors='replace')) for shingle in shingles}
+
+
+def is_boilerplate(tag: str, role: Optional[str] = None) -> bool:
+    """Whether an element is navigation, header, footer or link text rather than page content"""
+    return tag in BOILERPLATE_TAGS or (role is not None and role.lower() in BOILERPLATE_ROLES)
+
+
+class ContentSketcher:
+    """
+    Builds a bottom-k MinHash sketch of a page's main content from word
+    shingles of its text. The caller leaves out boilerplate (see
+    is_boilerplate), so a large menu or footer can't make different pages
+    look alike. Tag-sequence shingles only count when there is too little
+    text to go on. Words and tags are collected while the page is parsed
+    and only hashed once, in sketch().
+    """
+
+    def __init__(self):
+        self._words: List[str] = []
+        self._tags: List[str] = []
+
+    def add_text(self, text: str):
+        if len(self._words) < MAX_WORDS:
+            self._words.extend(text.lower().split())
+
+    def add_tag(self, tag: str):
+        if len(self._tags) < MAX_TAGS:
+            self._tags.append(tag)
+
+    def sketch(self) -> Tuple[int, ...]:
+        features = _shingle_hashes(self._words[:MAX_WORDS], TEXT_SHINGLE, ' ')
+        if len(self._words) < MIN_TEXT_WORDS:
+            features |= _shingle_hashes(self._tags, TAG_SHINGLE, '<')
+        return tuple(heapq.nsmallest(SKETCH_SIZE, features))
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the pages behind two bottom-k sketches"""
+    if not a or not b:
+        return 0.0
+    set_a, set_b = set(a), set(b)
+    union = heapq.nsmallest(SKETCH_SIZE, set_a | set_b)
+    shared = sum(1 for value in union if value in set_a and value in set_b)
+    return shared / len(union)
+
+
+def url_pattern(url: str) -> str:
+    """
+    Template pattern of a URL: digit runs become {n} and the last path
+    segment becomes *, so /shoes/red and /shoes/blue, or /page/2 and
+    /page/3, share a pattern; query strings keep only their parameter
+    names. Whether a pattern really is a template is decided from the
+    content of its members.
+    """
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    pattern = '/' + '/'.join([_DIGITS.sub('{n}', segment) for segment in segments[:-1]] + ['*']) if segments else '/'
+    if parsed.query:
+        # Facets and calendars: ?color=red&page=2 is a pattern of its parameter names
+        keys = sorted({pair.split('=', 1)[0] for pair in parsed.query.split('&') if pair})
+        pattern += '?' + '&'.join(keys)
+    return pattern
+
+
+@dataclass
+class _Cluster:
+    pattern: str
+    # (url, sketch) of content-distinct members; near-duplicates fold into these
+    representatives: List[Tuple[str, Tuple[int, ...]]] = field(default_factory=list)
+    sampled: int = 0  # Members fetched
+    near_duplicates: int = 0  # Fetched members that matched a representative
+    skipped: int = 0  # Members never fetched because the cluster is a template
+
+    @property
+    def size(self) -> int:
+        return self.sampled + self.skipped
+
+
+class DuplicateDetector:
+    """
+    Groups a crawl's URLs into pattern clusters and compares the content of
+    each cluster's members. Once `sample_size` members of a cluster have
+    been fetched and at least half of them near-duplicate an earlier
+    member, the cluster is treated as a template and the rest of its
+    members are no longer fetched.
+    """
+
+    MAX_REPRESENTATIVES = 8  # Distinct pages compared against per cluster
+
+    def __init__(self, threshold: float = 0.9, sample_size: int = 3):
+        self.threshold = threshold
+        self.sample_size = sample_size
+        self._clusters: Dict[str, _Cluster] = {}
+
+    def _cluster(self, url: str) -> _Cluster:
+        pattern = url_pattern(url)
+        cluster = self._clusters.get(pattern)
+        if cluster is None:
+            cluster = _Cluster(pattern)
+            self._clusters[pattern] = cluster
+        return cluster
+
+    @staticmethod
+    def _is_template(cluster: _Cluster, sample_size: int) -> bool:
+        # Enough members fetched, and most of them repeat an earlier member's content
+        return cluster.sampled >= sample_size and cluster.near_duplicates * 2 >= cluster.sampled
+
+    def should_fetch(self, url: str) -> bool:
+        """False, and the URL is tallied as skipped, if its cluster is a known template"""
+        cluster = self._cluster(url)
+        if self._is_template(cluster, self.sample_size):
+            cluster.skipped += 1
+            return False
+        return True
+
+    def add_page(self, url: str, sketch: Optional[Tuple[int, ...]]) -> Optional[str]:
+        """Record a fetched page; returns the URL it near-duplicates, if any"""
+        cluster = self._cluster(url)
+        cluster.sampled += 1
+        if not sketch:
+            return None
+        for representative_url, representative in cluster.representatives:
+            if similarity(sketch, representative) >= self.threshold:
+                cluster.near_duplicates += 1
+                return representative_url
+        if len(cluster.representatives) < self.MAX_REPRESENTATIVES:
+            cluster.representatives.append((url, sketch))
+        return None
+
+    def stats(self, limit: int = 20) -> Dict:
+        clusters = [cluster for cluster in self._clusters.values() if cluster.size > 1]
+        clusters.sort(key=lambda cluster: (-cluster.size, cluster.pattern))
+        return {
+            'duplicate_pages': sum(cluster.near_duplicates for cluster in self._clusters.values()),
+            'skipped_pages': sum(cluster.skipped for cluster in self._clusters.values()),
+            'clusters': [
+                {
+                    'pattern': cluster.pattern,
+                    'size': cluster.size,
+                    'sampled': cluster.sampled,
+                    'near_duplicates': cluster.near_duplicates,
+                    'template': self._is_template(cluster, self.sample_size)
+                }
+                for cluster in clusters[:limit]
+            ]
+        }
@@ -0,0 +1,271 @@
+import functools
+import logging
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from api.v1.services.dedup import ContentSketcher, is_boilerplate
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+    from api.v1.services.metrics import PageTimings
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_ENGINES = ('lxml', 'bs4')
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Text inside these never counts towards a title or heading
+_SKIPPED_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+
+@dataclass
+class ExtractedPage:
+    """Everything the page analysis needs from the markup"""
+    title: Optional[str] = None  # None when the page has no <title>
+    description: Optional[str] = None  # None when there is no meta description
+    headings: Dict[str, List[str]] = field(default_factory=dict)  # In document order per level
+    hrefs: List[str] = field(default_factory=list)  # Raw href values of <a> tags
+    sketch: Tuple[int, ...] = ()  # MinHash of the main content, when near-duplicate detection is on
+
+
+class _SinglePassTarget:
+    """
+    lxml parser target that collects title, meta description, headings and
+    hrefs while the document is parsed, without building a tree. Text is
+    joined the way BeautifulSoup's get_text(strip=True) does it: every text
+    node stripped, empty ones dropped, the rest concatenated.
+
+    With head_only, everything after the <head> is ignored and `head_complete`
+    tells the caller it can stop feeding the document. With sketch, text and
+    tags outside navigation, headers, footers and links also feed a
+    ContentSketcher for near-duplicate detection.
+    """
+
+    def __init__(self, head_only: bool = False, sketch: bool = False):
+        self.page = ExtractedPage()
+        self.head_only = head_only
+        self.head_complete = False
+        self._sketcher = ContentSketcher() if sketch else None
+        self._chunks: List[str] = []
+        self._skip_depth = 0
+        self._depth = 0  # Open elements
+        self._boilerplate_depth = 0  # Depth of the outermost open boilerplate element, 0 outside one
+        self._in_title = False
+        self._title_parts: List[str] = []
+        # Open headings as (tag, slot index, text parts); slots keep document order
+        self._open_headings: List = []
+
+    def _flush_text(self):
+        if not self._chunks:
+            return
+        text = ''.join(self._chunks).strip()
+        self._chunks = []
+        if not text or self._skip_depth:
+            return
+        if self._sketcher is not None and not self._boilerplate_depth:
+            self._sketcher.add_text(text)
+        if self._in_title:
+            self._title_parts.append(text)
+        for _, _, parts in self._open_headings:
+            parts.append(text)
+
+    def start(self, tag, attrib):
+        if self.head_complete:
+            return
+        if self.head_only and tag == 'body':
+            self.head_complete = True
+            return
+        self._flush_text()
+        self._depth += 1
+        if self._sketcher is not None and not self._boilerplate_depth:
+            if is_boilerplate(tag, attrib.get('role')):
+                self._boilerplate_depth = self._depth
+            else:
+                self._sketcher.add_tag(tag)
+        if tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.page.hrefs.append(href)
+        elif tag in HEADING_TAGS:
+            slots = self.page.headings.setdefault(tag, [])
+            self._open_headings.append((tag, len(slots), []))
+            slots.append('')
+        elif tag == 'meta':
+            if self.page.description is None and attrib.get('name') == 'description':
+                self.page.description = attrib.get('content', '')
+        elif tag == 'title':
+            if self.page.title is None and not self._in_title:
+                self._in_title = True
+        elif tag in _SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag):
+        if self.head_complete:
+            return
+        self._flush_text()
+        if self._depth <= self._boilerplate_depth:
+            self._boilerplate_depth = 0
+        self._depth = max(0, self._depth - 1)
+        if self.head_only and tag == 'head':
+            self.head_complete = True
+        elif tag in HEADING_TAGS:
+            for position in range(len(self._open_headings) - 1, -1, -1):
+                if self._open_headings[position][0] == tag:
+                    _, slot, parts = self._open_headings.pop(position)
+                    self.page.headings[tag][slot] = ''.join(parts)
+                    break
+        elif tag == 'title':
+            if self._in_title:
+                self._in_title = False
+                self.page.title = ''.join(self._title_parts)
+        elif tag in _SKIPPED_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, text):
+        if not self.head_complete:
+            self._chunks.append(text)
+
+    def comment(self, text):
+        # A comment ends the current text node
+        if not self.head_complete:
+            self._flush_text()
+
+    def close(self) -> ExtractedPage:
+        self._flush_text()
+        # Unclosed elements at the end of a truncated document
+        for tag, slot, parts in self._open_headings:
+            self.page.headings[tag][slot] = ''.join(parts)
+        if self._in_title:
+            self.page.title = ''.join(self._title_parts)
+        if self._sketcher is not None:
+            self.page.sketch = self._sketcher.sketch()
+        return self.page
+
+
+class IncrementalExtractor:
+    """Single-pass extraction fed with decoded text chunks as they are downloaded"""
+
+    def __init__(self, head_only: bool = False, sketch: bool = False):
+        self._target = _SinglePassTarget(head_only, sketch)
+        self._parser = etree.HTMLParser(target=self._target)
+
+    @property
+    def done(self) -> bool:
+        """True once nothing more in the document can change the result"""
+        return self._target.head_complete
+
+    def feed(self, text: str):
+        self._parser.feed(text)
+
+    def close(self) -> ExtractedPage:
+        try:
+            return self._parser.close()
+        except etree.XMLSyntaxError:
+            # Nothing parseable was fed, e.g. an empty body: no title, headings or links
+            return self._target.close()
+
+
+def extract_with_lxml(content: str, head_only: bool = False, sketch: bool = False) -> ExtractedPage:
+    """Single-pass extraction straight from lxml's parser events"""
+    extractor = IncrementalExtractor(head_only, sketch)
+    extractor.feed(content)
+    return extractor.close()
+
+
+def _sketch_soup(soup: 'BeautifulSoup') -> Tuple[int, ...]:
+    from bs4 import NavigableString, Tag
+
+    sketcher = ContentSketcher()
+    # Document order, without descending into boilerplate or script/style text
+    stack = list(reversed(soup.contents))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tag):
+            if is_boilerplate(node.name, node.get('role')):
+                continue
+            sketcher.add_tag(node.name)
+            if node.name not in _SKIPPED_TEXT_TAGS:
+                stack.extend(reversed(node.contents))
+        elif type(node) is NavigableString:
+            text = node.strip()
+            if text:
+                sketcher.add_text(text)
+    return sketcher.sketch()
+
+
+def extract_from_soup(soup: 'BeautifulSoup', head_only: bool = False, sketch: bool = False) -> ExtractedPage:
+    """Extraction from an already built BeautifulSoup tree"""
+    title = soup.find('title')
+    meta_description = soup.find('meta', {'name': 'description'})
+    if head_only:
+        return ExtractedPage(
+            title=title.get_text(strip=True) if title else None,
+            description=meta_description.get('content', '') if meta_description else None
+        )
+    headings = {}
+    for tag in HEADING_TAGS:
+        elements = soup.find_all(tag)
+        if elements:
+            headings[tag] = [h.get_text(strip=True) for h in elements]
+    return ExtractedPage(
+        title=title.get_text(strip=True) if title else None,
+        description=meta_description.get('content', '') if meta_description else None,
+        headings=headings,
+        hrefs=[anchor['href'] for anchor in soup.find_all('a', href=True)],
+        sketch=_sketch_soup(soup) if sketch else ()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _soup_class():
+    # bs4 only handles XML and the fallback engine, so it is imported on first use
+    from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+
+    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+    return BeautifulSoup
+
+
+def parse_soup(content: str, content_type: Optional[str] = None) -> 'BeautifulSoup':
+    """BeautifulSoup tree with the parser that suits the content type"""
+    BeautifulSoup = _soup_class()
+    if content_type and 'xml' in content_type.lower():
+        return BeautifulSoup(content, features='xml')
+    try:
+        return BeautifulSoup(content, 'lxml')
+    except Exception as e:
+        logger.warning(f"Failed to parse with lxml, falling back to html.parser: {str(e)}")
+        return BeautifulSoup(content, 'html.parser')
+
+
+def extract_markup(content: str, content_type: str, engine: str = 'lxml', head_only: bool = False,
+                   sketch: bool = False, timings: Optional['PageTimings'] = None, url: str = '') -> ExtractedPage:
+    """
+    Extract a whole document with the configured engine. XML and XHTML
+    always go through BeautifulSoup; so does HTML the single-pass engine
+    fails on. Parse and extract time are added to `timings` when given.
+    """
+    if engine == 'lxml' and 'xml' not in content_type:
+        try:
+            # Parsing and extraction are one pass; it is all timed as parsing
+            started = time.perf_counter()
+            try:
+                return extract_with_lxml(content, head_only, sketch)
+            finally:
+                if timings is not None:
+                    timings.add('parse', time.perf_counter() - started)
+        except Exception as e:
+            logger.warning(f"lxml extraction failed for {url}, falling back to BeautifulSoup: {str(e)}")
+    started = time.perf_counter()
+    soup = parse_soup(content, content_type)
+    parsed = time.perf_counter()
+    extracted = extract_from_soup(soup, head_only, sketch)
+    if timings is not None:
+        timings.add('parse', parsed - started)
+        timings.add('extract', time.perf_counter() - parsed)
+    return extracted
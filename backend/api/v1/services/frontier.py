@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import heapq
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FRONTIER_ORDERS = ('bfs', 'priority')
+
+
+def url_fingerprint(url: str) -> int:
+    """64-bit fingerprint of a normalized URL"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _contains_sorted(values, fingerprint: int) -> bool:
+    index = bisect_left(values, fingerprint)
+    return index < len(values) and values[index] == fingerprint
+
+
+class FingerprintSet:
+    """
+    Exact visited set of 64-bit URL fingerprints in an open-addressing table
+    backed by array('Q'): about 12-16 bytes per URL instead of a full string
+    in a Python set. With `spill_dir`, once `memory_limit` fingerprints are held
+    the table is merged into a sorted, memory-mapped run on disk and cleared.
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, spill_dir: Optional[str] = None, memory_limit: int = 1_000_000,
+                 initial_capacity: int = 1024):
+        self.spill_dir = spill_dir
+        self.memory_limit = memory_limit
+        capacity = 1
+        while capacity < initial_capacity:
+            capacity <<= 1
+        self._table = array('Q', bytes(8 * capacity))
+        self._mask = capacity - 1
+        self._used = 0
+        self._count = 0
+        self._disk: Optional[memoryview] = None
+        self._disk_mmap: Optional[mmap.mmap] = None
+        self._disk_file = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def _key(fingerprint: int) -> int:
+        # 0 marks an empty slot
+        return fingerprint or 1
+
+    def _probe(self, key: int) -> int:
+        """Index of key's slot, or of the empty slot where it would go"""
+        table = self._table
+        mask = self._mask
+        index = (key ^ (key >> 32)) & mask
+        while True:
+            value = table[index]
+            if value == 0 or value == key:
+                return index
+            index = (index + 1) & mask
+
+    def __contains__(self, fingerprint: int) -> bool:
+        key = self._key(fingerprint)
+        if self._table[self._probe(key)] == key:
+            return True
+        return self._disk is not None and _contains_sorted(self._disk, key)
+
+    def add(self, fingerprint: int) -> bool:
+        """Add a fingerprint; returns False if it was already present"""
+        key = self._key(fingerprint)
+        index = self._probe(key)
+        if self._table[index] == key:
+            return False
+        if self._disk is not None and _contains_sorted(self._disk, key):
+            return False
+        self._table[index] = key
+        self._used += 1
+        self._count += 1
+        if self.spill_dir and self._used >= self.memory_limit:
+            self._spill()
+        elif self._used > self.MAX_LOAD * (self._mask + 1):
+            self._resize((self._mask + 1) * 2)
+        return True
+
+    def _resize(self, capacity: int):
+        old_keys = [key for key in self._table if key]
+        self._table = array('Q', bytes(8 * capacity))
+        self._mask = capacity - 1
+        for key in old_keys:
+            self._table[self._probe(key)] = key
+
+    def _spill(self):
+        """Merge the table with the on-disk run into a new sorted, memory-mapped file"""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        new_file = tempfile.TemporaryFile(dir=self.spill_dir)
+        in_memory = sorted(key for key in self._table if key)
+        existing = self._disk if self._disk is not None else ()
+        buffer = array('Q')
+        for key in heapq.merge(existing, in_memory):
+            buffer.append(key)
+            if len(buffer) >= 65536:
+                buffer.tofile(new_file)
+                buffer = array('Q')
+        buffer.tofile(new_file)
+        new_file.flush()
+        self._close_disk()
+        self._disk_file = new_file
+        self._disk_mmap = mmap.mmap(new_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._disk = memoryview(self._disk_mmap).cast('Q')
+        self._table = array('Q', bytes(8 * (self._mask + 1)))
+        self._used = 0
+
+    def _close_disk(self):
+        if self._disk is not None:
+            self._disk.release()
+            self._disk_mmap.close()
+            self._disk_file.close()
+            self._disk = self._disk_mmap = self._disk_file = None
+
+    def memory_bytes(self) -> int:
+        """Resident size of the table, excluding the memory-mapped spill file"""
+        return len(self._table) * self._table.itemsize
+
+    def close(self):
+        self._close_disk()
+
+
+@dataclass
+class FrontierEntry:
+    url: str
+    depth: int = 0
+    priority: float = 0.5
+    sequence: int = 0  # Position in hand-out order
+    key: Tuple = field(default=(), repr=False)  # Frontier sort key, for reporting in a stable order
+
+
+class Frontier:
+    """
+    Deterministic async URL frontier.
+
+    'bfs' hands out URLs level by level, in sorted order within a level. Depth
+    d+1 starts once depth d is fully handed out and every page above it is
+    done, so the last slow pages of a level don't stall the workers; a URL
+    they find that is queued one level deeper moves up, which keeps depths
+    exact. Hand-out order can then vary slightly between runs; entries'
+    sort keys do not, and results are reported in that order. 'priority'
+    hands out the highest sitemap priority first, then the shallowest, then
+    sorted URL. Deduplication uses a FingerprintSet rather than a set of URL
+    strings.
+    """
+
+    def __init__(self, order: str = 'bfs', visited: Optional[FingerprintSet] = None):
+        if order not in FRONTIER_ORDERS:
+            raise ValueError(f"Unknown frontier order: {order}")
+        self.order = order
+        self.visited = visited if visited is not None else FingerprintSet()
+        # (sort key, depth, priority, url) tuples keep queued entries small
+        self._heap: List[Tuple] = []
+        # bfs: depth of each queued URL; heap entries that don't match it are stale
+        self._queued: Dict[str, int] = {}
+        self._in_flight: Counter = Counter()  # Pages handed out and not done, by depth
+        self._current_depth = 0
+        self._sequence = 0
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._queued) if self.order == 'bfs' else len(self._heap)
+
+    def _sort_key(self, url: str, depth: int, priority: float) -> Tuple:
+        if self.order == 'priority':
+            return (-priority, depth, url)
+        return (depth, url)
+
+    def mark_seen(self, url: str) -> bool:
+        """Record a URL as known without queuing it; False if already seen"""
+        return self.visited.add(url_fingerprint(url))
+
+    def add(self, url: str, depth: int = 0, priority: float = 0.5) -> bool:
+        """Queue a URL unless it has been seen before, or is only queued deeper"""
+        if not self.mark_seen(url) and (self.order != 'bfs' or self._queued.get(url, depth) <= depth):
+            return False
+        if self.order == 'bfs':
+            self._queued[url] = depth
+        heapq.heappush(self._heap, (self._sort_key(url, depth, priority), depth, priority, url))
+        self._changed.set()
+        return True
+
+    def add_many(self, entries: Iterable[Tuple[str, int, float]]) -> int:
+        return sum(1 for url, depth, priority in entries if self.add(url, depth, priority))
+
+    def _has_queued(self) -> bool:
+        # Drop entries superseded by the same URL queued shallower, or already handed out
+        while self._heap and self.order == 'bfs' and self._queued.get(self._heap[0][3]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+        return bool(self._heap)
+
+    def _ready(self) -> bool:
+        if not self._has_queued():
+            return False
+        if self.order != 'bfs':
+            return True
+        head_depth = self._heap[0][1]
+        if head_depth <= self._current_depth:
+            return True
+        # Pages still in flight one level up can only add URLs at head_depth
+        if all(depth >= head_depth - 1 for depth in self._in_flight):
+            self._current_depth = head_depth
+            return True
+        return False
+
+    async def _wait_until(self, predicate):
+        while not predicate():
+            self._changed.clear()
+            await self._changed.wait()
+
+    async def get(self) -> FrontierEntry:
+        await self._wait_until(self._ready)
+        key, depth, priority, url = heapq.heappop(self._heap)
+        self._queued.pop(url, None)
+        self._in_flight[depth] += 1
+        entry = FrontierEntry(url, depth, priority, self._sequence, key)
+        self._sequence += 1
+        return entry
+
+    def task_done(self, entry: FrontierEntry):
+        self._in_flight[entry.depth] -= 1
+        if not self._in_flight[entry.depth]:
+            del self._in_flight[entry.depth]
+        self._changed.set()
+
+    async def join(self):
+        await self._wait_until(lambda: not self._has_queued() and not self._in_flight)
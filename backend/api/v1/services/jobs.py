@@ -0,0 +1,360 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from api.v1.services.client_pool import ClientPool
+from api.v1.services.crawler import AsyncCrawlEngine, CrawlCheckpoint, CrawlSettings
+from api.v1.services.frontier import FrontierEntry
+from api.v1.services.politeness import PolitenessScheduler
+from api.v1.services.website_scraper import WebsiteScraperService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_DB = os.path.join(tempfile.gettempdir(), 'website-analyzer-jobs.db')
+
+
+@dataclass
+class JobSettings:
+    """Job queue tunables"""
+    db_path: Optional[str] = None  # Defaults to the JOB_DB env var, then a temp file
+    heartbeat_interval: float = 10.0
+    stale_after: float = 60.0  # A running job silent this long is taken over and resumed
+    poll_interval: float = 1.0  # Seconds an idle worker waits before checking the queue again
+    max_attempts: int = 3  # Runs before a job that keeps dying is marked failed
+    jobs_per_worker: int = 1  # Jobs crawled at once by one worker
+
+    def __post_init__(self):
+        self.db_path = self.db_path or os.environ.get('JOB_DB', DEFAULT_JOB_DB)
+
+
+class JobStore:
+    """
+    SQLite-backed job queue and checkpoint store. Every process opens its
+    own JobStore on the same file; claims use BEGIN IMMEDIATE so a job is
+    only ever handed to one worker.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL, "
+                "worker TEXT, attempts INTEGER NOT NULL DEFAULT 0, error TEXT, summary TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            # One row per fetched page: the checkpoint and, for analyzed pages, the partial results
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_pages ("
+                "job_id TEXT NOT NULL, url TEXT NOT NULL, sequence INTEGER NOT NULL, depth INTEGER NOT NULL, "
+                "links TEXT NOT NULL, analysis TEXT, external_domains TEXT, PRIMARY KEY (job_id, url))"
+            )
+            # Databases created before external link counts were checkpointed
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(job_pages)")}
+            if 'external_domains' not in columns:
+                self._conn.execute("ALTER TABLE job_pages ADD COLUMN external_domains TEXT")
+
+    def submit(self, params: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(params), time.time())
+            )
+        return job_id
+
+    def claim(self, worker_id: str, stale_after: float, max_attempts: int) -> Optional[Dict]:
+        """Take the oldest queued job, or a running one whose worker stopped heartbeating"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+                    "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+                    (now, f"Abandoned after {max_attempts} interrupted attempts", now - stale_after, max_attempts)
+                )
+                row = self._conn.execute(
+                    "SELECT id, params FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND heartbeat_at < ?) ORDER BY created_at LIMIT 1",
+                    (now - stale_after,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, started_at = COALESCE(started_at, ?), "
+                        "heartbeat_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        (worker_id, now, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {'id': row[0], 'params': json.loads(row[1])}
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the worker's hold on a job; False if another worker has taken it over"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def record_page(self, job_id: str, sequence: int, url: str, depth: int, links: List[str],
+                    page_analysis: Optional[Dict], external_domains: Optional[Dict[str, int]] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_pages (job_id, url, sequence, depth, links, analysis, external_domains) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, url, sequence, depth, json.dumps(links),
+                 json.dumps(page_analysis) if page_analysis is not None else None,
+                 json.dumps(external_domains) if external_domains is not None else None)
+            )
+
+    def completed_pages(self, job_id: str) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, links, analysis, external_domains FROM job_pages WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {
+            url: {
+                'links': json.loads(links),
+                'analysis': json.loads(analysis) if analysis else None,
+                'external_domains': json.loads(external_domains) if external_domains else None
+            }
+            for url, links, analysis, external_domains in rows
+        }
+
+    def finish(self, job_id: str, worker_id: str, summary: Dict):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'completed', finished_at = ?, summary = ?, error = NULL "
+                "WHERE id = ? AND worker = ?",
+                (time.time(), json.dumps(summary), job_id, worker_id)
+            )
+
+    def fail(self, job_id: str, worker_id: str, error: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ? AND worker = ?",
+                (time.time(), error, job_id, worker_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status of a job with progress counts, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, params, created_at, started_at, finished_at, attempts, error, summary "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            fetched, analyzed = self._conn.execute(
+                "SELECT COUNT(*), COUNT(analysis) FROM job_pages WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        params = json.loads(row[2])
+        return {
+            'job_id': row[0],
+            'status': row[1],
+            'domain': params['domain'],
+            'created_at': row[3],
+            'started_at': row[4],
+            'finished_at': row[5],
+            'attempts': row[6],
+            'error': row[7],
+            'pages_fetched': fetched,
+            'pages_analyzed': analyzed,
+            'summary': json.loads(row[8]) if row[8] else None
+        }
+
+    def pages(self, job_id: str, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Analyzed pages so far, in crawl order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT analysis FROM job_pages WHERE job_id = ? AND analysis IS NOT NULL "
+                "ORDER BY sequence LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobCheckpoint(CrawlCheckpoint):
+    """Crawl checkpoint stored in the job's job_pages rows"""
+
+    def __init__(self, store: JobStore, job_id: str, completed: Dict[str, Dict]):
+        self.store = store
+        self.job_id = job_id
+        self.completed = completed
+
+    def completed_page(self, url: str) -> Optional[Dict]:
+        return self.completed.get(url)
+
+    async def record_page(self, entry: FrontierEntry, links: List[str], page_analysis: Optional[Dict],
+                          external_domains: Optional[Dict[str, int]] = None):
+        await asyncio.to_thread(
+            self.store.record_page, self.job_id, entry.sequence, entry.url, entry.depth, links, page_analysis,
+            external_domains
+        )
+
+
+class _LeaseLost(Exception):
+    pass
+
+
+class JobWorker:
+    """Claims crawl jobs from a JobStore and runs them with checkpointing"""
+
+    def __init__(self, store: JobStore, settings: Optional[JobSettings] = None,
+                 client_pool: Optional[ClientPool] = None, scheduler: Optional[PolitenessScheduler] = None):
+        self.store = store
+        self.settings = settings or JobSettings()
+        self.client_pool = client_pool
+        # Kept across jobs, so robots.txt and learned host rates carry over
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def _crawl(self, job: Dict) -> Dict:
+        params = job['params']
+        scraper = WebsiteScraperService(
+            params['domain'],
+            max_pages_to_count=params['max_pages_to_count'],
+            max_pages_to_analyze=params['max_pages_to_analyze'],
+            crawl_settings=CrawlSettings(
+                max_concurrency=params['max_concurrency'],
+                per_host_concurrency=params['per_host_concurrency'],
+                use_sitemaps=params['use_sitemaps'],
+                verify_sitemap_urls=params['verify_sitemap_urls']
+            ),
+            client_pool=self.client_pool,
+            scheduler=self.scheduler
+        )
+        completed = await asyncio.to_thread(self.store.completed_pages, job['id'])
+        if completed:
+            logger.info(f"Resuming job {job['id']} with {len(completed)} pages already crawled")
+        engine = AsyncCrawlEngine(scraper, scraper.crawl_settings, JobCheckpoint(self.store, job['id'], completed))
+        summary: Dict = {}
+        async for record in engine.iter_crawl():
+            # Page results are already stored by the checkpoint as they complete
+            if record['type'] == 'summary':
+                summary = {key: value for key, value in record.items() if key != 'type'}
+        return summary
+
+    async def _keep_alive(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.settings.heartbeat_interval)
+            if not await asyncio.to_thread(self.store.heartbeat, job_id, self.worker_id):
+                raise _LeaseLost(job_id)
+
+    async def run_job(self, job: Dict):
+        crawl = asyncio.create_task(self._crawl(job))
+        keep_alive = asyncio.create_task(self._keep_alive(job['id']))
+        try:
+            await asyncio.wait({crawl, keep_alive}, return_when=asyncio.FIRST_COMPLETED)
+            if not crawl.done():
+                # Another worker took the job over after a missed heartbeat
+                logger.warning(f"Lost job {job['id']} to another worker; stopping")
+                crawl.cancel()
+                await asyncio.gather(crawl, return_exceptions=True)
+                return
+            try:
+                summary = crawl.result()
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {str(e)}")
+                await asyncio.to_thread(self.store.fail, job['id'], self.worker_id, str(e))
+                return
+            await asyncio.to_thread(self.store.finish, job['id'], self.worker_id, summary)
+        finally:
+            for task in (crawl, keep_alive):
+                task.cancel()
+            await asyncio.gather(crawl, keep_alive, return_exceptions=True)
+
+    async def _run_slot(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(
+                    self.store.claim, self.worker_id, self.settings.stale_after, self.settings.max_attempts
+                )
+            except sqlite3.Error as e:
+                # E.g. the database is locked or briefly unavailable; the worker must outlive it
+                logger.error(f"Worker {self.worker_id} could not claim a job: {str(e)}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.settings.poll_interval)
+                continue
+            logger.info(f"Worker {self.worker_id} running job {job['id']}")
+            try:
+                await self.run_job(job)
+            except sqlite3.Error as e:
+                # The job's heartbeat stops, so once stale it is claimed again and resumed
+                logger.error(f"Worker {self.worker_id} lost track of job {job['id']}: {str(e)}")
+
+    async def run(self):
+        """Process jobs until cancelled; an interrupted job is resumed by whichever worker claims it next"""
+        await asyncio.gather(*(self._run_slot() for _ in range(max(1, self.settings.jobs_per_worker))))
+
+
+_shared_store: Optional[JobStore] = None
+
+
+def get_shared_job_store() -> JobStore:
+    """Process-wide job store used by the API"""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = JobStore(JobSettings().db_path)
+    return _shared_store
+
+
+def close_shared_job_store():
+    global _shared_store
+    if _shared_store is not None:
+        _shared_store.close()
+        _shared_store = None
+
+
+def _worker_process(settings: JobSettings):
+    logging.basicConfig(level=logging.INFO)
+    store = JobStore(settings.db_path)
+    try:
+        asyncio.run(JobWorker(store, settings).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+def run_job_workers(processes: int = 1, settings: Optional[JobSettings] = None):
+    """Run job workers in `processes` processes until interrupted"""
+    settings = settings or JobSettings()
+    if processes <= 1:
+        _worker_process(settings)
+        return
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=_worker_process, args=(settings,)) for _ in range(processes)]
+    for process in workers:
+        process.start()
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.join()
@@ -0,0 +1,112 @@
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class LinkGraph:
+    """
+    Site-wide internal link graph and external-domain index, built while
+    pages stream in. URLs and domains are interned to integer IDs; edges and
+    per-node counters live in flat integer arrays, so a crawl of many pages
+    costs a few bytes per link rather than a list of URL strings per page.
+    """
+
+    def __init__(self, root_url: str, top: int = 20):
+        self.top = top
+        self._ids: Dict[str, int] = {}
+        self._urls: List[str] = []
+        self._fetched = bytearray()  # 1 for pages that were crawled, 0 for URLs only linked to
+        self._inbound = array('I')  # Distinct crawled pages linking to each URL
+        # Edge list: _sources[i] links to _targets[i], each pair once
+        self._sources = array('I')
+        self._targets = array('I')
+        self._domain_ids: Dict[str, int] = {}
+        self._domains: List[str] = []
+        self._domain_links = array('I')  # Links to each external domain, repeats included
+        self._domain_pages = array('I')  # Crawled pages linking to each external domain
+        self.root = self._intern(root_url)
+
+    def _intern(self, url: str) -> int:
+        node = self._ids.get(url)
+        if node is None:
+            node = self._ids[url] = len(self._urls)
+            self._urls.append(url)
+            self._fetched.append(0)
+            self._inbound.append(0)
+        return node
+
+    def _intern_domain(self, domain: str) -> int:
+        domain_id = self._domain_ids.get(domain)
+        if domain_id is None:
+            domain_id = self._domain_ids[domain] = len(self._domains)
+            self._domains.append(domain)
+            self._domain_links.append(0)
+            self._domain_pages.append(0)
+        return domain_id
+
+    def add_page(self, url: str, internal_urls: Iterable[str], external_domains: Optional[Dict[str, int]] = None):
+        """Record a crawled page, its normalized internal links and its external link counts per domain"""
+        source = self._intern(url)
+        if self._fetched[source]:
+            return
+        self._fetched[source] = 1
+        targets = {self._intern(target) for target in internal_urls}
+        targets.discard(source)
+        for target in targets:
+            self._sources.append(source)
+            self._targets.append(target)
+            self._inbound[target] += 1
+        for domain, links in (external_domains or {}).items():
+            domain_id = self._intern_domain(domain)
+            self._domain_links[domain_id] += links
+            self._domain_pages[domain_id] += 1
+
+    def _depths(self) -> array:
+        """Fewest clicks from the start page to each URL over crawled links; -1 when unreachable"""
+        adjacency: List[List[int]] = [[] for _ in self._urls]
+        for source, target in zip(self._sources, self._targets):
+            adjacency[source].append(target)
+        depths = array('i', [-1]) * len(self._urls)
+        depths[self.root] = 0
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            for target in adjacency[node]:
+                if depths[target] < 0:
+                    depths[target] = depths[node] + 1
+                    queue.append(target)
+        return depths
+
+    def stats(self) -> Dict:
+        crawled = [node for node in range(len(self._urls)) if self._fetched[node]]
+        depths = self._depths()
+        depth_counts: Dict[int, int] = {}
+        for node in crawled:
+            if depths[node] >= 0:
+                depth_counts[depths[node]] = depth_counts.get(depths[node], 0) + 1
+        # Crawled pages no other crawled page links to, e.g. found only through the sitemap
+        orphans = [node for node in crawled if not self._inbound[node] and node != self.root]
+        most_linked = sorted(crawled, key=lambda node: (-self._inbound[node], self._urls[node]))[:self.top]
+        domains = sorted(range(len(self._domains)),
+                         key=lambda domain_id: (-self._domain_pages[domain_id], -self._domain_links[domain_id],
+                                                self._domains[domain_id]))
+        return {
+            'pages': len(crawled),
+            'discovered_urls': len(self._urls),
+            'internal_links': len(self._targets),
+            'max_depth': max(depth_counts) if depth_counts else 0,
+            'depth_counts': dict(sorted(depth_counts.items())),
+            'unreachable_pages': sum(1 for node in crawled if depths[node] < 0),
+            'orphan_count': len(orphans),
+            'orphan_pages': [self._urls[node] for node in orphans[:self.top]],
+            'most_linked_pages': [
+                {'url': self._urls[node], 'inbound_links': self._inbound[node]}
+                for node in most_linked if self._inbound[node]
+            ],
+            'external_domains': len(self._domains),
+            'top_external_domains': [
+                {'domain': self._domains[domain_id], 'links': self._domain_links[domain_id],
+                 'pages': self._domain_pages[domain_id]}
+                for domain_id in domains[:self.top]
+            ]
+        }
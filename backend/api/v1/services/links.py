@@ -0,0 +1,159 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+SOCIAL_DOMAINS = (
+    'facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com',
+    'youtube.com', 'pinterest.com', 'tiktok.com', 'github.com'
+)
+
+EXCLUDED_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.pdf', '.mp4', '.webm',
+    '.mp3', '.wav', '.css', '.js', '.ico', '.svg', '.woff', '.woff2'
+)
+
+EXCLUDED_SCHEMES = ('mailto', 'tel', 'javascript')
+
+# Link kinds
+INTERNAL = 'internal'
+EXTERNAL = 'external'
+SOCIAL = 'social'
+OTHER = 'other'  # No host to compare, e.g. data: or file: URLs
+
+
+@dataclass
+class LinkSettings:
+    """Which links are kept, and which hosts count as social"""
+    social_domains: Tuple[str, ...] = SOCIAL_DOMAINS  # These hosts and their subdomains are social links
+    excluded_domains: Tuple[str, ...] = ()  # Links to these hosts and their subdomains are dropped
+    excluded_extensions: Tuple[str, ...] = EXCLUDED_EXTENSIONS  # Links to these files are dropped
+    excluded_schemes: Tuple[str, ...] = EXCLUDED_SCHEMES
+
+
+class DomainSuffixSet:
+    """
+    Domains matched on whole labels from the right, so facebook.com
+    matches facebook.com and m.facebook.com but not notfacebook.com or
+    facebook.com.example.org. A lookup costs one set probe per label.
+    """
+
+    def __init__(self, domains: Iterable[str]):
+        self._domains = frozenset(domain.lower().strip('.') for domain in domains if domain.strip('.'))
+
+    def __contains__(self, host: str) -> bool:
+        if not self._domains:
+            return False
+        host = host.rstrip('.')
+        while True:
+            if host in self._domains:
+                return True
+            dot = host.find('.')
+            if dot < 0:
+                return False
+            host = host[dot + 1:]
+
+
+@dataclass
+class PageLinks:
+    """The links of one page, resolved and classified in a single pass"""
+    urls: List[str] = field(default_factory=list)  # Kept absolute URLs in document order, repeats included
+    internal: List[str] = field(default_factory=list)  # Those on the crawled host, repeats included
+    external: List[str] = field(default_factory=list)  # Distinct external non-social links, first seen first
+    social: List[str] = field(default_factory=list)  # Distinct social links
+    domain_counts: Dict[str, int] = field(default_factory=dict)  # External non-social links per host, repeats included
+
+
+class LinkClassifier:
+    """
+    Resolves hrefs against their page and sorts them into internal,
+    external and social links. Each distinct href is joined and split once
+    per page, and each host is classified once per crawl.
+    """
+
+    MAX_CACHED_HOSTS = 100_000
+
+    def __init__(self, base_domain: str, settings: Optional[LinkSettings] = None):
+        self.base_domain = base_domain
+        self.settings = settings or LinkSettings()
+        self._social = DomainSuffixSet(self.settings.social_domains)
+        self._excluded = DomainSuffixSet(self.settings.excluded_domains)
+        self._extensions = tuple(extension.lower() for extension in self.settings.excluded_extensions)
+        self._schemes = frozenset(scheme.lower().rstrip(':') for scheme in self.settings.excluded_schemes)
+        # netloc -> kind, or None for excluded hosts
+        self._host_kinds: Dict[str, Optional[str]] = {}
+
+    def host_kind(self, netloc: str) -> Optional[str]:
+        """Kind of link a host makes, or None if links to it are dropped"""
+        try:
+            return self._host_kinds[netloc]
+        except KeyError:
+            pass
+        if not netloc:
+            kind = OTHER
+        elif netloc == self.base_domain:
+            kind = INTERNAL
+        else:
+            # Matched without userinfo, port or case
+            host = netloc.rpartition('@')[2].lower()
+            if host.startswith('['):
+                host = host.partition(']')[0] + ']'
+            else:
+                host = host.partition(':')[0]
+            if host in self._excluded:
+                kind = None
+            elif host in self._social:
+                kind = SOCIAL
+            else:
+                kind = EXTERNAL
+        if len(self._host_kinds) >= self.MAX_CACHED_HOSTS:
+            self._host_kinds.clear()
+        self._host_kinds[netloc] = kind
+        return kind
+
+    def _resolve(self, href: str, base_url: str) -> Optional[Tuple[str, str, str]]:
+        """(absolute URL, netloc, kind) of an href, or None if it is dropped"""
+        try:
+            absolute_url = urljoin(base_url, href)
+            parts = urlsplit(absolute_url)
+        except ValueError as e:
+            logger.warning(f"Error processing link {href}: {str(e)}")
+            return None
+        # Skip mailto, tel, javascript links and non-HTML file extensions
+        if parts.scheme in self._schemes or parts.path.lower().endswith(self._extensions):
+            return None
+        kind = self.host_kind(parts.netloc)
+        if kind is None:
+            return None
+        return absolute_url, parts.netloc, kind
+
+    def classify(self, hrefs: Iterable[str], base_url: str) -> PageLinks:
+        """Resolve and classify all hrefs of the page at base_url"""
+        links = PageLinks()
+        resolved: Dict[str, Optional[Tuple[str, str, str]]] = {}
+        external: Dict[str, None] = {}
+        social: Dict[str, None] = {}
+        domain_counts: Counter = Counter()
+        for href in hrefs:
+            try:
+                link = resolved[href]
+            except KeyError:
+                link = resolved[href] = self._resolve(href, base_url)
+            if link is None:
+                continue
+            absolute_url, netloc, kind = link
+            links.urls.append(absolute_url)
+            if kind == INTERNAL:
+                links.internal.append(absolute_url)
+            elif kind == EXTERNAL:
+                external[absolute_url] = None
+                domain_counts[netloc] += 1
+            elif kind == SOCIAL:
+                social[absolute_url] = None
+        links.external = list(external)
+        links.social = list(social)
+        links.domain_counts = dict(domain_counts)
+        return links
@@ -0,0 +1,262 @@
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Per-page phases, in the order a page goes through them
+PHASES = ('connect', 'ttfb', 'download', 'parse', 'extract', 'links')
+NETWORK_PHASES = ('connect', 'ttfb', 'download')
+
+# Upper bounds (seconds) of the Prometheus phase histogram buckets
+PHASE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_METRIC_HELP = {
+    'webscraper_requests_total': ('counter', 'HTTP requests by response status ("error" when none arrived)'),
+    'webscraper_retries_total': ('counter', 'Requests retried after a retryable status'),
+    'webscraper_pages_total': ('counter', 'Pages fetched and processed'),
+    'webscraper_bytes_downloaded_total': ('counter', 'Response body bytes downloaded for pages'),
+    'webscraper_phase_seconds': ('histogram', 'Time spent per page in each crawl phase'),
+    'webscraper_frontier_depth': ('gauge', 'URLs waiting in the frontier of the most recently sampled crawl'),
+    'webscraper_active_crawls': ('gauge', 'Crawls currently running'),
+}
+
+
+class PageTimings:
+    """
+    Phase durations of one page, accumulated while it is fetched and
+    processed. `trace` is an httpx trace hook: it times connection setup
+    (DNS lookup, TCP connect and TLS) and the wait for the response
+    headers, adding up across retries.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.bytes_downloaded = 0
+        self.retries = 0
+        self.headers_received: Optional[float] = None  # perf_counter() when the last response's headers arrived
+        self._started: Dict[str, float] = {}
+
+    async def trace(self, event_name: str, info: Dict):
+        now = time.perf_counter()
+        step, _, stage = event_name.rpartition('.')
+        step = step.rpartition('.')[2]
+        if stage == 'started':
+            self._started[step] = now
+        elif stage == 'complete':
+            if step in ('connect_tcp', 'start_tls'):
+                self.phases['connect'] += now - self._started.pop(step, now)
+            elif step == 'receive_response_headers':
+                self.phases['ttfb'] += now - self._started.pop('send_request_headers', now)
+                self.headers_received = now
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] += seconds
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - started
+
+    def as_dict(self) -> Dict:
+        timings = {f'{phase}_ms': round(seconds * 1000, 3) for phase, seconds in self.phases.items()}
+        timings.update(bytes_downloaded=self.bytes_downloaded, retries=self.retries)
+        return timings
+
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and histograms, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        # Pages are processed in worker threads, so updates take a lock
+        self._lock = threading.Lock()
+        self._counters: Counter = Counter()
+        self._gauges: Dict[Tuple, float] = {}
+        # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._histograms: Dict[Tuple, List[float]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def add_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            key = self._key(name, labels)
+            self._gauges[key] = self._gauges.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        with self._lock:
+            key = self._key(name, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(PHASE_BUCKETS) + 1) + [0.0]
+            for index, bound in enumerate(PHASE_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[len(PHASE_BUCKETS)] += 1
+            histogram[-1] += value
+
+    @staticmethod
+    def _labels(labels: Tuple, **extra) -> str:
+        pairs = list(labels) + list(extra.items())
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            series: Dict[str, List[str]] = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                series.setdefault(name, []).append(f'{name}{self._labels(labels)} {value:g}')
+            for (name, labels), value in sorted(self._gauges.items()):
+                series.setdefault(name, []).append(f'{name}{self._labels(labels)} {value:g}')
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                lines = series.setdefault(name, [])
+                for bound, count in zip(PHASE_BUCKETS, histogram):
+                    lines.append(f'{name}_bucket{self._labels(labels, le=f"{bound:g}")} {count}')
+                lines.append(f'{name}_bucket{self._labels(labels, le="+Inf")} {histogram[len(PHASE_BUCKETS)]}')
+                lines.append(f'{name}_sum{self._labels(labels)} {histogram[-1]:g}')
+                lines.append(f'{name}_count{self._labels(labels)} {histogram[len(PHASE_BUCKETS)]}')
+        output = []
+        for name, lines in series.items():
+            kind, help_text = _METRIC_HELP.get(name, ('untyped', name))
+            output.append(f'# HELP {name} {help_text}')
+            output.append(f'# TYPE {name} {kind}')
+            output.extend(lines)
+        return '\n'.join(output) + '\n'
+
+
+_shared_registry: Optional[MetricsRegistry] = None
+
+
+def get_shared_metrics() -> MetricsRegistry:
+    """The process-wide registry served at /metrics"""
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = MetricsRegistry()
+    return _shared_registry
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class CrawlMetrics:
+    """
+    Per-crawl request and page statistics behind the optional `timings`
+    section. Everything recorded here also feeds the process-wide registry.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or get_shared_metrics()
+        self.started = time.perf_counter()
+        self.phase_samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+        self.status_codes: Counter = Counter()
+        self.requests = 0
+        self.retries = 0
+        self.pages = 0
+        self.bytes_downloaded = 0
+        self.queue_depth_max = 0
+        self._queue_depth_total = 0
+        self._queue_samples = 0
+
+    def record_response(self, status_code: Optional[int]):
+        status = str(status_code) if status_code is not None else 'error'
+        self.requests += 1
+        self.status_codes[status] += 1
+        self.registry.inc('webscraper_requests_total', status=status)
+
+    def record_retry(self):
+        self.retries += 1
+        self.registry.inc('webscraper_retries_total')
+
+    def record_page(self, timings: PageTimings):
+        self.pages += 1
+        self.bytes_downloaded += timings.bytes_downloaded
+        for phase, seconds in timings.phases.items():
+            self.phase_samples[phase].append(seconds)
+            self.registry.observe('webscraper_phase_seconds', seconds, phase=phase)
+        self.registry.inc('webscraper_pages_total')
+        self.registry.inc('webscraper_bytes_downloaded_total', timings.bytes_downloaded)
+
+    def observe_queue(self, depth: int):
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+        self._queue_depth_total += depth
+        self._queue_samples += 1
+        self.registry.set_gauge('webscraper_frontier_depth', depth)
+
+    def summary(self) -> Dict:
+        phases = {}
+        for phase, samples in self.phase_samples.items():
+            ordered = sorted(samples)
+            total = sum(ordered)
+            phases[phase] = {
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total / len(ordered) * 1000, 3) if ordered else 0.0,
+                'p50_ms': round(_percentile(ordered, 0.5) * 1000, 3) if ordered else 0.0,
+                'p95_ms': round(_percentile(ordered, 0.95) * 1000, 3) if ordered else 0.0,
+                'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0
+            }
+        network_ms = sum(phases[phase]['total_ms'] for phase in NETWORK_PHASES)
+        processing_ms = sum(stats['total_ms'] for phase, stats in phases.items() if phase not in NETWORK_PHASES)
+        return {
+            'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'pages': self.pages,
+            'requests': self.requests,
+            'retries': self.retries,
+            'status_codes': dict(self.status_codes),
+            'bytes_downloaded': self.bytes_downloaded,
+            'phases': phases,
+            'network_ms': round(network_ms, 3),
+            'processing_ms': round(processing_ms, 3),
+            # Whichever side the pages spent more time in
+            'bound': 'network' if network_ms >= processing_ms else 'processing',
+            'queue_depth': {
+                'max': self.queue_depth_max,
+                'mean': round(self._queue_depth_total / self._queue_samples, 2) if self._queue_samples else 0.0
+            }
+        }
+
+
+def profile_call(func: Callable, path: str, top: int = 25):
+    """
+    Run func under cProfile, including the worker threads it starts, save
+    the stats to `path` (for snakeviz, flameprof or gprof2dot) and print
+    the top entries by cumulative time to stderr.
+    """
+    thread_profilers: List[cProfile.Profile] = []
+
+    def start_thread_profiler(*_):
+        # Called once as each new thread starts; the profiler then takes over the hook
+        profiler = cProfile.Profile()
+        thread_profilers.append(profiler)
+        profiler.enable()
+
+    profiler = cProfile.Profile()
+    threading.setprofile(start_thread_profiler)
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        threading.setprofile(None)
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        for thread_profiler in thread_profilers:
+            stats.add(thread_profiler)
+        stats.dump_stats(path)
+        stats.sort_stats('cumulative').print_stats(top)
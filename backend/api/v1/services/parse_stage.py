@@ -0,0 +1,128 @@
+import asyncio
+import codecs
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from api.v1.services.crawl_state import content_hash
+from api.v1.services.extraction import ExtractedPage, extract_markup
+from api.v1.services.metrics import PageTimings
+
+logger = logging.getLogger(__name__)
+
+# 'inline' parses on the fetch path and in the default thread pool;
+# 'process' and 'thread' hand raw bodies to a dedicated parse pool
+PARSE_MODES = ('inline', 'process', 'thread')
+
+
+@dataclass
+class ParseJob:
+    """Everything a parse worker needs; small and picklable"""
+    url: str
+    body: bytes
+    encoding: Optional[str]
+    content_type: str
+    engine: str
+    sketch: bool
+    hash_content: bool  # Incremental mode compares body hashes with the previous crawl
+
+
+@dataclass
+class ParsedPage:
+    """What comes back from a parse worker: the extracted data, not the document"""
+    extracted: ExtractedPage
+    content_hash: Optional[str]
+    parse_seconds: float
+    extract_seconds: float
+
+
+def decode_body(body: bytes, encoding: Optional[str]) -> str:
+    """Decode a body the way httpx's Response.text does"""
+    try:
+        codecs.lookup(encoding or 'utf-8')
+    except LookupError:
+        encoding = None
+    return body.decode(encoding or 'utf-8', errors='replace')
+
+
+def parse_markup(job: ParseJob) -> ParsedPage:
+    """Parse pool entry point: decode, hash and extract one page"""
+    text = decode_body(job.body, job.encoding)
+    timings = PageTimings()
+    extracted = extract_markup(text, job.content_type, job.engine, sketch=job.sketch, timings=timings, url=job.url)
+    return ParsedPage(
+        extracted=extracted,
+        content_hash=content_hash(text) if job.hash_content else None,
+        parse_seconds=timings.phases['parse'],
+        extract_seconds=timings.phases['extract']
+    )
+
+
+_shared_executors: Dict[Tuple[str, int], Executor] = {}
+
+
+def _shared_executor(mode: str, workers: int) -> Executor:
+    """Parse pools are shared by every crawl in the process; worker start-up is paid once"""
+    key = (mode, workers)
+    executor = _shared_executors.get(key)
+    if executor is None:
+        if mode == 'process':
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='parse')
+        _shared_executors[key] = executor
+    return executor
+
+
+def _discard_executor(mode: str, workers: int):
+    executor = _shared_executors.pop((mode, workers), None)
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def close_shared_parse_pools():
+    for executor in _shared_executors.values():
+        executor.shutdown(wait=True, cancel_futures=True)
+    _shared_executors.clear()
+
+
+class ParseStage:
+    """
+    Hands raw page bodies to a pool of parse workers so parsing can use
+    more than one core. At most `max_pending` pages wait for or occupy a
+    worker; beyond that, fetch workers block before handing over their
+    page, and so stop fetching until the parsers catch up.
+    """
+
+    def __init__(self, mode: str = 'process', workers: Optional[int] = None, max_pending: Optional[int] = None):
+        if mode not in ('process', 'thread'):
+            raise ValueError(f"Unknown parse mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self._slots = asyncio.Semaphore(max_pending or self.workers * 2)
+        self.parsed_pages = 0
+        self.failed_pages = 0
+
+    async def parse(self, job: ParseJob) -> Optional[ParsedPage]:
+        """The parsed page, or None if the worker failed and the caller should parse it itself"""
+        async with self._slots:
+            executor = _shared_executor(self.mode, self.workers)
+            try:
+                parsed = await asyncio.get_running_loop().run_in_executor(executor, parse_markup, job)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); the next page gets a fresh pool
+                logger.warning(f"Parse worker crashed while parsing {job.url}; restarting the parse pool")
+                _discard_executor(self.mode, self.workers)
+                self.failed_pages += 1
+                return None
+            except Exception as e:
+                logger.warning(f"Parse worker failed for {job.url}: {str(e)}")
+                self.failed_pages += 1
+                return None
+        self.parsed_pages += 1
+        return parsed
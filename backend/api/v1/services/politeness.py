@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+# Seconds of request history behind the observed request rate
+RATE_WINDOW = 1.0
+# How far the allowed rate may run ahead of the observed rate
+RATE_HEADROOM = 4.0
+
+# Seconds a host's robots.txt is kept; a failed fetch is retried sooner
+ROBOTS_TTL = 3600.0
+ROBOTS_ERROR_TTL = 60.0
+
+
+@dataclass(frozen=True)
+class PolitenessSettings:
+    """Per-host rate control tunables"""
+    initial_rate: float = 8.0  # Requests per second when a host is first seen
+    min_rate: float = 0.2
+    max_rate: Optional[float] = None  # Hard ceiling; None leaves the rate to AIMD, 429/503s, Retry-After and Crawl-delay
+    rate_increase: float = 1.0  # Additive increase per healthy response
+    decrease_factor: float = 0.5  # Multiplicative decrease on 429/503/slow responses
+    initial_concurrency: int = 2
+    slow_response_seconds: float = 5.0
+    decrease_cooldown: float = 1.0  # Back off at most once per this many seconds
+    max_retry_after: float = 60.0  # Never sleep longer than this on a Retry-After header
+    respect_robots: bool = True
+    robots_timeout: float = 5.0
+
+
+def parse_crawl_delay(robots_text: str, user_agent: str = '*') -> Optional[float]:
+    """
+    Read Crawl-delay for a user agent from robots.txt.
+    urllib's RobotFileParser only accepts whole seconds, so this parses fractions too.
+    """
+    agent = user_agent.lower()
+    group_agents = []
+    in_rules = False
+    delays: Dict[str, float] = {}
+    for raw_line in robots_text.splitlines():
+        line = raw_line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        key, value = (part.strip() for part in line.split(':', 1))
+        key = key.lower()
+        if key == 'user-agent':
+            if in_rules:
+                group_agents = []
+                in_rules = False
+            group_agents.append(value.lower())
+        else:
+            in_rules = True
+            if key == 'crawl-delay':
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for group_agent in group_agents:
+                    delays.setdefault(group_agent, delay)
+    if agent != '*':
+        for group_agent, delay in delays.items():
+            if group_agent != '*' and group_agent in agent:
+                return delay
+    return delays.get('*')
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HostThrottle:
+    """
+    Token-bucket rate limiter with an AIMD concurrency window for one host.
+    The rate and window shrink multiplicatively when the host pushes back
+    and grow additively while responses stay healthy; before the first
+    push-back the rate doubles every window. Unless max_rate or Crawl-delay
+    sets a ceiling, the host's responses alone decide how fast it is crawled.
+    """
+
+    def __init__(self, host: str, settings: PolitenessSettings, max_concurrency: int,
+                 crawl_delay: Optional[float] = None):
+        self.host = host
+        self.settings = settings
+        self.rate = settings.initial_rate
+        self.set_crawl_delay(crawl_delay)
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(min(max(1, settings.initial_concurrency), self.max_concurrency))
+        self.in_flight = 0
+        self.tokens = 1.0
+        self.blocked_until = 0.0
+        self.throttled_responses = 0
+        self._last_decrease = 0.0
+        # Until the host first pushes back the rate grows multiplicatively, like TCP slow start
+        self._slow_start = True
+        self._last_refill = time.monotonic()
+        self._recent_starts: Deque[float] = deque()  # Request start times over the last RATE_WINDOW seconds
+        self._lock = asyncio.Lock()
+        self._slot_freed = asyncio.Event()
+
+    def set_crawl_delay(self, crawl_delay: Optional[float]):
+        self.crawl_delay = crawl_delay
+        self.max_rate = self.settings.max_rate
+        if crawl_delay:
+            # Crawl-delay is the minimum spacing between requests
+            self.max_rate = 1.0 / crawl_delay if self.max_rate is None else min(self.max_rate, 1.0 / crawl_delay)
+        if self.max_rate is not None:
+            self.rate = min(self.rate, self.max_rate)
+
+    @property
+    def burst(self) -> float:
+        return 1.0 if self.crawl_delay else max(1.0, float(int(self.concurrency)))
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """Wait for a free concurrency slot and a rate token"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                if self.in_flight >= int(self.concurrency):
+                    self._slot_freed.clear()
+                    await self._slot_freed.wait()
+                    continue
+                self._refill(now)
+                if self.tokens < 1.0:
+                    await asyncio.sleep((1.0 - self.tokens) / self.rate)
+                    continue
+                self.tokens -= 1.0
+                self.in_flight += 1
+                self._recent_starts.append(now)
+                self._forget_starts(now)
+                return
+
+    def release_slot(self):
+        """Return a slot without adapting the rate, for a request that was abandoned (e.g. cancelled)"""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._slot_freed.set()
+
+    def release(self, status_code: Optional[int], elapsed: float, retry_after: Optional[float] = None):
+        """Return a slot and adapt rate/concurrency to how the host responded"""
+        self.release_slot()
+
+        if retry_after is not None:
+            delay = min(retry_after, self.settings.max_retry_after)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+        if status_code in THROTTLE_STATUSES or status_code is None or elapsed > self.settings.slow_response_seconds:
+            if status_code in THROTTLE_STATUSES:
+                self.throttled_responses += 1
+            self._decrease()
+        elif status_code < 500:
+            self._increase()
+
+    def _forget_starts(self, now: float):
+        while self._recent_starts and self._recent_starts[0] < now - RATE_WINDOW:
+            self._recent_starts.popleft()
+
+    def _observed_rate(self, now: float) -> Optional[float]:
+        """Requests per second actually started over the last RATE_WINDOW seconds"""
+        self._forget_starts(now)
+        if len(self._recent_starts) < 2:
+            return None
+        return len(self._recent_starts) / max(now - self._recent_starts[0], 1e-3)
+
+    def _decrease(self):
+        # Responses already in flight when the host pushed back shouldn't compound the cut
+        now = time.monotonic()
+        if now - self._last_decrease < self.settings.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self._slow_start = False
+        # The allowed rate may be above what was actually sent; cut from whichever is lower
+        observed = self._observed_rate(now)
+        rate = self.rate if observed is None else min(self.rate, observed)
+        self.rate = max(self.settings.min_rate, rate * self.settings.decrease_factor)
+        self.concurrency = max(1.0, self.concurrency * self.settings.decrease_factor)
+
+    def _increase(self):
+        if self._slow_start:
+            # Doubles about once per concurrency window of healthy responses
+            self.rate += max(self.settings.rate_increase, self.rate / self.concurrency)
+        else:
+            self.rate += self.settings.rate_increase
+        # Concurrency or the site's latency may be what limits the crawl; don't let the rate run off past it
+        observed = self._observed_rate(time.monotonic())
+        if observed is not None:
+            self.rate = min(self.rate, max(self.settings.initial_rate, RATE_HEADROOM * observed))
+        if self.max_rate is not None:
+            self.rate = min(self.max_rate, self.rate)
+        # Roughly +1 slot per window of healthy responses
+        self.concurrency = min(float(self.max_concurrency), self.concurrency + 1.0 / self.concurrency)
+
+    def stats(self) -> Dict:
+        return {
+            'requests_per_second': round(self.rate, 3),
+            'concurrency': int(self.concurrency),
+            'crawl_delay': self.crawl_delay,
+            'throttled_responses': self.throttled_responses
+        }
+
+
+class PolitenessScheduler:
+    """
+    Hands out one HostThrottle per host (and politeness configuration),
+    seeded from robots.txt Crawl-delay. robots.txt is cached for
+    ROBOTS_TTL, so a scheduler shared across crawls fetches it once per host
+    and keeps each host's learned rate between crawls.
+    """
+
+    MAX_HOSTS = 10_000  # Idle throttles and robots.txt entries beyond this are dropped, oldest first
+
+    def __init__(self, settings: Optional[PolitenessSettings] = None, per_host_concurrency: int = 4,
+                 user_agent: str = '*'):
+        self.settings = settings or PolitenessSettings()
+        self.per_host_concurrency = per_host_concurrency
+        self.user_agent = user_agent
+        self._throttles: "OrderedDict[Tuple[str, PolitenessSettings, int], HostThrottle]" = OrderedDict()
+        # host -> (expires at, parsed robots.txt and Crawl-delay or None)
+        self._robots: "OrderedDict[str, Tuple[float, Optional[Tuple[RobotFileParser, Optional[float]]]]]" = OrderedDict()
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+    async def _load_robots(self, client: httpx.AsyncClient, scheme: str, host: str,
+                           timeout: float) -> Tuple[Optional[Tuple[RobotFileParser, Optional[float]]], float]:
+        """
+        Fetch and parse robots.txt for a host, with how long to keep the
+        result; a missing or broken file means no rules
+        """
+        robots_url = f"{scheme}://{host}/robots.txt"
+        try:
+            response = await client.get(robots_url, timeout=timeout)
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not fetch {robots_url}: {str(e)}")
+            return None, ROBOTS_ERROR_TTL
+        if response.status_code != 200:
+            return None, ROBOTS_TTL
+        parser = RobotFileParser(robots_url)
+        parser.parse(response.text.splitlines())
+        return (parser, parse_crawl_delay(response.text, self.user_agent)), ROBOTS_TTL
+
+    def _fresh_robots(self, host: str) -> Optional[Tuple[float, Optional[Tuple[RobotFileParser, Optional[float]]]]]:
+        entry = self._robots.get(host)
+        return entry if entry is not None and entry[0] > time.monotonic() else None
+
+    async def _robots_for_host(self, client: httpx.AsyncClient, scheme: str, host: str,
+                               timeout: float) -> Optional[Tuple[RobotFileParser, Optional[float]]]:
+        entry = self._fresh_robots(host)
+        if entry is not None:
+            return entry[1]
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            # Another crawl may have loaded it while this one waited
+            entry = self._fresh_robots(host)
+            if entry is None:
+                loaded, ttl = await self._load_robots(client, scheme, host, timeout)
+                entry = self._robots[host] = (time.monotonic() + ttl, loaded)
+                self._robots.move_to_end(host)
+                while len(self._robots) > self.MAX_HOSTS:
+                    evicted, _ = self._robots.popitem(last=False)
+                    self._host_locks.pop(evicted, None)
+        return entry[1]
+
+    def robots_for(self, host: str) -> Optional[RobotFileParser]:
+        entry = self._robots.get(host)
+        return entry[1][0] if entry is not None and entry[1] is not None else None
+
+    def sitemaps_for(self, host: str) -> List[str]:
+        """Sitemap: entries from the host's robots.txt, once it has been loaded"""
+        robots = self.robots_for(host)
+        return list(robots.site_maps() or []) if robots is not None else []
+
+    async def throttle_for(self, client: httpx.AsyncClient, url: str, settings: Optional[PolitenessSettings] = None,
+                           per_host_concurrency: Optional[int] = None) -> HostThrottle:
+        """The host's throttle for these settings (the scheduler's own by default)"""
+        settings = settings or self.settings
+        per_host_concurrency = per_host_concurrency or self.per_host_concurrency
+        parsed = urlparse(url)
+        host = parsed.netloc
+        key = (host, settings, per_host_concurrency)
+        throttle = self._throttles.get(key)
+        if throttle is not None and (not settings.respect_robots or self._fresh_robots(host) is not None):
+            self._throttles.move_to_end(key)
+            return throttle
+
+        crawl_delay = None
+        if settings.respect_robots:
+            robots = await self._robots_for_host(client, parsed.scheme or 'https', host, settings.robots_timeout)
+            if robots is not None:
+                crawl_delay = robots[1]
+        throttle = self._throttles.get(key)
+        if throttle is None:
+            throttle = self._throttles[key] = HostThrottle(host, settings, per_host_concurrency, crawl_delay)
+            self._evict_throttles()
+        elif throttle.crawl_delay != crawl_delay:
+            # robots.txt was reloaded and changed
+            throttle.set_crawl_delay(crawl_delay)
+        self._throttles.move_to_end(key)
+        return throttle
+
+    def _evict_throttles(self):
+        excess = len(self._throttles) - self.MAX_HOSTS
+        if excess <= 0:
+            return
+        idle = [key for key, throttle in self._throttles.items() if not throttle.in_flight][:excess]
+        for key in idle:
+            del self._throttles[key]
+
+    def stats(self, host: str, settings: Optional[PolitenessSettings] = None,
+              per_host_concurrency: Optional[int] = None) -> Optional[Dict]:
+        throttle = self._throttles.get((host, settings or self.settings, per_host_concurrency or self.per_host_concurrency))
+        return throttle.stats() if throttle else None
+
+
+_shared_scheduler: Optional[PolitenessScheduler] = None
+
+
+def get_shared_scheduler() -> PolitenessScheduler:
+    """Process-wide scheduler used by the API alongside the shared client pool; created on first use"""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        _shared_scheduler = PolitenessScheduler()
+    return _shared_scheduler
+
+
+def close_shared_scheduler():
+    global _shared_scheduler
+    _shared_scheduler = None
@@ -0,0 +1,82 @@
+import gzip
+import importlib.util
+from typing import Any, Optional
+
+import orjson
+
+# Output formats; msgpack needs the optional msgpack package
+FORMATS = ('json', 'msgpack')
+MEDIA_TYPES = {'json': 'application/json', 'msgpack': 'application/msgpack'}
+
+# Response compression, best first; br needs the optional brotli package
+CONTENT_ENCODINGS = ('br', 'gzip')
+MIN_COMPRESS_BYTES = 1024  # Smaller bodies are sent as they are
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Brotli's higher qualities cost far more CPU for a few percent
+
+
+def format_available(format: str) -> bool:
+    return format == 'json' or (format == 'msgpack' and importlib.util.find_spec('msgpack') is not None)
+
+
+def encoding_available(encoding: str) -> bool:
+    return encoding == 'gzip' or (encoding == 'br' and importlib.util.find_spec('brotli') is not None)
+
+
+def dumps(data: Any, format: str = 'json', pretty: bool = False) -> bytes:
+    """Encode plain dicts, lists and scalars as JSON (orjson) or msgpack"""
+    if format == 'msgpack':
+        import msgpack
+
+        return msgpack.packb(data, use_bin_type=True)
+    # Non-string keys (e.g. link graph depths) become strings, as with json.dumps
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=option)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        import brotli
+
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _accepted(header: Optional[str]) -> dict:
+    """Values of an Accept or Accept-Encoding header mapped to their q-values"""
+    accepted = {}
+    for item in (header or '').split(','):
+        value, *params = [part.strip() for part in item.split(';')]
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, number = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        accepted[value.lower()] = quality
+    return accepted
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """msgpack when the client prefers it and it is installed, otherwise JSON"""
+    accepted = _accepted(accept)
+    msgpack_quality = max(accepted.get('application/msgpack', 0.0), accepted.get('application/x-msgpack', 0.0))
+    json_quality = max(accepted.get('application/json', 0.0), accepted.get('*/*', 0.0), accepted.get('application/*', 0.0))
+    if msgpack_quality > 0 and msgpack_quality >= json_quality and format_available('msgpack'):
+        return 'msgpack'
+    return 'json'
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The best available content encoding the client accepts, or None"""
+    accepted = _accepted(accept_encoding)
+    for encoding in CONTENT_ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0 and encoding_available(encoding):
+            return encoding
+    return None
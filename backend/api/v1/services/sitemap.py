@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import zlib
+from collections import deque
+from io import BytesIO
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from lxml import etree
+
+if TYPE_CHECKING:
+    from api.v1.services.website_scraper import WebsiteScraperService
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class SitemapDiscovery:
+    """
+    Reads robots.txt Sitemap: entries and /sitemap.xml, follows sitemap
+    indexes and gzipped sitemaps, and returns the listed page URLs.
+    """
+
+    def __init__(self, scraper: 'WebsiteScraperService', fetch: Callable[[str], Awaitable[Optional[bytes]]],
+                 max_urls: int = 500, max_sitemaps: int = 50, max_bytes: int = 5 * 1024 * 1024):
+        self.scraper = scraper
+        self.fetch = fetch
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.max_bytes = max_bytes  # Cap on a sitemap's size, compressed or not
+        self.sitemaps_read = 0
+
+    def _decompress(self, body: bytes, url: str) -> bytes:
+        # .xml.gz files are served as-is; Content-Encoding: gzip is already undone by httpx
+        if body[:2] == GZIP_MAGIC:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                body = decompressor.decompress(body, self.max_bytes)
+            except zlib.error as e:
+                logger.warning(f"Could not decompress sitemap {url}: {str(e)}")
+                return b''
+            if decompressor.unconsumed_tail:
+                logger.warning(f"Sitemap {url} decompresses to more than {self.max_bytes} bytes; truncating")
+        return body
+
+    @staticmethod
+    def _text(element, name: str) -> str:
+        for child in element:
+            if isinstance(child.tag, str) and etree.QName(child).localname == name:
+                return (child.text or '').strip()
+        return ''
+
+    def _read(self, body: bytes, url: str, seen_pages: set, limit: int) -> Tuple[List[str], List[Dict]]:
+        """
+        Child sitemaps and up to `limit` new same-host page entries of one
+        sitemap. Runs in a worker thread; elements are streamed and cleared,
+        and reading stops as soon as the limit is reached.
+        """
+        children: List[str] = []
+        entries: List[Dict] = []
+        events = etree.iterparse(BytesIO(self._decompress(body, url)), events=('end',), recover=True,
+                                 resolve_entities=False, no_network=True)
+        try:
+            for _, element in events:
+                if not isinstance(element.tag, str):
+                    continue
+                name = etree.QName(element).localname
+                if name == 'sitemap':
+                    # Sitemap index: the caller queues the child sitemaps
+                    child = self._text(element, 'loc')
+                    if child:
+                        children.append(child)
+                elif name == 'url':
+                    loc = self._text(element, 'loc')
+                    if loc and urlparse(loc).netloc == self.scraper.base_domain:
+                        normalized = self.scraper._normalize_url(loc)
+                        if normalized not in seen_pages:
+                            seen_pages.add(normalized)
+                            try:
+                                priority = float(self._text(element, 'priority') or 0.5)
+                            except ValueError:
+                                priority = 0.5
+                            entries.append({
+                                'url': normalized,
+                                'priority': priority,
+                                'lastmod': self._text(element, 'lastmod') or None
+                            })
+                            if len(entries) >= limit:
+                                break
+                else:
+                    continue
+                element.clear()
+        except etree.LxmlError as e:
+            logger.warning(f"Could not parse sitemap {url}: {str(e)}")
+        return children, entries
+
+    async def discover(self, robots_sitemaps: Optional[List[str]] = None) -> List[Dict]:
+        """Return [{'url', 'priority', 'lastmod'}] for same-host pages, in sitemap order"""
+        base_url = self.scraper.domain
+        pending = deque(robots_sitemaps or [])
+        if not pending:
+            pending.append(urljoin(base_url + '/', '/sitemap.xml'))
+        queued = set(pending)
+        entries: List[Dict] = []
+        seen_pages = set()
+
+        while pending and self.sitemaps_read < self.max_sitemaps and len(entries) < self.max_urls:
+            sitemap_url = pending.popleft()
+            body = await self.fetch(sitemap_url)
+            if not body:
+                continue
+            self.sitemaps_read += 1
+            # Up to max_bytes of XML; parsed off the event loop
+            children, found = await asyncio.to_thread(
+                self._read, body, sitemap_url, seen_pages, self.max_urls - len(entries)
+            )
+            entries.extend(found)
+            for child in children:
+                if child not in queued:
+                    queued.add(child)
+                    pending.append(child)
+
+        return entries
@@ -1,22 +1,27 @@
-import requests
-from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
-from urllib.parse import urljoin, urlparse, urlunparse
-from typing import Dict, List, Tuple, Optional
+from urllib.parse import urldefrag, urlparse, urlunparse
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Tuple, Optional
+import asyncio
 import re
-import warnings
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from api.v1.services.cache import AnalysisCache
+from api.v1.services.client_pool import ClientPool
+from api.v1.services.crawl_state import CrawlState, CrawlStateStore, content_hash
+from api.v1.services.crawler import AsyncCrawlEngine, CrawlSettings, FetchedPage
+from api.v1.services.extraction import HEADING_TAGS, ExtractedPage, IncrementalExtractor, extract_markup, parse_soup
+from api.v1.services.links import LinkClassifier, PageLinks
+from api.v1.services.politeness import PolitenessScheduler
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
-# Filter XML parsing warning
-warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+logger = logging.getLogger(__name__)
 
 class WebsiteScraperService:
-    def __init__(self, url: str, max_pages_to_count: int = 500, max_pages_to_analyze: int = 20, is_single_page: bool = False):
+    def __init__(self, url: str, max_pages_to_count: int = 500, max_pages_to_analyze: int = 20, is_single_page: bool = False,
+                 crawl_settings: Optional[CrawlSettings] = None, client_pool: Optional[ClientPool] = None,
+                 cache: Optional[AnalysisCache] = None, incremental: bool = False,
+                 state_store: Optional[CrawlStateStore] = None, scheduler: Optional[PolitenessScheduler] = None):
         # Always ensure proper URL format
         self.domain = url if url.startswith(('http://', 'https://')) else f'https://{url}'
         parsed_url = urlparse(self.domain)
@@ -35,92 +40,29 @@ class WebsiteScraperService:
             ))
             
         self.visited_urls = set()
-        self.session = self._create_session()
+        self.crawl_settings = crawl_settings or CrawlSettings()
+        self.link_classifier = LinkClassifier(self.base_domain, self.crawl_settings.links)
+        # Stored page entries are only reused by crawls whose settings give the same links and analysis
+        self._page_settings_key = AnalysisCache.settings_key(self.crawl_settings.links, self.crawl_settings.max_body_bytes)
+        # Shared connection pool (API); None means each crawl opens its own
+        self.client_pool = client_pool
+        # Shared politeness scheduler (API); None means each crawl fetches robots.txt and learns host rates anew
+        self.scheduler = scheduler
+        # Result cache; None disables caching and revalidation
+        self.cache = cache
+        # Incremental mode reuses the persisted state of the previous crawl
+        self.incremental = incremental
+        self.state_store = state_store or (CrawlStateStore() if incremental else None)
+        self.crawl_state: Optional[CrawlState] = None
         self.max_pages_to_count = max_pages_to_count
         self.max_pages_to_analyze = max_pages_to_analyze
         self.is_single_page = is_single_page
 
-    def _create_session(self) -> requests.Session:
-        """Create a session with retry strategy and proper headers"""
-        session = requests.Session()
-        
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=2,  # Reduced from 3 to 2 retries
-            backoff_factor=0.3,  # Reduced from 0.5 to 0.3
-            status_forcelist=[500, 502, 503, 504],  # HTTP status codes to retry on
-        )
-        
-        # Mount the retry adapter to both HTTP & HTTPS
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        # Set common headers
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        })
-        
-        return session
-
-    def _parse_content(self, content: str, content_type: Optional[str] = None) -> BeautifulSoup:
+    def _parse_content(self, content: str, content_type: Optional[str] = None) -> 'BeautifulSoup':
         """
         Parse content using the appropriate parser based on content type
         """
-        # Default to lxml for better compatibility
-        parser = 'lxml'
-        
-        if content_type:
-            content_type = content_type.lower()
-            if 'xml' in content_type:
-                # Use XML parser for XML content
-                return BeautifulSoup(content, features='xml')
-        
-        try:
-            return BeautifulSoup(content, parser)
-        except Exception as e:
-            logger.warning(f"Failed to parse with {parser}, falling back to html.parser: {str(e)}")
-            return BeautifulSoup(content, 'html.parser')
-
-    def _make_request(self, url: str) -> Optional[requests.Response]:
-        """Make a request with error handling"""
-        try:
-            response = self.session.get(url, timeout=15)  # Increased timeout for e-commerce pages
-            
-            # Handle common e-commerce platform redirects
-            if response.history:
-                # If we were redirected, use the final URL
-                final_url = response.url
-                if final_url != url:
-                    logger.info(f"Redirected from {url} to {final_url}")
-            
-            response.raise_for_status()
-            return response
-            
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                logger.error(f"Page not found (404): {url}")
-            elif e.response.status_code == 403:
-                logger.error(f"Access forbidden (403) - Website may be blocking automated access: {url}")
-            elif e.response.status_code == 429:
-                logger.error(f"Too many requests (429) - Rate limited by the website: {url}")
-            else:
-                logger.error(f"HTTP error {e.response.status_code} requesting {url}: {str(e)}")
-            return None
-            
-        except requests.exceptions.Timeout:
-            logger.error(f"Request timed out for {url}")
-            return None
-            
-        except requests.exceptions.TooManyRedirects:
-            logger.error(f"Too many redirects for {url}")
-            return None
-            
-        except requests.RequestException as e:
-            logger.error(f"Error requesting {url}: {str(e)}")
-            return None
+        return parse_soup(content, content_type)
 
     def _normalize_url(self, url: str) -> str:
         """Normalize URL by removing fragments, query parameters, and handling index pages"""
@@ -140,161 +82,321 @@ class WebsiteScraperService:
         ))
         return normalized.rstrip('/')
 
-    def _is_social_link(self, url: str) -> bool:
-        """Check if a URL is a social media link"""
-        social_domains = {
-            'facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com',
-            'youtube.com', 'pinterest.com', 'tiktok.com', 'github.com'
-        }
-        parsed_url = urlparse(url)
-        return any(domain in parsed_url.netloc for domain in social_domains)
-
-    def _extract_links_from_html(self, soup: BeautifulSoup, base_url: str) -> List[str]:
+    def _extract_links_from_html(self, soup: 'BeautifulSoup', base_url: str) -> List[str]:
         """Extract and normalize all links from HTML content"""
-        links = []
-        for anchor in soup.find_all('a', href=True):
-            href = anchor['href']
-            try:
-                absolute_url = urljoin(base_url, href)
-                # Skip mailto, tel, javascript links and non-HTML file extensions
-                parsed_url = urlparse(absolute_url)
-                path = parsed_url.path.lower()
-                excluded_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.pdf', '.mp4', '.webm', 
-                                    '.mp3', '.wav', '.css', '.js', '.ico', '.svg', '.woff', '.woff2')
-                if (not absolute_url.startswith(('mailto:', 'tel:', 'javascript:')) and 
-                    not path.endswith(excluded_extensions)):
-                    links.append(absolute_url)
-            except Exception as e:
-                logger.warning(f"Error processing link {href}: {str(e)}")
-        return links
-
-    def _analyze_page(self, url: str) -> Optional[Dict]:
-        """Analyze a single page and extract relevant information"""
-        response = self._make_request(url)
-        if not response:
-            return None
+        return self._resolve_links([anchor['href'] for anchor in soup.find_all('a', href=True)], base_url)
+
+    def _resolve_links(self, hrefs: List[str], base_url: str) -> List[str]:
+        """Make hrefs absolute, dropping mailto/tel/javascript links, non-HTML files and excluded hosts"""
+        return self.link_classifier.classify(hrefs, base_url).urls
+
+    def _classified_links(self, page: FetchedPage) -> PageLinks:
+        """A page's links sorted into internal, external and social"""
+        if page.classified_links is None:
+            # Links restored from a previous crawl were never classified
+            page.classified_links = self.link_classifier.classify(page.links, page.url)
+        return page.classified_links
+
+    def _uses_lxml_engine(self, page: FetchedPage) -> bool:
+        # The single-pass engine handles HTML; XML and XHTML keep the BeautifulSoup XML parser
+        return self.crawl_settings.extraction_engine == 'lxml' and 'xml' not in page.content_type
 
+    @property
+    def _sketch_pages(self) -> bool:
+        # Content sketches only feed near-duplicate detection across a crawl
+        settings = self.crawl_settings
+        return settings.detect_duplicates and not settings.head_only and not self.is_single_page
+
+    def _extract_page(self, page: FetchedPage) -> ExtractedPage:
+        """Pull title, description, headings and hrefs out of the page markup"""
+        return extract_markup(page.text, page.content_type, self.crawl_settings.extraction_engine,
+                              self.crawl_settings.head_only, self._sketch_pages, page.timings, page.url)
+
+    def _incremental_extractor(self, page: FetchedPage) -> Optional[IncrementalExtractor]:
+        """Extractor to feed while the body downloads, or None if the page needs its full text"""
+        if page.is_html and self._uses_lxml_engine(page):
+            return IncrementalExtractor(self.crawl_settings.head_only, self._sketch_pages)
+        return None
+
+    def _parse_page(self, page: FetchedPage) -> None:
+        """Parse a fetched page once and collect its links for analysis and crawling"""
+        # Only markup is worth parsing; images, PDFs etc. are counted but never parsed
+        if not page.is_markup:
+            return
+        try:
+            # Streamed pages were already extracted while downloading
+            if page.extracted is None:
+                page.extracted = self._extract_page(page)
+            with page.timings.phase('links'):
+                page.classified_links = self.link_classifier.classify(page.extracted.hrefs, page.url)
+                page.links = page.classified_links.urls
+        except Exception as e:
+            logger.error(f"Error parsing page {page.url}: {str(e)}")
+
+    def _build_page_analysis(self, page: FetchedPage) -> Optional[Dict]:
+        """Build the analysis of an already fetched and parsed page"""
         # Check if content type is HTML
-        content_type = response.headers.get('content-type', '').lower()
-        if not ('text/html' in content_type or 'application/xhtml+xml' in content_type):
+        if not page.is_html or page.extracted is None:
             return None
 
         try:
-            soup = self._parse_content(response.text, content_type)
-            
-            # Extract meta information
-            meta_title = soup.find('title')
-            meta_description = soup.find('meta', {'name': 'description'})
+            extracted = page.extracted
+            meta_title = extracted.title or ''
+            meta_description = extracted.description or ''
             
             # Extract headings
             headings = {}
             heading_counts = {}
-            for level in range(1, 7):
-                tag = f'h{level}'
-                elements = soup.find_all(tag)
+            for tag in HEADING_TAGS:
+                elements = extracted.headings.get(tag)
                 if elements:
-                    headings[tag] = [{'content': h.get_text(strip=True), 'count': 1} for h in elements]
+                    headings[tag] = [{'content': text, 'count': 1} for text in elements]
                     heading_counts[tag] = len(elements)
             
-            # Extract links
-            all_links = self._extract_links_from_html(soup, url)
-            external_links = []
-            external_domains = set()
-            social_links = []
-            
-            for link in all_links:
-                try:
-                    parsed_link = urlparse(link)
-                    if parsed_link.netloc and parsed_link.netloc != self.base_domain:
-                        if self._is_social_link(link):
-                            social_links.append(link)
-                        else:
-                            external_links.append(link)
-                            external_domains.add(parsed_link.netloc)
-                except Exception as e:
-                    logger.warning(f"Error processing link {link}: {str(e)}")
-            
+            # Links were classified when the page was parsed
+            links = page.classified_links
+            if links is None:
+                with page.timings.phase('links'):
+                    links = self.link_classifier.classify(page.links, page.url)
+
             return {
-                'url': url,
+                'url': page.url,
                 'meta_title': {
-                    'content': meta_title.get_text(strip=True) if meta_title else '',
-                    'content_length': len(meta_title.get_text(strip=True)) if meta_title else 0
+                    'content': meta_title,
+                    'content_length': len(meta_title)
                 },
                 'meta_description': {
-                    'content': meta_description['content'] if meta_description else '',
-                    'content_length': len(meta_description['content']) if meta_description else 0
+                    'content': meta_description,
+                    'content_length': len(meta_description)
                 },
-                'external_links': list(set(external_links)),
-                'external_domains': list(external_domains),
-                'social_links': list(set(social_links)),
+                'external_links': links.external,
+                'external_domains': list(links.domain_counts),
+                'external_domain_counts': links.domain_counts,
+                'social_links': links.social,
                 'headings': headings,
                 'heading_counts': heading_counts
             }
         except Exception as e:
-            logger.error(f"Error analyzing page {url}: {str(e)}")
+            logger.error(f"Error analyzing page {page.url}: {str(e)}")
             return None
 
-    def analyze_website(self) -> Dict:
+    def _page_key_url(self, url: str) -> str:
+        """
+        URL that stored pages and results are keyed on: the normalized URL,
+        except that a single page keeps its query string (/product?id=1 and
+        ?id=2 are different pages)
+        """
+        if self.is_single_page:
+            return urldefrag(url)[0]
+        return self._normalize_url(url)
+
+    async def _cached_page(self, url: str) -> Optional[Dict]:
+        """Stored validators, links and analysis for a page, if it can be revalidated"""
+        normalized_url = self._page_key_url(url)
+        candidates = []
+        if self.crawl_state is not None:
+            candidates.append(self._known_page(normalized_url))
+        if self.cache is not None:
+            candidates.append(await self.cache.get_page(normalized_url, self._page_settings_key))
+        for cached in candidates:
+            # Without a stored analysis a 304 would leave nothing to return
+            if cached and cached.get('analysis') is not None and (cached.get('etag') or cached.get('last_modified')):
+                return cached
+        return None
+
+    def _known_page(self, normalized_url: str) -> Optional[Dict]:
+        """The previous crawl's entry for a page, if it was made with the same page settings"""
+        known = self.crawl_state.known_page(normalized_url)
+        if known is None or known.get('settings_key') != self._page_settings_key:
+            return None
+        return known
+
+    async def _remember_page(self, page: FetchedPage, page_analysis: Optional[Dict]):
+        """Keep a page's validators and results so the next crawl can revalidate it"""
+        if page.status_code not in (200, 304):
+            return
+        normalized_url = self._page_key_url(page.url)
+        if self.crawl_settings.head_only:
+            # Head-only pages have no headings or links; a later full crawl must not reuse them
+            if self.crawl_state is not None:
+                self.crawl_state.record_page(normalized_url, {'content_type': page.content_type, 'links': []}, False)
+            return
+        entry = {
+            'etag': page.etag,
+            'last_modified': page.last_modified,
+            'content_type': page.content_type,
+            'content_hash': page.content_hash,
+            'links': page.links,
+            'analysis': page_analysis,
+            'settings_key': self._page_settings_key
+        }
+        if self.crawl_state is not None:
+            self.crawl_state.record_page(normalized_url, dict(entry), page.not_modified or page.unchanged)
+        if self.cache is not None and not page.not_modified and (page.etag or page.last_modified):
+            await self.cache.set_page(normalized_url, entry, self._page_settings_key)
+
+    def _process_page(self, page: FetchedPage, analyze: bool = True) -> Optional[Dict]:
+        """Parse a fetched page and, if requested, build its analysis"""
+        # Unchanged since the cached copy: nothing to download or re-parse
+        if page.not_modified:
+            return page.cached_analysis if analyze else None
+
+        # Incremental mode: identical body to the last crawl means identical results
+        if self.crawl_state is not None:
+            if page.content_hash is None:
+                page.content_hash = content_hash(page.text)
+            known = self._known_page(self._page_key_url(page.url))
+            if known and known.get('content_hash') == page.content_hash and (known.get('analysis') is not None or not analyze):
+                page.unchanged = True
+                page.links = list(known.get('links') or [])
+                return known.get('analysis') if analyze else None
+
+        self._parse_page(page)
+        if not analyze:
+            return None
+        return self._build_page_analysis(page)
+
+    def _result_cache_key(self) -> str:
+        # Everything that changes the result except record_timings: timings are never cached
+        settings = self.crawl_settings
+        settings_key = AnalysisCache.settings_key(
+            self._page_settings_key, settings.head_only, settings.use_sitemaps, settings.verify_sitemap_urls,
+            settings.max_sitemaps, settings.frontier_order, settings.detect_duplicates,
+            settings.near_duplicate_threshold, settings.cluster_sample_size, settings.build_link_graph,
+            settings.link_graph_top
+        )
+        return AnalysisCache.result_key(
+            self._page_key_url(self.domain),
+            self.is_single_page,
+            self.max_pages_to_count,
+            self.max_pages_to_analyze,
+            settings_key
+        )
+
+    @property
+    def _reads_cached_results(self) -> bool:
+        # A cached result has no timings to report, so a timed analysis always runs
+        return self.cache is not None and not self.incremental and not self.crawl_settings.record_timings
+
+    async def _store_result(self, result: Dict):
+        """Cache a result without its timings, which only describe the run that produced them"""
+        if self.is_single_page:
+            stored = {key: value for key, value in result.items() if key != 'timings'}
+        else:
+            stored = dict(result, timings=None, pages=[
+                {key: value for key, value in page.items() if key != 'timings'} for page in result['pages']
+            ])
+        await self.cache.set_result(self._result_cache_key(), stored)
+
+    async def _run_analysis(self, engine: AsyncCrawlEngine) -> Dict:
+        if self.is_single_page:
+            page_analysis = await engine.analyze_single_page(self.domain)
+            if not page_analysis:
+                raise Exception(f"Failed to analyze page: {self.domain}")
+            return page_analysis
+
+        # For full website analysis
+        return await engine.crawl()
+
+    async def _run_incremental_analysis(self, engine: AsyncCrawlEngine) -> Dict:
+        """Run the analysis against the previous crawl state and persist the new one"""
+        self.crawl_state = await asyncio.to_thread(self.state_store.load, self.base_domain)
+        previous_crawl_at = self.crawl_state.crawled_at
+        result = await self._run_analysis(engine)
+        self.crawl_state.finish_run()
+        await asyncio.to_thread(self.state_store.save, self.crawl_state)
+        if not self.is_single_page:
+            result['incremental'] = self.crawl_state.stats(previous_crawl_at)
+        return result
+
+    async def analyze_website_async(self) -> Dict:
         """Analyze website or single page based on initialization parameters"""
+        engine = AsyncCrawlEngine(self, self.crawl_settings)
+        if self.incremental:
+            return await self._run_incremental_analysis(engine)
+        if self.cache is None:
+            return await self._run_analysis(engine)
+
+        entry = await self.cache.get_result(self._result_cache_key()) if self._reads_cached_results else None
+        if entry is not None:
+            return dict(entry.value, cache={
+                'status': 'hit',
+                'age_seconds': round(entry.age, 3),
+                'revalidated_pages': 0
+            })
+
+        result = await self._run_analysis(engine)
+        await self._store_result(result)
+        return dict(result, cache={
+            'status': 'revalidated' if engine.revalidated_pages else 'miss',
+            'age_seconds': 0.0,
+            'revalidated_pages': engine.revalidated_pages
+        })
+
+    def analyze_website(self) -> Dict:
+        """Synchronous wrapper around analyze_website_async for CLI and script use"""
+        return asyncio.run(self.analyze_website_async())
+
+    async def analyze_website_stream(self) -> AsyncIterator[Dict]:
+        """
+        Yield {'type': 'page', 'page': ...} as soon as each page is analyzed,
+        then one {'type': 'summary', ...} record carrying total_pages.
+        Pages are never collected, so memory stays flat as the crawl grows.
+        """
+        if self.is_single_page:
+            page_analysis = await self.analyze_website_async()
+            yield {'type': 'page', 'page': page_analysis}
+            yield {'type': 'summary', 'domain': self.base_domain, 'total_pages': 1, 'analyzed_pages': 1}
+            return
+
+        if self._reads_cached_results:
+            entry = await self.cache.get_result(self._result_cache_key())
+            if entry is not None:
+                for page_analysis in entry.value['pages']:
+                    yield {'type': 'page', 'page': page_analysis}
+                summary = {key: value for key, value in entry.value.items() if key != 'pages'}
+                summary['cache'] = {'status': 'hit', 'age_seconds': round(entry.age, 3), 'revalidated_pages': 0}
+                yield dict(summary, type='summary')
+                return
+
+        engine = AsyncCrawlEngine(self, self.crawl_settings)
+        previous_crawl_at = None
+        if self.incremental:
+            self.crawl_state = await asyncio.to_thread(self.state_store.load, self.base_domain)
+            previous_crawl_at = self.crawl_state.crawled_at
+
+        summary: Dict = {}
+        async for record in engine.iter_crawl():
+            if record['type'] == 'summary':
+                summary = record
+            else:
+                yield record
+
+        if self.incremental:
+            self.crawl_state.finish_run()
+            await asyncio.to_thread(self.state_store.save, self.crawl_state)
+            summary['incremental'] = self.crawl_state.stats(previous_crawl_at)
+        if self.cache is not None:
+            # Streamed results are not stored whole, but page revalidation data is
+            summary['cache'] = {
+                'status': 'revalidated' if engine.revalidated_pages else 'miss',
+                'age_seconds': 0.0,
+                'revalidated_pages': engine.revalidated_pages
+            }
+        yield summary
+
+    def iter_analyze_website(self) -> Iterator[Dict]:
+        """Synchronous generator over analyze_website_stream for CLI and script use"""
+        loop = asyncio.new_event_loop()
+        records = self.analyze_website_stream()
         try:
-            if self.is_single_page:
-                page_analysis = self._analyze_page(self.domain)
-                if not page_analysis:
-                    raise Exception(f"Failed to analyze page: {self.domain}")
-                return page_analysis
-
-            # For full website analysis
-            to_visit = {self.domain}
-            visited = set()
-            analyzed_pages = []
-            total_pages = 0
-            
-            # Use configurable limit for page counting
-            while to_visit and total_pages < self.max_pages_to_count:
+            while True:
                 try:
-                    current_url = to_visit.pop()
-                    normalized_url = self._normalize_url(current_url)
-                    if normalized_url in visited:
-                        continue
-                    
-                    response = self._make_request(current_url)
-                    if not response:
-                        continue
-
-                    visited.add(normalized_url)
-                    total_pages += 1
-                    
-                    # Only analyze if within the analysis limit
-                    if len(analyzed_pages) < self.max_pages_to_analyze:
-                        page_analysis = self._analyze_page(current_url)
-                        if page_analysis:
-                            analyzed_pages.append(page_analysis)
-                    
-                    # Continue crawling if we haven't hit the analysis limit
-                    if len(analyzed_pages) < self.max_pages_to_analyze:
-                        soup = self._parse_content(response.text, response.headers.get('content-type'))
-                        extracted_links = self._extract_links_from_html(soup, current_url)
-                        
-                        for link in extracted_links:
-                            parsed_link = urlparse(link)
-                            normalized_link = self._normalize_url(link)
-                            
-                            if (parsed_link.netloc == self.base_domain and 
-                                normalized_link not in visited and 
-                                normalized_link not in to_visit):
-                                to_visit.add(normalized_link)
-                
-                except Exception as e:
-                    logger.error(f"Error processing {current_url}: {str(e)}")
-                    continue
-            
-            return {
-                'domain': self.base_domain,
-                'total_pages': total_pages,
-                'analyzed_pages': len(analyzed_pages),
-                'pages': analyzed_pages
-            }
-            
+                    yield loop.run_until_complete(records.__anext__())
+                except StopAsyncIteration:
+                    break
         finally:
-            # Clean up session
-            self.session.close()
+            loop.run_until_complete(records.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
@@ -0,0 +1,186 @@
+"""
+Benchmark: HTTP requests and CPU time per crawled page.
+
+Compares the single-fetch, single-parse pipeline in
+WebsiteScraperService.analyze_website against the previous sequential
+flow, which fetched every page twice and parsed it up to three times.
+The legacy flow has no rate control, while the pipeline ramps up from
+PolitenessSettings.initial_rate on a host it hasn't seen before. On small
+sites that ramp, not fetching or parsing, dominates the pipeline's wall
+time, so 'pipeline_no_ramp' repeats the run starting at full speed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_crawl_pipeline --pages 200 --analyze 200
+"""
+
+import argparse
+import json
+import logging
+import re
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse, urlunparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from api.v1.services.crawler import CrawlSettings
+from api.v1.services.politeness import PolitenessSettings
+from api.v1.services.website_scraper import WebsiteScraperService
+from benchmarks.fixture_site import FixtureSite
+
+
+# Frozen copy of the original sequential scraper (fetch, fetch again and parse to
+# analyze, parse a third time for links), so the baseline doesn't move as the
+# service changes
+_LEGACY_EXCLUDED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.pdf', '.mp4', '.webm',
+                               '.mp3', '.wav', '.css', '.js', '.ico', '.svg', '.woff', '.woff2')
+_LEGACY_SOCIAL_DOMAINS = {'facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com',
+                          'youtube.com', 'pinterest.com', 'tiktok.com', 'github.com'}
+
+
+def _legacy_get(session: requests.Session, url: str) -> Optional[requests.Response]:
+    try:
+        response = session.get(url, timeout=15)
+        response.raise_for_status()
+        return response
+    except requests.RequestException:
+        return None
+
+
+def _legacy_parse(content: str, content_type: Optional[str]) -> BeautifulSoup:
+    if content_type and 'xml' in content_type.lower():
+        return BeautifulSoup(content, features='xml')
+    return BeautifulSoup(content, 'lxml')
+
+
+def _legacy_normalize(url: str) -> str:
+    parsed = urlparse(url)
+    path = re.sub(r'/(?:index|default)\.(html?|php|asp|aspx)$', '/', parsed.path or '/', flags=re.IGNORECASE)
+    return urlunparse((parsed.scheme, parsed.netloc, path, '', '', '')).rstrip('/')
+
+
+def _legacy_links(soup: BeautifulSoup, base_url: str) -> List[str]:
+    links = []
+    for anchor in soup.find_all('a', href=True):
+        absolute_url = urljoin(base_url, anchor['href'])
+        if (not absolute_url.startswith(('mailto:', 'tel:', 'javascript:')) and
+                not urlparse(absolute_url).path.lower().endswith(_LEGACY_EXCLUDED_EXTENSIONS)):
+            links.append(absolute_url)
+    return links
+
+
+def _legacy_analyze_page(session: requests.Session, url: str, base_domain: str) -> Optional[Dict]:
+    response = _legacy_get(session, url)
+    if not response:
+        return None
+    content_type = response.headers.get('content-type', '').lower()
+    if not ('text/html' in content_type or 'application/xhtml+xml' in content_type):
+        return None
+    soup = _legacy_parse(response.text, content_type)
+    meta_title = soup.find('title')
+    meta_description = soup.find('meta', {'name': 'description'})
+    headings = {}
+    heading_counts = {}
+    for level in range(1, 7):
+        elements = soup.find_all(f'h{level}')
+        if elements:
+            headings[f'h{level}'] = [{'content': h.get_text(strip=True), 'count': 1} for h in elements]
+            heading_counts[f'h{level}'] = len(elements)
+    external_links, external_domains, social_links = [], set(), []
+    for link in _legacy_links(soup, url):
+        parsed_link = urlparse(link)
+        if parsed_link.netloc and parsed_link.netloc != base_domain:
+            if any(domain in parsed_link.netloc for domain in _LEGACY_SOCIAL_DOMAINS):
+                social_links.append(link)
+            else:
+                external_links.append(link)
+                external_domains.add(parsed_link.netloc)
+    return {
+        'url': url,
+        'meta_title': meta_title.get_text(strip=True) if meta_title else '',
+        'meta_description': meta_description['content'] if meta_description else '',
+        'external_links': list(set(external_links)),
+        'external_domains': list(external_domains),
+        'social_links': list(set(social_links)),
+        'headings': headings,
+        'heading_counts': heading_counts
+    }
+
+
+def legacy_crawl(scraper: WebsiteScraperService) -> int:
+    """The original crawl loop, on the frozen copy above"""
+    session = requests.Session()
+    to_visit = {scraper.domain}
+    visited = set()
+    analyzed = 0
+    total_pages = 0
+    while to_visit and total_pages < scraper.max_pages_to_count:
+        current_url = to_visit.pop()
+        normalized_url = _legacy_normalize(current_url)
+        if normalized_url in visited:
+            continue
+        response = _legacy_get(session, current_url)
+        if not response:
+            continue
+        visited.add(normalized_url)
+        total_pages += 1
+        if analyzed < scraper.max_pages_to_analyze:
+            if _legacy_analyze_page(session, current_url, scraper.base_domain):
+                analyzed += 1
+        if analyzed < scraper.max_pages_to_analyze:
+            soup = _legacy_parse(response.text, response.headers.get('content-type'))
+            for link in _legacy_links(soup, current_url):
+                normalized_link = _legacy_normalize(link)
+                if (urlparse(link).netloc == scraper.base_domain and
+                        normalized_link not in visited and normalized_link not in to_visit):
+                    to_visit.add(normalized_link)
+    session.close()
+    return total_pages
+
+
+def pipeline_crawl(scraper: WebsiteScraperService) -> int:
+    return scraper.analyze_website()['total_pages']
+
+
+def run(site: FixtureSite, crawl, max_pages: int, max_analyze: int,
+        crawl_settings: Optional[CrawlSettings] = None) -> dict:
+    site.reset_counts()
+    scraper = WebsiteScraperService(site.base_url, max_pages_to_count=max_pages,
+                                    max_pages_to_analyze=max_analyze, crawl_settings=crawl_settings)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    pages = crawl(scraper)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return {
+        'pages': pages,
+        'http_requests': site.page_requests,
+        'requests_per_page': round(site.page_requests / pages, 3) if pages else None,
+        'cpu_ms_per_page': round(cpu * 1000 / pages, 3) if pages else None,
+        'wall_seconds': round(wall, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawl pipeline benchmark')
+    parser.add_argument('--pages', type=int, default=200, help='Pages in the fixture site')
+    parser.add_argument('--links', type=int, default=10, help='Internal links per page')
+    parser.add_argument('--analyze', type=int, default=200, help='max_pages_to_analyze')
+    args = parser.parse_args()
+
+    logging.getLogger('api.v1.services').setLevel(logging.WARNING)
+
+    with FixtureSite(num_pages=args.pages, links_per_page=args.links) as site:
+        results = {
+            'legacy': run(site, legacy_crawl, args.pages, args.analyze),
+            'pipeline': run(site, pipeline_crawl, args.pages, args.analyze),
+            'pipeline_no_ramp': run(site, pipeline_crawl, args.pages, args.analyze, CrawlSettings(
+                politeness=PolitenessSettings(initial_rate=10_000.0, initial_concurrency=4)
+            )),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
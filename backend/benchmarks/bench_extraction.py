@@ -0,0 +1,143 @@
+"""
+Benchmark: page extraction engines.
+
+Parses a corpus of saved HTML pages with the BeautifulSoup engine and the
+single-pass lxml engine, checks both produce the same page analysis, and
+reports per-page time for parsing + extraction alone and for the whole
+page analysis (which also resolves and classifies every link).
+
+Usage (from backend/):
+    python -m benchmarks.bench_extraction --corpus path/to/saved/pages
+    python -m benchmarks.bench_extraction --pages 200   # generated corpus
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from api.v1.services.crawler import CrawlSettings, FetchedPage
+from api.v1.services.extraction import EXTRACTION_ENGINES
+from api.v1.services.website_scraper import WebsiteScraperService
+
+BASE_URL = 'https://shop.example.com'
+
+
+def generate_page(index: int, rng: random.Random) -> str:
+    """A storefront-sized page: navigation, inline assets, nested markup and many links"""
+    nav = ''.join(f'<li><a href="/category/{n}">Category {n}</a></li>' for n in range(40))
+    products = ''.join(
+        f'<div class="product"><h3>Product <b>{index}-{n}</b> &amp; more</h3>'
+        f'<a href="/product/{rng.randrange(10_000)}"><img src="/img/{n}.jpg" alt="p"></a>'
+        f'<p>{"Lorem ipsum dolor sit amet. " * rng.randrange(2, 8)}</p></div>'
+        for n in range(rng.randrange(20, 60))
+    )
+    footer = ''.join(
+        f'<a href="https://{site}/shop">{site}</a>'
+        for site in ('facebook.com', 'twitter.com', 'instagram.com', 'partner.example.org', 'cdn.example.net')
+    )
+    return (
+        '<!DOCTYPE html><html><head>'
+        f'<title>  Shop page {index} | Example  </title>'
+        f'<meta name="description" content="Products on page {index}">'
+        '<style>.product { margin: 0 }</style>'
+        '<script>window.dataLayer = [{"page": "<h1>not a heading</h1>"}];</script>'
+        '</head><body>'
+        f'<header><nav><ul>{nav}</ul></nav></header>'
+        f'<main><h1>Shop <span>page</span> {index}</h1><!-- hero -->'
+        f'<h2>Featured</h2>{products}<h2>More <!-- x -->products</h2></main>'
+        f'<footer><h4>Follow us</h4>{footer}<a href="mailto:shop@example.com">Mail</a></footer>'
+        '</body></html>'
+    )
+
+
+def write_corpus(directory: str, pages: int, seed: int):
+    rng = random.Random(seed)
+    for index in range(pages):
+        with open(os.path.join(directory, f'page-{index}.html'), 'w', encoding='utf-8') as f:
+            f.write(generate_page(index, rng))
+
+
+def load_corpus(directory: str) -> List[Tuple[str, str]]:
+    corpus = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(('.html', '.htm')):
+                with open(os.path.join(root, name), 'r', encoding='utf-8', errors='replace') as f:
+                    corpus.append((name, f.read()))
+    return corpus
+
+
+def summarize(timings: List[float]) -> Dict:
+    return {
+        'pages_per_second': round(len(timings) / sum(timings), 1),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def run_engine(engine: str, corpus: List[Tuple[str, str]], repeat: int) -> Tuple[Dict, List]:
+    """Time parsing + extraction alone, and the full page analysis including link handling"""
+    scraper = WebsiteScraperService(BASE_URL, crawl_settings=CrawlSettings(extraction_engine=engine))
+    extract_timings = []
+    analysis_timings = []
+    analyses = []
+    for round_number in range(repeat):
+        for name, html in corpus:
+            page = FetchedPage(f'{BASE_URL}/{name}', f'{BASE_URL}/{name}', 200, 'text/html', html)
+            started = time.perf_counter()
+            scraper._extract_page(page)
+            extract_timings.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            scraper._parse_page(page)
+            analysis = scraper._build_page_analysis(page)
+            analysis_timings.append(time.perf_counter() - started)
+            if round_number == 0:
+                analyses.append(analysis)
+    return {'extract': summarize(extract_timings), 'analysis': summarize(analysis_timings)}, analyses
+
+
+def comparable(analysis: Dict) -> Dict:
+    """Order-insensitive view of an analysis (link lists come from sets)"""
+    if analysis is None:
+        return None
+    return {key: sorted(value) if isinstance(value, list) else value for key, value in analysis.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extraction engine benchmark')
+    parser.add_argument('--corpus', help='Directory of saved .html pages (default: generated corpus)')
+    parser.add_argument('--pages', type=int, default=200, help='Pages in the generated corpus')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as generated:
+        corpus_dir = args.corpus
+        if not corpus_dir:
+            write_corpus(generated, args.pages, args.seed)
+            corpus_dir = generated
+        corpus = load_corpus(corpus_dir)
+
+    results = {'pages': len(corpus), 'bytes': sum(len(html) for _, html in corpus)}
+    analyses = {}
+    for engine in EXTRACTION_ENGINES:
+        results[engine], analyses[engine] = run_engine(engine, corpus, args.repeat)
+    results['speedup'] = {
+        step: round(results['lxml'][step]['pages_per_second'] / results['bs4'][step]['pages_per_second'], 2)
+        for step in ('extract', 'analysis')
+    }
+    results['mismatched_pages'] = [
+        name for (name, _), lxml_analysis, bs4_analysis in zip(corpus, analyses['lxml'], analyses['bs4'])
+        if comparable(lxml_analysis) != comparable(bs4_analysis)
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: URL frontier and visited-set memory and throughput.
+
+Compares a Python set of normalized URL strings (the old crawl state)
+with FingerprintSet, in memory and with disk spill, and measures
+Frontier push/pop throughput.
+
+Usage (from backend/):
+    python -m benchmarks.bench_frontier --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from api.v1.services.frontier import FingerprintSet, Frontier, url_fingerprint
+
+
+def url_for(i: int) -> str:
+    return f"https://shop.example.com/category/{i % 997}/product-{i}"
+
+
+def measure(build: Callable[[], object], probe: Callable[[object], int]) -> Dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    container = build()
+    build_seconds = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    found = probe(container)
+    probe_seconds = time.perf_counter() - started
+    return {
+        'retained_mb': round(current / 2 ** 20, 2),
+        'peak_mb': round(peak / 2 ** 20, 2),
+        'adds_per_second': None if build_seconds == 0 else round(found / build_seconds),
+        'lookups_per_second': None if probe_seconds == 0 else round(found / probe_seconds),
+    }
+
+
+def bench_visited(size: int, spill_dir: str) -> Dict:
+    # URLs are generated inside each build, as in a crawl, so a string set pays for its strings
+    def build_string_set():
+        visited = set()
+        for i in range(size):
+            visited.add(url_for(i))
+        return visited
+
+    def probe_string_set(visited):
+        return sum(1 for i in range(size) if url_for(i) in visited)
+
+    def build_fingerprints(spill: bool):
+        def build():
+            visited = FingerprintSet(spill_dir if spill else None, memory_limit=max(1, size // 4))
+            for i in range(size):
+                visited.add(url_fingerprint(url_for(i)))
+            return visited
+        return build
+
+    def probe_fingerprints(visited):
+        return sum(1 for i in range(size) if url_fingerprint(url_for(i)) in visited)
+
+    return {
+        'string_set': measure(build_string_set, probe_string_set),
+        'fingerprint_set': measure(build_fingerprints(False), probe_fingerprints),
+        'fingerprint_set_spill': measure(build_fingerprints(True), probe_fingerprints),
+    }
+
+
+def bench_frontier(size: int) -> Dict:
+    urls = [url_for(i) for i in range(size)]
+
+    async def run():
+        frontier = Frontier('bfs')
+        started = time.perf_counter()
+        for index, url in enumerate(urls):
+            frontier.add(url, depth=index % 5)
+        pushed = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(len(urls)):
+            entry = await frontier.get()
+            frontier.task_done(entry)
+        popped = time.perf_counter() - started
+        return {
+            'pushes_per_second': round(len(urls) / pushed),
+            'pops_per_second': round(len(urls) / popped),
+        }
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Frontier benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for size in args.sizes:
+            results[size] = {
+                'visited': bench_visited(size, spill_dir),
+                'frontier': bench_frontier(size),
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
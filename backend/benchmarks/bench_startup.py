@@ -0,0 +1,172 @@
+"""
+Startup benchmark: import time of each entry point, checked against budgets.
+
+Every entry point is started in a fresh interpreter with -X importtime, the
+way a serverless cold start or a CLI run starts it; the server is measured
+both at import and after its lifespan startup, which is where a real server
+is before its first request. Reports the total import
+time, process wall time and the slowest imports as JSON, and
+exits non-zero when an entry point goes over its import-time budget or
+imports a module it must not load (the CLI must not load the server stack;
+the server must not load the scraping stack until the first request that
+uses it).
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget server=300 --budget cli=250 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_STACK = ('fastapi', 'starlette', 'pydantic', 'uvicorn')
+SCRAPING_STACK = ('httpx', 'httpcore', 'bs4', 'lxml', 'api.v1.services.website_scraper')
+# Also loaded lazily: the crawl engine and the job queue
+SERVICES = ('api.v1.services.crawler', 'api.v1.services.jobs')
+
+# Runs the app's lifespan startup, then exits before shutdown imports anything
+LIFESPAN_STARTUP = (
+    'import asyncio, os, main\n'
+    'async def start():\n'
+    '    await main.app.router.lifespan_context(main.app).__aenter__()\n'
+    '    await asyncio.sleep(0.1)\n'
+    '    os._exit(0)\n'
+    'asyncio.run(start())'
+)
+
+
+@dataclass
+class EntryPoint:
+    name: str
+    args: List[str]  # Interpreter arguments after -X importtime
+    budget_ms: float  # Import-time budget
+    forbidden: Tuple[str, ...] = ()  # Modules (and their submodules) that must not be imported
+    description: str = ''
+
+
+ENTRY_POINTS = {
+    'server': EntryPoint('server', ['-c', 'import main; main.app'], 500, SCRAPING_STACK,
+                         'Cold start of the API: what Vercel and uvicorn import before the first request'),
+    'server-startup': EntryPoint('server-startup', ['-c', LIFESPAN_STARTUP], 500, SCRAPING_STACK + SERVICES,
+                                 'The API after its lifespan startup has run, still before the first request'),
+    'cli': EntryPoint('cli', ['main.py', '--help'], 400, SERVER_STACK,
+                      'Command-line start-up up to argument parsing'),
+    'scraper': EntryPoint('scraper', ['-c', 'import api.v1.services.website_scraper'], 400, SERVER_STACK,
+                          'The scraping stack, loaded by the first analysis'),
+}
+
+
+def parse_importtime(output: str) -> Tuple[float, Dict[str, float], Dict[str, float]]:
+    """
+    Total import ms, cumulative ms of the modules imported at the top level
+    or directly by them, and cumulative ms of every module
+    """
+    total = 0.0
+    shallow: Dict[str, float] = {}
+    modules: Dict[str, float] = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        module = name.strip()
+        milliseconds = int(cumulative) / 1000
+        modules[module] = milliseconds
+        # Nested imports are indented two spaces per level under the module that imported them
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        if depth == 0:
+            total += milliseconds
+        if depth <= 1:
+            shallow[module] = milliseconds
+    return total, shallow, modules
+
+
+def measure(entry: EntryPoint) -> Dict:
+    """One run of an entry point in a fresh interpreter"""
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime'] + entry.args, cwd=BACKEND_DIR,
+                               capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        # importtime lines are on stderr too; the traceback is at the end
+        return {'error': completed.stderr.strip()[-2000:]}
+    total_ms, shallow, modules = parse_importtime(completed.stderr)
+    return {'import_ms': total_ms, 'wall_ms': wall_ms, 'shallow': shallow, 'modules': modules}
+
+
+def run_entry(entry: EntryPoint, repeat: int, top: int) -> Dict:
+    """Fastest of `repeat` runs, so disk cache and scheduling noise count as little as possible"""
+    runs = [measure(entry) for _ in range(repeat)]
+    failed = [run for run in runs if 'error' in run]
+    if failed:
+        return {'description': entry.description, 'error': failed[0]['error']}
+    best = min(runs, key=lambda run: run['import_ms'])
+    forbidden = sorted(module for module in best['modules']
+                       if any(module == name or module.startswith(name + '.') for name in entry.forbidden))
+    slowest = sorted(best['shallow'].items(), key=lambda item: -item[1])[:top]
+    return {
+        'description': entry.description,
+        'import_ms': round(best['import_ms'], 1),
+        'wall_ms': round(min(run['wall_ms'] for run in runs), 1),
+        'budget_ms': entry.budget_ms,
+        'within_budget': best['import_ms'] <= entry.budget_ms,
+        'forbidden_imports': forbidden,
+        'slowest_imports': {module: round(milliseconds, 1) for module, milliseconds in slowest}
+    }
+
+
+def _budget(value: str) -> Tuple[str, float]:
+    name, _, milliseconds = value.partition('=')
+    if name not in ENTRY_POINTS or not milliseconds:
+        raise argparse.ArgumentTypeError(f"expected NAME=MS with NAME one of {', '.join(ENTRY_POINTS)}")
+    return name, float(milliseconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time budget check for the entry points')
+    parser.add_argument('--entry', action='append', choices=sorted(ENTRY_POINTS),
+                        help='Entry point to measure (repeatable; default: all)')
+    parser.add_argument('--budget', action='append', type=_budget, default=[], metavar='NAME=MS',
+                        help='Override an entry point\'s import-time budget in milliseconds')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per entry point; the fastest counts')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to report')
+    parser.add_argument('--output', help='Write the JSON results here as well as to stdout')
+    args = parser.parse_args()
+
+    budgets = dict(args.budget)
+    results: Dict = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'entry_points': {}
+    }
+    passed = True
+    for name in args.entry or ENTRY_POINTS:
+        entry = ENTRY_POINTS[name]
+        if name in budgets:
+            entry = EntryPoint(entry.name, entry.args, budgets[name], entry.forbidden, entry.description)
+        print(f'Measuring {name}...', file=sys.stderr)
+        result = run_entry(entry, max(1, args.repeat), args.top)
+        results['entry_points'][name] = result
+        passed = passed and 'error' not in result and result['within_budget'] and not result['forbidden_imports']
+    results['passed'] = passed
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+Benchmark suite: WebsiteScraperService against generated fixture sites.
+
+Each scenario serves a FixtureSite of a given size, link density, page
+weight, latency and error/429 rate, and runs the scraper against it in a
+separate process so peak RSS and CPU time belong to the scraper alone
+(CPU time includes parse pool workers; peak RSS is the crawling process).
+Reports pages/sec, p50/p99 page latency, peak RSS and CPU per page as
+JSON; pass an earlier result file with --compare to see the change.
+
+Site mode latency is a page's fetch and processing time (connect, first
+byte, download, parse, extract, links); page mode latency is the wall
+time of one single-page analysis.
+
+Usage (from backend/):
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --scenario flaky --scenario heavy
+    python -m benchmarks.bench_suite --pages 300 --latency 0.02 --error-rate 0.05   # custom scenario
+    python -m benchmarks.bench_suite --output new.json --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional
+
+from api.v1.services.parse_stage import PARSE_MODES, close_shared_parse_pools
+from benchmarks.fixture_site import FixtureSite
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Scenario:
+    name: str
+    mode: str = 'site'  # 'site' crawls the whole site, 'page' analyzes pages one by one
+    pages: int = 200  # Pages in the fixture site
+    links_per_page: int = 10
+    page_bytes: int = 0  # Pad pages to roughly this size (0: about 1.3 KB)
+    latency: float = 0.0  # Seconds before each response
+    error_rate: float = 0.0  # Fraction of page requests answered with a 500
+    throttle_rate: float = 0.0  # Fraction answered with a 429
+    concurrency: int = 10  # Crawl workers (site mode) or simultaneous analyses (page mode)
+    polite: bool = False  # Keep the production politeness rate limits
+    parse_mode: str = 'inline'  # CrawlSettings.parse_mode
+    seed: int = 0
+
+
+SCENARIOS = {
+    'small': Scenario('small', pages=50),
+    'large': Scenario('large', pages=1000),
+    'dense': Scenario('dense', pages=300, links_per_page=60),
+    'heavy': Scenario('heavy', pages=150, page_bytes=200_000),
+    'heavy-process': Scenario('heavy-process', pages=150, page_bytes=200_000, parse_mode='process'),
+    'slow': Scenario('slow', pages=200, latency=0.05),
+    'flaky': Scenario('flaky', pages=200, error_rate=0.05, throttle_rate=0.05),
+    'single-page': Scenario('single-page', mode='page', pages=100),
+}
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+def _crawl_settings(scenario: Scenario):
+    from api.v1.services.crawler import CrawlSettings
+    from api.v1.services.politeness import PolitenessSettings
+
+    politeness = PolitenessSettings()
+    if not scenario.polite:
+        # Measure the scraper, not the per-host rate limiter
+        politeness = PolitenessSettings(initial_rate=10_000, initial_concurrency=scenario.concurrency)
+    return CrawlSettings(
+        max_concurrency=scenario.concurrency,
+        per_host_concurrency=scenario.concurrency,
+        politeness=politeness,
+        record_timings=True,
+        parse_mode=scenario.parse_mode
+    )
+
+
+async def _run_site(scenario: Scenario, base_url: str) -> Dict:
+    from api.v1.services.website_scraper import WebsiteScraperService
+
+    scraper = WebsiteScraperService(
+        base_url,
+        max_pages_to_count=scenario.pages,
+        # Analyze every page so each one reports its timings
+        max_pages_to_analyze=scenario.pages,
+        crawl_settings=_crawl_settings(scenario)
+    )
+    result = await scraper.analyze_website_async()
+    latencies = [sum(value for key, value in page['timings'].items() if key.endswith('_ms'))
+                 for page in result['pages'] if page.get('timings')]
+    timings = result['timings']
+    return {
+        'pages': result['total_pages'],
+        'latencies_ms': latencies,
+        'requests': timings['requests'],
+        'retries': timings['retries'],
+        'status_codes': timings['status_codes'],
+        'bytes_downloaded': timings['bytes_downloaded'],
+        'bound': timings['bound']
+    }
+
+
+async def _run_pages(scenario: Scenario, base_url: str) -> Dict:
+    from api.v1.services.client_pool import ClientPool, ClientPoolSettings
+    from api.v1.services.politeness import PolitenessScheduler
+    from api.v1.services.website_scraper import WebsiteScraperService
+
+    # Shared like the API's pool and scheduler: connections, robots.txt and the host's rate carry over between analyses
+    pool = ClientPool(ClientPoolSettings(per_host_connections=scenario.concurrency))
+    scheduler = PolitenessScheduler()
+    semaphore = asyncio.Semaphore(scenario.concurrency)
+    settings = _crawl_settings(scenario)
+
+    async def analyze(index: int) -> Optional[float]:
+        async with semaphore:
+            scraper = WebsiteScraperService(f'{base_url}/page/{index}', is_single_page=True,
+                                            crawl_settings=settings, client_pool=pool, scheduler=scheduler)
+            started = time.perf_counter()
+            try:
+                await scraper.analyze_website_async()
+            except Exception:
+                return None
+            return (time.perf_counter() - started) * 1000
+
+    try:
+        outcomes = await asyncio.gather(*(analyze(index) for index in range(scenario.pages)))
+    finally:
+        await pool.aclose()
+    latencies = [latency for latency in outcomes if latency is not None]
+    return {'pages': len(latencies), 'failed_pages': len(outcomes) - len(latencies), 'latencies_ms': latencies}
+
+
+def run_worker(scenario: Scenario, base_url: str) -> Dict:
+    """Runs inside the measured process: one scenario against an already running site"""
+    logging.basicConfig(level=logging.CRITICAL)
+    runner = _run_site if scenario.mode == 'site' else _run_pages
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = asyncio.run(runner(scenario, base_url))
+    wall = time.perf_counter() - wall_start
+    # Parse pool processes are reaped here, so their CPU time counts too
+    close_shared_parse_pools()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = time.process_time() - cpu_start + children.ru_utime + children.ru_stime
+    latencies = result.pop('latencies_ms')
+    pages = result['pages']
+    return dict(
+        result,
+        wall_seconds=round(wall, 3),
+        pages_per_second=round(pages / wall, 2) if wall else 0.0,
+        p50_ms=_percentile(latencies, 0.5),
+        p99_ms=_percentile(latencies, 0.99),
+        mean_ms=round(statistics.mean(latencies), 3) if latencies else None,
+        cpu_ms_per_page=round(cpu * 1000 / pages, 3) if pages else None,
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak_rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                          / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    )
+
+
+def run_scenario(scenario: Scenario) -> Dict:
+    site = FixtureSite(num_pages=scenario.pages, links_per_page=scenario.links_per_page, seed=scenario.seed,
+                       page_bytes=scenario.page_bytes, latency=scenario.latency,
+                       error_rate=scenario.error_rate, throttle_rate=scenario.throttle_rate)
+    with site:
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_suite', '--worker', json.dumps(asdict(scenario)), site.base_url],
+            cwd=BACKEND_DIR, capture_output=True, text=True
+        )
+        served = site.total_requests
+    if completed.returncode != 0:
+        return {'scenario': asdict(scenario), 'error': completed.stderr.strip()[-2000:]}
+    result = json.loads(completed.stdout)
+    return dict(result, scenario=asdict(scenario), http_requests_served=served)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Metrics compared by --compare, and whether a higher value is better
+COMPARED_METRICS = {
+    'pages_per_second': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'cpu_ms_per_page': False,
+    'peak_rss_mb': False,
+}
+
+
+def compare(current: Dict, baseline: Dict) -> Dict:
+    """Per scenario and metric: baseline, current and the relative change"""
+    changes = {}
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous or 'error' in result or 'error' in previous:
+            continue
+        changes[name] = {}
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            changes[name][metric] = {
+                'baseline': old,
+                'current': new,
+                'change': f'{change:+.1%}',
+                'better': change > 0 if higher_is_better else change < 0
+            }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline scraper benchmark suite')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable; default: all)')
+    parser.add_argument('--output', help='Write the JSON results here as well as to stdout')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    # Any of these runs one custom scenario instead of the predefined ones
+    custom = parser.add_argument_group('custom scenario')
+    for spec in fields(Scenario):
+        if spec.name == 'name':
+            continue
+        flag = '--' + spec.name.replace('_', '-')
+        if spec.type in (bool, 'bool'):
+            custom.add_argument(flag, action='store_true', default=None)
+        else:
+            kind = {'int': int, 'float': float, 'str': str}.get(spec.type, spec.type)
+            choices = {'mode': ['site', 'page'], 'parse_mode': list(PARSE_MODES)}.get(spec.name)
+            custom.add_argument(flag, type=kind, choices=choices)
+    parser.add_argument('--worker', nargs=2, metavar=('SCENARIO', 'BASE_URL'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        scenario = Scenario(**json.loads(args.worker[0]))
+        print(json.dumps(run_worker(scenario, args.worker[1])))
+        return
+
+    overrides = {spec.name: getattr(args, spec.name) for spec in fields(Scenario)
+                 if spec.name != 'name' and getattr(args, spec.name) is not None}
+    if overrides:
+        scenarios = [Scenario('custom', **overrides)]
+    else:
+        scenarios = [SCENARIOS[name] for name in (args.scenario or SCENARIOS)]
+
+    results = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'scenarios': {}
+    }
+    for scenario in scenarios:
+        print(f'Running {scenario.name}...', file=sys.stderr)
+        results['scenarios'][scenario.name] = run_scenario(scenario)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            results['comparison'] = compare(results, json.load(f))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Local fixture website for offline benchmarks.
+Serves a deterministic, generated site from a background thread.
+"""
+
+import gzip
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+_WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do',
+          'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore', 'magna', 'aliqua', 'enim',
+          'minim', 'veniam', 'quis', 'nostrud', 'exercitation', 'ullamco', 'laboris', 'nisi', 'aliquip', 'ex')
+
+
+class _FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops bursts of new connections, which then wait a 1s SYN retry
+    request_queue_size = 128
+
+
+class FixtureSite:
+    """
+    Generated site of `num_pages` interlinked HTML pages. Pages can be
+    padded to `page_bytes`, every response delayed by `latency` seconds,
+    and a fraction of page requests answered with a 500 (`error_rate`) or
+    a 429 with Retry-After (`throttle_rate`). Which requests fail depends
+    only on the seed, the path and how often it was requested, so runs
+    are reproducible and retries of a failed page can succeed.
+    """
+
+    SITEMAP_CHUNK = 1000
+
+    def __init__(self, num_pages: int = 100, links_per_page: int = 10, seed: int = 0, sitemap: bool = False,
+                 page_bytes: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 0):
+        self.num_pages = num_pages
+        self.links_per_page = links_per_page
+        self.seed = seed
+        self.sitemap = sitemap
+        self.page_bytes = page_bytes
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.request_counts = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[_FixtureServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.request_counts.values())
+
+    @property
+    def page_requests(self) -> int:
+        """Requests for pages, excluding robots.txt and sitemaps"""
+        return sum(count for path, count in self.request_counts.items()
+                   if path in ('', '/') or path.startswith('/page/'))
+
+    def reset_counts(self):
+        with self._lock:
+            self.request_counts.clear()
+
+    def render_page(self, index: int) -> str:
+        """Render page `index` with internal, external and social links"""
+        rng = random.Random(self.seed * 1_000_003 + index)
+        internal = [rng.randrange(self.num_pages) for _ in range(self.links_per_page)]
+        # Always link forward so every page is reachable from the home page
+        internal.append((index + 1) % self.num_pages)
+        links = ''.join(f'<li><a href="/page/{i}">Page {i}</a></li>' for i in internal)
+        links += f'<li><a href="https://partner{index % 7}.example.org/ref">Partner</a></li>'
+        links += '<li><a href="https://twitter.com/fixture">Twitter</a></li>'
+        paragraphs = ''.join(f'<p>Paragraph {n} of page {index}.</p>' for n in range(20))
+        # Padding is random words, so heavy pages don't all look like near-duplicates
+        padding = max(0, self.page_bytes - 1400)
+        while padding > 0:
+            paragraph = '<p>' + ' '.join(rng.choice(_WORDS) for _ in range(40)) + '</p>'
+            paragraphs += paragraph
+            padding -= len(paragraph)
+        return (
+            '<!DOCTYPE html><html><head>'
+            f'<title>Fixture page {index}</title>'
+            f'<meta name="description" content="Description of fixture page {index}">'
+            '</head><body>'
+            f'<h1>Page {index}</h1><h2>Section A</h2><h2>Section B</h2><h3>Details</h3>'
+            f'{paragraphs}<ul>{links}</ul>'
+            '</body></html>'
+        )
+
+    def render_robots(self) -> str:
+        lines = ['User-agent: *', 'Disallow:']
+        if self.sitemap:
+            lines.append(f'Sitemap: {self.base_url}/sitemap_index.xml')
+        return '\n'.join(lines) + '\n'
+
+    def render_sitemap_index(self) -> str:
+        chunks = (self.num_pages + self.SITEMAP_CHUNK - 1) // self.SITEMAP_CHUNK
+        items = ''.join(
+            f'<sitemap><loc>{self.base_url}/sitemap-{n}.xml.gz</loc></sitemap>' for n in range(chunks)
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{items}</sitemapindex>')
+
+    def render_sitemap_chunk(self, chunk: int) -> bytes:
+        start = chunk * self.SITEMAP_CHUNK
+        end = min(self.num_pages, start + self.SITEMAP_CHUNK)
+        items = ''.join(
+            f'<url><loc>{self.base_url}/page/{i}</loc><priority>{1.0 if i == 0 else 0.5}</priority></url>'
+            for i in range(start, end)
+        )
+        xml = ('<?xml version="1.0" encoding="UTF-8"?>'
+               f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{items}</urlset>')
+        return gzip.compress(xml.encode('utf-8'))
+
+    def _special_response(self, path: str) -> Optional[Tuple[str, bytes]]:
+        """robots.txt and sitemap files, as (content type, body)"""
+        if path == '/robots.txt':
+            return 'text/plain', self.render_robots().encode('utf-8')
+        if not self.sitemap:
+            return None
+        if path == '/sitemap_index.xml':
+            return 'application/xml', self.render_sitemap_index().encode('utf-8')
+        if path.startswith('/sitemap-') and path.endswith('.xml.gz'):
+            try:
+                chunk = int(path[len('/sitemap-'):-len('.xml.gz')])
+            except ValueError:
+                return None
+            return 'application/x-gzip', self.render_sitemap_chunk(chunk)
+        return None
+
+    def _failure_status(self, path: str, attempt: int) -> Optional[int]:
+        """500 or 429 for this attempt at a page, drawn from the configured rates"""
+        if not (self.error_rate or self.throttle_rate):
+            return None
+        draw = random.Random(f'{self.seed}:{path}:{attempt}').random()
+        if draw < self.error_rate:
+            return 500
+        if draw < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+    def _page_index(self, path: str) -> Optional[int]:
+        if path in ('', '/'):
+            return 0
+        if path.startswith('/page/'):
+            try:
+                index = int(path[len('/page/'):].rstrip('/'))
+            except ValueError:
+                return None
+            if 0 <= index < self.num_pages:
+                return index
+        return None
+
+    def _make_handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; Nagle would hold the body back for a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._respond(head_only=False)
+
+            def do_HEAD(self):
+                self._respond(head_only=True)
+
+            def _respond(self, head_only: bool):
+                path = self.path.split('?', 1)[0]
+                with site._lock:
+                    site.request_counts[path] += 1
+                    attempt = site.request_counts[path]
+                if site.latency:
+                    time.sleep(site.latency)
+                special = site._special_response(path)
+                if special is not None:
+                    self._send(200, special[1], {'Content-Type': special[0]}, head_only)
+                    return
+                index = site._page_index(path)
+                if index is None:
+                    self._send(404, b'', {}, head_only)
+                    return
+                failure = site._failure_status(path, attempt)
+                if failure == 429:
+                    self._send(429, b'', {'Retry-After': str(site.retry_after)}, head_only)
+                    return
+                if failure is not None:
+                    self._send(failure, b'', {}, head_only)
+                    return
+                # Pages never change, so a stable ETag lets clients revalidate with 304s
+                etag = f'"fixture-{site.seed}-{index}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, b'', {'ETag': etag}, head_only)
+                    return
+                body = site.render_page(index).encode('utf-8')
+                self._send(200, body, {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag}, head_only)
+
+            def _send(self, status: int, body: bytes, headers: dict, head_only: bool):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body and not head_only:
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'FixtureSite':
+        self._server = _FixtureServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FixtureSite':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
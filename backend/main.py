@@ -4,26 +4,82 @@ Website Analyzer Backend
 Can be run as both a FastAPI server and a command-line script
 """
 
+import os
 import sys
 import json
+import asyncio
+import logging
 import argparse
-from typing import Optional
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, List, Optional
 
-# Server mode imports (only imported when running as server)
-try:
-    from fastapi import FastAPI, Query
+# Only stdlib is imported here: the server stack (FastAPI, pydantic) and the
+# scraping stack (httpx, lxml, bs4) load on first use, so serverless cold
+# starts and CLI runs only pay for what they touch
+SERVER_MODE_AVAILABLE = importlib.util.find_spec('fastapi') is not None
+
+if TYPE_CHECKING:
+    from api.v1.services.cache import AnalysisCache
+    from api.v1.services.crawler import CrawlSettings
+    from api.v1.services.website_scraper import WebsiteScraperService
+
+def create_app():
+    """Build the FastAPI app; scraping services are imported by the endpoints that use them"""
+    from fastapi import FastAPI, HTTPException, Query, Request
     from fastapi.middleware.cors import CORSMiddleware
-    SERVER_MODE_AVAILABLE = True
-except ImportError:
-    SERVER_MODE_AVAILABLE = False
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+
+    from api.v1.models import (
+        WebsiteAnalyzeRequest, WebsiteAnalysis, SinglePageAnalyzeRequest, BatchAnalyzeRequest, JobStatus, JobPages
+    )
+    from api.v1.responses import encoded_response
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def run_job_worker(job_workers: int):
+        from api.v1.services.client_pool import get_shared_client_pool
+        from api.v1.services.jobs import JobSettings, JobWorker, get_shared_job_store
+        from api.v1.services.politeness import get_shared_scheduler
+
+        worker = JobWorker(get_shared_job_store(), JobSettings(jobs_per_worker=job_workers),
+                           client_pool=get_shared_client_pool(), scheduler=get_shared_scheduler())
+        await worker.run()
 
-# Core functionality imports
-from api.v1.models import WebsiteAnalyzeRequest, WebsiteAnalysis, SinglePageAnalyzeRequest
-from api.v1.services.website_scraper import WebsiteScraperService
+    job_worker: dict = {'task': None}
 
-# Initialize FastAPI app for Vercel (must be at module level)
-if SERVER_MODE_AVAILABLE:
-    app = FastAPI()
+    def ensure_job_worker():
+        """
+        Start the in-process job workers with the first call to the jobs API, so
+        the job queue and scraping stack stay off the cold start. Jobs left
+        running by a previous server resume then. Set JOB_WORKERS=0 when
+        separate job-worker processes run the queue.
+        """
+        job_workers = int(os.environ.get('JOB_WORKERS', '1'))
+        if job_workers > 0 and job_worker['task'] is None:
+            job_worker['task'] = asyncio.create_task(run_job_worker(job_workers))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # The shared client pool, analysis cache and job workers are created by the first request that uses them
+        yield
+        if job_worker['task'] is not None:
+            # Interrupted jobs are resumed from their checkpoint by the next worker
+            job_worker['task'].cancel()
+            await asyncio.gather(job_worker['task'], return_exceptions=True)
+        from api.v1.services.cache import close_shared_analysis_cache
+        from api.v1.services.client_pool import close_shared_client_pool
+        from api.v1.services.jobs import close_shared_job_store
+        from api.v1.services.parse_stage import close_shared_parse_pools
+        from api.v1.services.politeness import close_shared_scheduler
+
+        await close_shared_client_pool()
+        close_shared_scheduler()
+        close_shared_analysis_cache()
+        close_shared_job_store()
+        close_shared_parse_pools()
+
+    app = FastAPI(lifespan=lifespan)
     
     # Add CORS middleware
     app.add_middleware(
@@ -41,38 +97,293 @@ if SERVER_MODE_AVAILABLE:
     @app.post("/api/v1/analyze", response_model=WebsiteAnalysis)
     async def analyze_website(
         request: WebsiteAnalyzeRequest,
+        http_request: Request,
         max_pages_to_count: Optional[int] = Query(500, description="Maximum number of pages to count in the website"),
-        max_pages_to_analyze: Optional[int] = Query(20, description="Maximum number of pages to analyze in detail")
+        max_pages_to_analyze: Optional[int] = Query(20, description="Maximum number of pages to analyze in detail"),
+        max_concurrency: Optional[int] = Query(10, ge=1, le=50, description="Maximum number of pages fetched concurrently"),
+        per_host_concurrency: Optional[int] = Query(4, ge=1, le=16, description="Maximum concurrent requests to a single host"),
+        use_cache: bool = Query(True, description="Serve recent results from the cache and revalidate stale pages"),
+        incremental: bool = Query(False, description="Only re-analyze pages that changed since the previous crawl of this domain"),
+        use_sitemaps: bool = Query(True, description="Seed and count pages from the site's sitemaps when available"),
+        verify_sitemap_urls: bool = Query(False, description="Confirm sitemap URLs with HEAD requests before counting them"),
+        timings: bool = Query(False, description="Include per-page and per-crawl timing breakdowns")
     ):
+        from api.v1.services.cache import get_shared_analysis_cache
+        from api.v1.services.client_pool import get_shared_client_pool
+        from api.v1.services.crawler import CrawlSettings
+        from api.v1.services.politeness import get_shared_scheduler
+        from api.v1.services.website_scraper import WebsiteScraperService
+
         scraper = WebsiteScraperService(
             request.domain,
             max_pages_to_count=max_pages_to_count,
             max_pages_to_analyze=max_pages_to_analyze,
-            is_single_page=False
+            is_single_page=False,
+            crawl_settings=CrawlSettings(
+                max_concurrency=max_concurrency,
+                per_host_concurrency=per_host_concurrency,
+                use_sitemaps=use_sitemaps,
+                verify_sitemap_urls=verify_sitemap_urls,
+                record_timings=timings
+            ),
+            client_pool=get_shared_client_pool(),
+            scheduler=get_shared_scheduler(),
+            cache=get_shared_analysis_cache() if use_cache else None,
+            incremental=incremental
         )
-        analysis = scraper.analyze_website()
-        return analysis
+        analysis = await scraper.analyze_website_async()
+        # Built by the scraper, so it is encoded without revalidating every page
+        return encoded_response(analysis, http_request, WebsiteAnalysis)
+
+    @app.post("/api/v1/analyze-stream")
+    async def analyze_website_stream(
+        request: WebsiteAnalyzeRequest,
+        max_pages_to_count: Optional[int] = Query(500, description="Maximum number of pages to count in the website"),
+        max_pages_to_analyze: Optional[int] = Query(20, description="Maximum number of pages to analyze in detail"),
+        max_concurrency: Optional[int] = Query(10, ge=1, le=50, description="Maximum number of pages fetched concurrently"),
+        per_host_concurrency: Optional[int] = Query(4, ge=1, le=16, description="Maximum concurrent requests to a single host"),
+        format: str = Query("ndjson", pattern="^(ndjson|sse)$", description="Stream as NDJSON or Server-Sent Events"),
+        use_cache: bool = Query(True, description="Serve recent results from the cache and revalidate stale pages"),
+        incremental: bool = Query(False, description="Only re-analyze pages that changed since the previous crawl of this domain"),
+        use_sitemaps: bool = Query(True, description="Seed and count pages from the site's sitemaps when available"),
+        verify_sitemap_urls: bool = Query(False, description="Confirm sitemap URLs with HEAD requests before counting them"),
+        timings: bool = Query(False, description="Include per-page and per-crawl timing breakdowns")
+    ):
+        """Stream each page analysis as soon as it is ready, followed by a summary record"""
+        from api.v1.services.cache import get_shared_analysis_cache
+        from api.v1.services.client_pool import get_shared_client_pool
+        from api.v1.services.crawler import CrawlSettings
+        from api.v1.services.politeness import get_shared_scheduler
+        from api.v1.services.website_scraper import WebsiteScraperService
+
+        scraper = WebsiteScraperService(
+            request.domain,
+            max_pages_to_count=max_pages_to_count,
+            max_pages_to_analyze=max_pages_to_analyze,
+            is_single_page=False,
+            crawl_settings=CrawlSettings(
+                max_concurrency=max_concurrency,
+                per_host_concurrency=per_host_concurrency,
+                use_sitemaps=use_sitemaps,
+                verify_sitemap_urls=verify_sitemap_urls,
+                record_timings=timings
+            ),
+            client_pool=get_shared_client_pool(),
+            scheduler=get_shared_scheduler(),
+            cache=get_shared_analysis_cache() if use_cache else None,
+            incremental=incremental
+        )
+
+        async def encode():
+            try:
+                async for record in scraper.analyze_website_stream():
+                    yield _encode_stream_record(record, format)
+            except Exception as e:
+                yield _encode_stream_record({"type": "error", "error": str(e)}, format)
+
+        media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+        return StreamingResponse(encode(), media_type=media_type)
 
     @app.post("/api/v1/analyze-page")
-    async def analyze_single_page(request: SinglePageAnalyzeRequest):
+    async def analyze_single_page(
+        request: SinglePageAnalyzeRequest,
+        http_request: Request,
+        use_cache: bool = Query(True, description="Serve recent results from the cache and revalidate stale pages"),
+        timings: bool = Query(False, description="Include the page's timing breakdown")
+    ):
         """Analyze a single page without crawling the entire website"""
+        from api.v1.services.cache import get_shared_analysis_cache
+        from api.v1.services.client_pool import get_shared_client_pool
+        from api.v1.services.crawler import CrawlSettings
+        from api.v1.services.politeness import get_shared_scheduler
+        from api.v1.services.website_scraper import WebsiteScraperService
+
         scraper = WebsiteScraperService(
             request.url,
-            is_single_page=True
+            is_single_page=True,
+            crawl_settings=CrawlSettings(record_timings=timings),
+            client_pool=get_shared_client_pool(),
+            scheduler=get_shared_scheduler(),
+            cache=get_shared_analysis_cache() if use_cache else None
         )
-        analysis = scraper.analyze_website()
-        return analysis
+        analysis = await scraper.analyze_website_async()
+        return encoded_response(analysis, http_request)
+
+    @app.post("/api/v1/analyze-batch")
+    async def analyze_batch(
+        request: BatchAnalyzeRequest,
+        target: str = Query("website", pattern="^(website|page)$", description="Crawl each domain or analyze each page URL"),
+        max_pages_to_count: Optional[int] = Query(500, description="Maximum number of pages to count per website"),
+        max_pages_to_analyze: Optional[int] = Query(20, description="Maximum number of pages to analyze per website"),
+        processes: int = Query(4, ge=1, le=32, description="Worker processes"),
+        concurrency: int = Query(8, ge=1, le=64, description="Targets analyzed at once in each worker process"),
+        domain_timeout: float = Query(120.0, gt=0, description="Seconds before a single target is abandoned")
+    ):
+        """Analyze many domains or pages across worker processes, streaming one NDJSON result per target"""
+        from api.v1.services.batch import BatchRunner, BatchSettings, read_targets
+
+        runner = BatchRunner(read_targets(request.urls), BatchSettings(
+            target=target,
+            processes=processes,
+            concurrency=concurrency,
+            domain_timeout=domain_timeout,
+            max_pages_to_count=max_pages_to_count,
+            max_pages_to_analyze=max_pages_to_analyze
+        ))
+
+        async def encode():
+            try:
+                async for record in runner.iter_results():
+                    yield _encode_stream_record(record)
+            except Exception as e:
+                yield _encode_stream_record({"type": "error", "error": str(e)})
+
+        return StreamingResponse(encode(), media_type="application/x-ndjson")
+
+    @app.post("/api/v1/jobs", response_model=JobStatus)
+    async def submit_job(
+        request: WebsiteAnalyzeRequest,
+        max_pages_to_count: Optional[int] = Query(500, description="Maximum number of pages to count in the website"),
+        max_pages_to_analyze: Optional[int] = Query(20, description="Maximum number of pages to analyze in detail"),
+        max_concurrency: Optional[int] = Query(10, ge=1, le=50, description="Maximum number of pages fetched concurrently"),
+        per_host_concurrency: Optional[int] = Query(4, ge=1, le=16, description="Maximum concurrent requests to a single host"),
+        use_sitemaps: bool = Query(True, description="Seed and count pages from the site's sitemaps when available"),
+        verify_sitemap_urls: bool = Query(False, description="Confirm sitemap URLs with HEAD requests before counting them")
+    ):
+        """Queue a website crawl and return its job id immediately"""
+        from api.v1.services.jobs import get_shared_job_store
+
+        ensure_job_worker()
+        store = get_shared_job_store()
+        job_id = await asyncio.to_thread(store.submit, {
+            'domain': request.domain,
+            'max_pages_to_count': max_pages_to_count,
+            'max_pages_to_analyze': max_pages_to_analyze,
+            'max_concurrency': max_concurrency,
+            'per_host_concurrency': per_host_concurrency,
+            'use_sitemaps': use_sitemaps,
+            'verify_sitemap_urls': verify_sitemap_urls
+        })
+        return await asyncio.to_thread(store.get, job_id)
+
+    @app.get("/api/v1/jobs/{job_id}", response_model=JobStatus)
+    async def job_status(job_id: str):
+        """Status and progress of a crawl job"""
+        from api.v1.services.jobs import get_shared_job_store
+
+        ensure_job_worker()
+        job = await asyncio.to_thread(get_shared_job_store().get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        return job
+
+    @app.get("/api/v1/jobs/{job_id}/pages", response_model=JobPages)
+    async def job_pages(
+        job_id: str,
+        http_request: Request,
+        offset: int = Query(0, ge=0, description="Analyzed pages to skip"),
+        limit: int = Query(50, ge=1, le=500, description="Maximum pages to return")
+    ):
+        """Page through the analyses a job has produced so far, in crawl order"""
+        from api.v1.services.jobs import get_shared_job_store
+
+        ensure_job_worker()
+        store = get_shared_job_store()
+        job = await asyncio.to_thread(store.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        pages = await asyncio.to_thread(store.pages, job_id, offset, limit)
+        return encoded_response(
+            {'job_id': job_id, 'offset': offset, 'limit': limit, 'total': job['pages_analyzed'], 'pages': pages},
+            http_request, JobPages
+        )
+
+    @app.get("/api/v1/client-pool")
+    async def client_pool_metrics():
+        """Connection reuse and DNS cache statistics for the shared client pool"""
+        from api.v1.services.client_pool import get_shared_client_pool
+
+        return get_shared_client_pool().metrics()
 
-def analyze_website_cli(url: str, max_pages: int = 10, depth: str = "detailed"):
+    @app.get("/api/v1/cache")
+    async def analysis_cache_metrics():
+        """Hit/miss statistics for the analysis result cache"""
+        from api.v1.services.cache import get_shared_analysis_cache
+
+        return get_shared_analysis_cache().stats()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        """Request, page and phase timing metrics in the Prometheus text format"""
+        from api.v1.services.metrics import get_shared_metrics
+
+        return PlainTextResponse(get_shared_metrics().render(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+# FastAPI app for Vercel and `uvicorn main:app` (must be at module level). Command-line runs never build it,
+# and neither do the worker processes they spawn, which import this file as __mp_main__
+if SERVER_MODE_AVAILABLE and __name__ not in ("__main__", "__mp_main__"):
+    app = create_app()
+
+def _encode_stream_record(record: dict, format: str = "ndjson") -> str:
+    """Encode one streamed record as an NDJSON line or an SSE event"""
+    from api.v1.services.serialization import dumps
+
+    data = dumps(record).decode()
+    if format == "sse":
+        return f"event: {record.get('type', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
+
+def _cli_cache(cache_db: Optional[str]) -> Optional['AnalysisCache']:
+    """On-disk analysis cache for repeated CLI runs"""
+    from api.v1.services.cache import AnalysisCache, CacheSettings
+
+    return AnalysisCache(CacheSettings(sqlite_path=cache_db)) if cache_db else None
+
+def _cli_crawl_settings(args: argparse.Namespace) -> 'CrawlSettings':
+    """Crawl settings from the command-line flags"""
+    from api.v1.services.crawler import CrawlSettings
+
+    return CrawlSettings(
+        max_concurrency=args.concurrency,
+        per_host_concurrency=args.per_host_concurrency,
+        use_sitemaps=not args.no_sitemaps,
+        verify_sitemap_urls=args.verify_sitemap,
+        extraction_engine=args.extraction_engine,
+        head_only=args.head_only,
+        max_body_bytes=args.max_body_bytes or CrawlSettings.max_body_bytes,
+        detect_duplicates=not args.no_dedup,
+        record_timings=args.timings,
+        parse_mode=args.parse_mode,
+        parse_workers=args.parse_workers
+    )
+
+def _cli_website_scraper(url: str, max_pages: int, crawl_settings: Optional['CrawlSettings'],
+                         cache_db: Optional[str], incremental: bool,
+                         state_dir: Optional[str]) -> 'WebsiteScraperService':
+    """Website scraper for the analyze-website command, streamed or not"""
+    from api.v1.services.crawl_state import CrawlStateStore
+    from api.v1.services.website_scraper import WebsiteScraperService
+
+    return WebsiteScraperService(
+        url,
+        max_pages_to_count=500,
+        max_pages_to_analyze=max_pages,
+        is_single_page=False,
+        crawl_settings=crawl_settings,
+        cache=_cli_cache(cache_db),
+        incremental=incremental,
+        state_store=CrawlStateStore(state_dir) if incremental else None
+    )
+
+def analyze_website_cli(url: str, max_pages: int = 10, depth: str = "detailed",
+                        crawl_settings: Optional['CrawlSettings'] = None, cache_db: Optional[str] = None,
+                        incremental: bool = False, state_dir: Optional[str] = None):
     """Command-line interface for website analysis"""
     try:
         # Create scraper service
-        scraper = WebsiteScraperService(
-            url,
-            max_pages_to_count=500,
-            max_pages_to_analyze=max_pages,
-            is_single_page=False
-        )
+        scraper = _cli_website_scraper(url, max_pages, crawl_settings, cache_db, incremental, state_dir)
         
         # Perform analysis
         analysis = scraper.analyze_website()
@@ -94,13 +405,38 @@ def analyze_website_cli(url: str, max_pages: int = 10, depth: str = "detailed"):
             "error": str(e)
         }
 
-def analyze_single_page_cli(url: str, extract_content: str = "html"):
+def stream_website_cli(url: str, max_pages: int = 10, output_file: Optional[str] = None,
+                       crawl_settings: Optional['CrawlSettings'] = None, cache_db: Optional[str] = None,
+                       incremental: bool = False, state_dir: Optional[str] = None):
+    """Command-line website analysis that writes NDJSON records as pages complete"""
+    try:
+        out = open(output_file, 'w') if output_file else sys.stdout
+    except OSError as e:
+        print(json.dumps({"success": False, "error": f"Failed to write output file: {str(e)}"}))
+        return
+    try:
+        scraper = _cli_website_scraper(url, max_pages, crawl_settings, cache_db, incremental, state_dir)
+        for record in scraper.iter_analyze_website():
+            out.write(_encode_stream_record(record))
+            out.flush()
+    except Exception as e:
+        out.write(_encode_stream_record({"type": "error", "error": str(e)}))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+def analyze_single_page_cli(url: str, extract_content: str = "html",
+                            crawl_settings: Optional['CrawlSettings'] = None, cache_db: Optional[str] = None):
     """Command-line interface for single page analysis"""
+    from api.v1.services.website_scraper import WebsiteScraperService
+
     try:
         # Create scraper service for single page
         scraper = WebsiteScraperService(
             url,
-            is_single_page=True
+            is_single_page=True,
+            crawl_settings=crawl_settings,
+            cache=_cli_cache(cache_db)
         )
         
         # Perform analysis
@@ -123,10 +459,49 @@ def analyze_single_page_cli(url: str, extract_content: str = "html"):
             "error": str(e)
         }
 
+def analyze_batch_cli(targets: List[str], output_file: Optional[str] = None, resume: bool = False,
+                      target: str = "website", max_pages: int = 10, processes: Optional[int] = None,
+                      concurrency: int = 8, domain_timeout: float = 120.0):
+    """Command-line batch analysis of many domains or pages, written as NDJSON"""
+    from api.v1.services.batch import BatchRunner, BatchSettings, completed_targets
+
+    # Resuming skips targets that already succeeded in the output file and appends to it
+    skip = completed_targets(output_file) if resume and output_file else set()
+    try:
+        out = open(output_file, 'a' if resume else 'w') if output_file else sys.stdout
+    except OSError as e:
+        print(json.dumps({"success": False, "error": f"Failed to write output file: {str(e)}"}))
+        return
+    settings = BatchSettings(
+        target=target,
+        concurrency=concurrency,
+        domain_timeout=domain_timeout,
+        max_pages_to_analyze=max_pages
+    )
+    if processes:
+        settings.processes = processes
+
+    async def run():
+        async for record in BatchRunner(targets, settings, skip).iter_results():
+            out.write(_encode_stream_record(record))
+            out.flush()
+
+    try:
+        asyncio.run(run())
+    except Exception as e:
+        out.write(_encode_stream_record({"type": "error", "error": str(e)}))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
 def main():
     """Main function for command-line execution"""
+    from api.v1.services.batch import BATCH_TARGETS
+    from api.v1.services.extraction import EXTRACTION_ENGINES
+    from api.v1.services.parse_stage import PARSE_MODES
+
     parser = argparse.ArgumentParser(description='Website Analyzer Backend')
-    parser.add_argument('--mode', choices=['server', 'analyze-website', 'analyze-page'], 
+    parser.add_argument('--mode', choices=['server', 'analyze-website', 'analyze-page', 'analyze-batch', 'job-worker'], 
                        required=True, help='Operation mode')
     parser.add_argument('--url', help='URL to analyze')
     parser.add_argument('--max-pages', type=int, default=10, 
@@ -134,14 +509,69 @@ def main():
     parser.add_argument('--depth', default='detailed', 
                        choices=['basic', 'detailed', 'comprehensive'],
                        help='Analysis depth (website mode)')
+    parser.add_argument('--concurrency', type=int, default=10,
+                       help='Maximum pages fetched concurrently (website mode)')
+    parser.add_argument('--per-host-concurrency', type=int, default=4,
+                       help='Maximum concurrent requests per host (website mode)')
     parser.add_argument('--extract-content', default='html',
                        choices=['text', 'html', 'both'],
                        help='Content extraction type (page mode)')
+    parser.add_argument('--extraction-engine', default='lxml', choices=list(EXTRACTION_ENGINES),
+                       help='Parser used to extract titles, headings and links')
+    parser.add_argument('--head-only', action='store_true',
+                       help='Only extract title and meta description, reading each page up to </head>; '
+                            'website crawls follow no links, so only sitemap pages are reached')
+    parser.add_argument('--max-body-bytes', type=int,
+                       help='Stop reading a response body after this many bytes (default 5 MB)')
+    parser.add_argument('--no-dedup', action='store_true',
+                       help='Fetch and count near-duplicate pages like any other (website mode)')
+    parser.add_argument('--parse-mode', default='inline', choices=list(PARSE_MODES),
+                       help='Parse pages inline, in a pool of worker processes, or in a thread pool (website mode)')
+    parser.add_argument('--parse-workers', type=int,
+                       help='Parse pool size (default: CPU count)')
+    parser.add_argument('--timings', action='store_true',
+                       help='Include per-page and per-crawl timing breakdowns')
+    parser.add_argument('--profile', metavar='PATH',
+                       help='Run under cProfile and save the stats to PATH (view with snakeviz or flameprof)')
+    parser.add_argument('--cache-db', help='SQLite file for caching results between runs')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Re-analyze only pages changed since the previous crawl (website mode)')
+    parser.add_argument('--state-dir', help='Directory for persisted crawl state (website mode)')
+    parser.add_argument('--no-sitemaps', action='store_true',
+                       help='Discover pages by following links only (website mode)')
+    parser.add_argument('--verify-sitemap', action='store_true',
+                       help='Confirm sitemap URLs with HEAD requests before counting (website mode)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Write NDJSON records as each page completes (website mode)')
+    parser.add_argument('--urls', nargs='+', default=[], help='Domains or page URLs to analyze (batch mode)')
+    parser.add_argument('--batch-file', help="File with one domain or page URL per line, or '-' for stdin (batch mode)")
+    parser.add_argument('--batch-target', default='website', choices=list(BATCH_TARGETS),
+                       help='Crawl each domain or analyze each page URL (batch mode)')
+    parser.add_argument('--processes', type=int,
+                       help='Worker processes (batch mode, default: CPU count; job-worker mode, default: 1)')
+    parser.add_argument('--job-db', help='SQLite job queue shared with the API (job-worker mode, default: $JOB_DB)')
+    parser.add_argument('--batch-concurrency', type=int, default=8,
+                       help='Targets analyzed at once in each worker process (batch mode)')
+    parser.add_argument('--domain-timeout', type=float, default=120.0,
+                       help='Seconds before a single target is abandoned (batch mode)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip targets already completed in --output-file and append to it (batch mode)')
     parser.add_argument('--input-file', help='Input JSON file with parameters')
     parser.add_argument('--output-file', help='Output JSON file for results')
+    parser.add_argument('--output-format', default='json', choices=['json', 'compact', 'msgpack'],
+                       help='Indented JSON, single-line JSON or msgpack (needs the msgpack package) for results')
     
     args = parser.parse_args()
-    
+    logging.basicConfig(level=logging.INFO)
+    if args.profile:
+        from api.v1.services.metrics import profile_call
+
+        profile_call(lambda: run_cli(args), args.profile)
+    else:
+        run_cli(args)
+
+def run_cli(args: argparse.Namespace):
+    """Run the operation mode selected on the command line"""
     # Handle file-based input
     if args.input_file:
         try:
@@ -157,6 +587,8 @@ def main():
                 args.depth = input_data['depth']
             if 'extract_content' in input_data:
                 args.extract_content = input_data['extract_content']
+            if 'urls' in input_data:
+                args.urls = input_data['urls']
                 
         except Exception as e:
             result = {"success": False, "error": f"Failed to read input file: {str(e)}"}
@@ -175,25 +607,76 @@ def main():
     elif args.mode == 'analyze-website':
         if not args.url:
             result = {"success": False, "error": "URL is required for website analysis"}
+        elif args.stream:
+            stream_website_cli(args.url, args.max_pages, args.output_file,
+                               crawl_settings=_cli_crawl_settings(args), cache_db=args.cache_db,
+                               incremental=args.incremental, state_dir=args.state_dir)
+            return
         else:
-            result = analyze_website_cli(args.url, args.max_pages, args.depth)
+            result = analyze_website_cli(args.url, args.max_pages, args.depth,
+                                         crawl_settings=_cli_crawl_settings(args), cache_db=args.cache_db,
+                                         incremental=args.incremental, state_dir=args.state_dir)
             
+    elif args.mode == 'job-worker':
+        # Runs queued crawl jobs until interrupted
+        from api.v1.services.jobs import JobSettings, run_job_workers
+
+        run_job_workers(args.processes or 1, JobSettings(db_path=args.job_db))
+        return
+
+    elif args.mode == 'analyze-batch':
+        try:
+            lines = list(args.urls)
+            if args.batch_file == '-':
+                lines.extend(sys.stdin)
+            elif args.batch_file:
+                with open(args.batch_file, 'r') as f:
+                    lines.extend(f)
+        except OSError as e:
+            result = {"success": False, "error": f"Failed to read batch file: {str(e)}"}
+        else:
+            from api.v1.services.batch import read_targets
+
+            targets = read_targets(lines)
+            if not targets:
+                result = {"success": False, "error": "--urls or --batch-file is required for batch analysis"}
+            else:
+                analyze_batch_cli(targets, args.output_file, args.resume, args.batch_target,
+                                  args.max_pages, args.processes, args.batch_concurrency, args.domain_timeout)
+                return
+
     elif args.mode == 'analyze-page':
         if not args.url:
             result = {"success": False, "error": "URL is required for page analysis"}
         else:
-            result = analyze_single_page_cli(args.url, args.extract_content)
+            result = analyze_single_page_cli(args.url, args.extract_content,
+                                             crawl_settings=_cli_crawl_settings(args), cache_db=args.cache_db)
     
     # Output results
     if args.mode != 'server':
-        if args.output_file:
-            try:
-                with open(args.output_file, 'w') as f:
-                    json.dump(result, f, indent=2)
-            except Exception as e:
-                print(json.dumps({"success": False, "error": f"Failed to write output file: {str(e)}"}))
-        else:
-            print(json.dumps(result, indent=2))
+        _write_result(result, args.output_file, args.output_format)
+
+def _write_result(result: dict, output_file: Optional[str], output_format: str = "json"):
+    """Write a command's result to the output file, or stdout"""
+    from api.v1.services.serialization import dumps, format_available
+
+    if output_format == 'msgpack' and not format_available('msgpack'):
+        print(json.dumps({"success": False, "error": "msgpack output needs the msgpack package"}))
+        return
+    if output_format == 'msgpack':
+        body = dumps(result, 'msgpack')
+    else:
+        body = dumps(result, pretty=output_format == 'json') + b'\n'
+    if output_file:
+        try:
+            with open(output_file, 'wb') as f:
+                f.write(body)
+        except Exception as e:
+            print(json.dumps({"success": False, "error": f"Failed to write output file: {str(e)}"}))
+    else:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(body)
+        sys.stdout.flush()
 
 def run_server():
     """Run as FastAPI server for local development"""
@@ -202,7 +685,7 @@ def run_server():
         
     # Start the server
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+import pytest
+
+
+class StaticSite:
+    """
+    Local HTTP server answering from a dict of path -> (status, headers, body).
+    Unknown paths get a 404; `requests` counts hits per path, and `seen_headers`
+    keeps the request headers of the last hit on each path.
+    """
+
+    def __init__(self, routes: Dict[str, Tuple[int, Dict[str, str], bytes]]):
+        self.routes = routes
+        self.requests = Counter()
+        self.seen_headers: Dict[str, Dict[str, str]] = {}
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                site.requests[self.path] += 1
+                site.seen_headers[self.path] = {key.lower(): value for key, value in self.headers.items()}
+                status, headers, body = site.routes.get(self.path, (404, {}, b''))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if status not in (204, 304):
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if status not in (204, 304):
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> 'StaticSite':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def html(body: str, headers: Dict[str, str] = None, status: int = 200) -> Tuple[int, Dict[str, str], bytes]:
+    return status, dict({'Content-Type': 'text/html; charset=utf-8'}, **(headers or {})), body.encode('utf-8')
+
+
+@pytest.fixture
+def static_site():
+    """Factory for StaticSite servers that are shut down after the test"""
+    sites = []
+
+    def start(routes):
+        site = StaticSite(routes).__enter__()
+        sites.append(site)
+        return site
+
+    yield start
+    for site in sites:
+        site.__exit__(None, None, None)
@@ -0,0 +1,52 @@
+import asyncio
+
+from api.v1.services.cache import AnalysisCache, CacheSettings
+from api.v1.services.website_scraper import WebsiteScraperService
+
+from conftest import html
+
+
+def product(number: int):
+    return html(f'<html><head><title>Product {number}</title></head><body><h1>Product {number}</h1></body></html>',
+                headers={'ETag': f'"product-{number}"'})
+
+
+def analyze_page(url: str, cache: AnalysisCache) -> dict:
+    return WebsiteScraperService(url, is_single_page=True, cache=cache).analyze_website()
+
+
+def test_single_pages_are_cached_per_query_string(static_site):
+    site = static_site({'/product?id=1': product(1), '/product?id=2': product(2)})
+    cache = AnalysisCache()
+
+    first = analyze_page(f"{site.base_url}/product?id=1", cache)
+    second = analyze_page(f"{site.base_url}/product?id=2", cache)
+
+    assert first['meta_title']['content'] == 'Product 1'
+    assert second['cache']['status'] == 'miss'
+    assert second['meta_title']['content'] == 'Product 2'
+    # id=1's validators must not be sent for id=2
+    assert 'if-none-match' not in site.seen_headers['/product?id=2']
+    # The fragment is not part of the page
+    assert analyze_page(f"{site.base_url}/product?id=1#reviews", cache)['cache']['status'] == 'hit'
+
+
+def test_disk_tier_round_trip(tmp_path):
+    async def run():
+        cache = AnalysisCache(CacheSettings(sqlite_path=str(tmp_path / 'cache.db')))
+        await cache.set_page('https://example.com/a', {'etag': '"a"'}, 'settings')
+        await cache.set_result('result', {'pages': []})
+        cache.close()
+        reopened = AnalysisCache(CacheSettings(sqlite_path=str(tmp_path / 'cache.db')))
+        try:
+            page = await reopened.get_page('https://example.com/a', 'settings')
+            result = await reopened.get_result('result')
+            missing = await reopened.get_page('https://example.com/a', 'other-settings')
+        finally:
+            reopened.close()
+        return page, result, missing
+
+    page, result, missing = asyncio.run(run())
+    assert page == {'etag': '"a"'}
+    assert result.value == {'pages': []}
+    assert missing is None
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+
+from api.v1.services.client_pool import MAX_PER_HOST_CONNECTIONS, ClientPool, ClientPoolSettings
+
+from conftest import html
+
+
+def fake_dns(loop, lookups):
+    """Resolve every host to 127.0.0.1 on the running loop, recording each lookup"""
+    getaddrinfo = loop.getaddrinfo
+
+    async def resolve(host, port, **kwargs):
+        lookups.append(host)
+        return await getaddrinfo('127.0.0.1', port, **kwargs)
+
+    loop.getaddrinfo = resolve
+
+
+def test_pool_allows_the_api_maximum_per_host():
+    assert ClientPoolSettings().per_host_connections == MAX_PER_HOST_CONNECTIONS == 16
+
+
+def test_connections_resolve_through_the_dns_cache(static_site):
+    site = static_site({'/': html('<html></html>')})
+    port = site.base_url.rsplit(':', 1)[1]
+
+    async def run():
+        lookups = []
+        fake_dns(asyncio.get_running_loop(), lookups)
+        pool = ClientPool()
+        try:
+            first = await pool.client.get(f"http://cached.test:{port}/")
+            # A new client opens a new connection, which must not resolve the host again
+            await pool.aclose()
+            second = await pool.client.get(f"http://cached.test:{port}/")
+        finally:
+            await pool.aclose()
+        return first.status_code, second.status_code, lookups, pool.dns_cache.stats()
+
+    first, second, lookups, stats = asyncio.run(run())
+    assert (first, second) == (200, 200)
+    assert lookups == ['cached.test']
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+
+def test_tls_sends_the_hostname_not_the_cached_address():
+    async def run():
+        client_hello = asyncio.get_running_loop().create_future()
+
+        async def handle(reader, writer):
+            data = await reader.read(4096)
+            if not client_hello.done():
+                client_hello.set_result(data)
+            writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        fake_dns(asyncio.get_running_loop(), [])
+        pool = ClientPool()
+        try:
+            try:
+                await pool.client.get(f"https://sni.test:{port}/")
+            except httpx.HTTPError:
+                pass  # The server never completes the handshake
+            return await asyncio.wait_for(client_hello, 5)
+        finally:
+            await pool.aclose()
+            server.close()
+            await server.wait_closed()
+
+    # The ClientHello carries the server_name extension in the clear
+    client_hello = asyncio.run(run())
+    assert b'sni.test' in client_hello
+    assert b'127.0.0.1' not in client_hello
@@ -0,0 +1,70 @@
+import asyncio
+
+from api.v1.services.crawler import AsyncCrawlEngine, CrawlCheckpoint, CrawlSettings
+from api.v1.services.extraction import IncrementalExtractor
+from api.v1.services.website_scraper import WebsiteScraperService
+
+from conftest import html
+
+HOME = ('<html><head><title>Home</title></head><body><h1>Home</h1>'
+        '<a href="/empty">Empty</a><a href="/garbage">Garbage</a><a href="/long">Long</a></body></html>')
+
+
+def test_extractor_without_input_returns_empty_page():
+    page = IncrementalExtractor().close()
+    assert page.title is None
+    assert page.headings == {}
+    assert page.hrefs == []
+
+
+def test_empty_page_is_analyzed(static_site):
+    site = static_site({'/empty': html('')})
+    analysis = WebsiteScraperService(f"{site.base_url}/empty", is_single_page=True).analyze_website()
+    assert analysis['url'] == f"{site.base_url}/empty"
+    assert not analysis['meta_title']['content']
+    assert analysis['headings'] == {}
+
+
+def test_garbage_and_truncated_bodies_are_analyzed(static_site):
+    site = static_site({
+        '/': html(HOME),
+        '/empty': html(''),
+        '/garbage': html('\x00\x01�'),
+        # Cut off by max_body_bytes inside an unclosed heading
+        '/long': html('<html><head><title>Long</title></head><body><h1>Start' + 'x' * 200_000),
+    })
+    scraper = WebsiteScraperService(site.base_url, max_pages_to_analyze=10,
+                                    crawl_settings=CrawlSettings(max_body_bytes=4096, use_sitemaps=False))
+    analysis = scraper.analyze_website()
+    pages = {page['url'].replace(site.base_url, ''): page for page in analysis['pages']}
+    assert set(pages) == {'', '/empty', '/garbage', '/long'}
+    assert pages['/long']['meta_title']['content'] == 'Long'
+    assert analysis['transfer']['truncated_pages'] == 1
+
+
+class FailingCheckpoint(CrawlCheckpoint):
+    """Raises while recording one page, like a database error mid-crawl"""
+
+    def __init__(self, failing_path: str):
+        self.failing_path = failing_path
+
+    def completed_page(self, url):
+        return None
+
+    async def record_page(self, entry, links, page_analysis, external_domains=None):
+        if entry.url.endswith(self.failing_path):
+            raise RuntimeError('disk full')
+
+
+def test_failed_page_releases_its_budget(static_site):
+    links = ''.join(f'<a href="/p{i}">{i}</a>' for i in range(4))
+    routes = {'/': html(f'<html><body><h1>Home</h1>{links}</body></html>')}
+    routes.update({f'/p{i}': html(f'<html><body><h1>Page {i}</h1></body></html>') for i in range(4)})
+    site = static_site(routes)
+    scraper = WebsiteScraperService(site.base_url, max_pages_to_count=4, max_pages_to_analyze=4,
+                                    crawl_settings=CrawlSettings(use_sitemaps=False, max_concurrency=1))
+    engine = AsyncCrawlEngine(scraper, scraper.crawl_settings, FailingCheckpoint('/p0'))
+    result = asyncio.run(engine.crawl())
+    assert result['total_pages'] == 4
+    assert result['analyzed_pages'] == 4
+    assert [page['url'].replace(site.base_url, '') for page in result['pages']] == ['', '/p1', '/p2', '/p3']
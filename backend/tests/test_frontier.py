@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from api.v1.services.frontier import FingerprintSet, Frontier, url_fingerprint
+
+
+async def get_now(frontier: Frontier):
+    """The next entry, or None when the frontier would make the caller wait"""
+    try:
+        return await asyncio.wait_for(frontier.get(), 0.05)
+    except asyncio.TimeoutError:
+        return None
+
+
+def test_bfs_hands_out_sorted_within_a_level_and_defers_the_next_levels():
+    async def run():
+        frontier = Frontier('bfs')
+        for url in ('https://e.com/c', 'https://e.com/a', 'https://e.com/b'):
+            frontier.add(url, 0)
+        frontier.add('https://e.com/z', 1)
+        frontier.add('https://e.com/deep', 2)
+        level_0 = [await frontier.get() for _ in range(3)]
+        # Depth 1 may start while depth 0 is in flight; depth 2 may not
+        level_1 = await frontier.get()
+        blocked = await get_now(frontier)
+        for entry in level_0:
+            frontier.task_done(entry)
+        level_2 = await get_now(frontier)
+        return level_0, level_1, blocked, level_2
+
+    level_0, level_1, blocked, level_2 = asyncio.run(run())
+    assert [entry.url for entry in level_0] == ['https://e.com/a', 'https://e.com/b', 'https://e.com/c']
+    assert [entry.sequence for entry in level_0] == [0, 1, 2]
+    assert (level_1.url, level_1.depth) == ('https://e.com/z', 1)
+    assert blocked is None
+    assert (level_2.url, level_2.depth) == ('https://e.com/deep', 2)
+
+
+def test_url_found_one_level_deeper_moves_up():
+    async def run():
+        frontier = Frontier('bfs')
+        frontier.add('https://e.com/', 0)
+        root = await frontier.get()
+        frontier.add('https://e.com/a', 1)
+        page_a = await frontier.get()
+        # /a finds /x first, then the still running root page finds it too
+        queued_deep = frontier.add('https://e.com/x', 2)
+        promoted = frontier.add('https://e.com/x', 1)
+        requeued_deep = frontier.add('https://e.com/x', 2)
+        page_x = await get_now(frontier)
+        for entry in (root, page_a, page_x):
+            frontier.task_done(entry)
+        # The stale depth-2 entry is dropped, not handed out again
+        await asyncio.wait_for(frontier.join(), 1)
+        return queued_deep, promoted, requeued_deep, page_x, len(frontier)
+
+    queued_deep, promoted, requeued_deep, page_x, remaining = asyncio.run(run())
+    assert (queued_deep, promoted, requeued_deep) == (True, True, False)
+    assert (page_x.url, page_x.depth) == ('https://e.com/x', 1)
+    assert remaining == 0
+
+
+def test_join_waits_for_pages_in_flight():
+    async def run():
+        frontier = Frontier('bfs')
+        frontier.add('https://e.com/', 0)
+        entry = await frontier.get()
+        join = asyncio.ensure_future(frontier.join())
+        await asyncio.sleep(0.05)
+        waiting = not join.done()
+        frontier.task_done(entry)
+        await asyncio.wait_for(join, 1)
+        return waiting
+
+    assert asyncio.run(run())
+
+
+@pytest.mark.parametrize('memory_limit', [7, 10, 64])
+def test_fingerprint_set_membership_survives_spills(tmp_path, memory_limit):
+    fingerprints = [url_fingerprint(f'https://e.com/{i}') for i in range(100)]
+    visited = FingerprintSet(spill_dir=str(tmp_path), memory_limit=memory_limit, initial_capacity=16)
+    try:
+        assert all(visited.add(fingerprint) for fingerprint in fingerprints)
+        assert visited._disk is not None
+        assert len(visited) == 100
+        assert all(fingerprint in visited for fingerprint in fingerprints)
+        assert not any(visited.add(fingerprint) for fingerprint in fingerprints)
+        assert url_fingerprint('https://e.com/missing') not in visited
+    finally:
+        visited.close()
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from api.v1.services.crawler import AsyncCrawlEngine, CrawlSettings
+from api.v1.services.politeness import PolitenessSettings
+from api.v1.services.website_scraper import WebsiteScraperService
+
+
+def test_cancelled_request_keeps_host_rate():
+    async def run():
+        # Accepts connections and never answers
+        connections = []
+        server = await asyncio.start_server(lambda reader, writer: connections.append(writer), '127.0.0.1', 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/slow"
+        settings = CrawlSettings(politeness=PolitenessSettings(respect_robots=False))
+        engine = AsyncCrawlEngine(WebsiteScraperService(url, is_single_page=True, crawl_settings=settings), settings)
+        try:
+            async with engine._client() as client:
+                throttle = await engine._throttle_for(client, url)
+                rate, concurrency = throttle.rate, throttle.concurrency
+                request = asyncio.create_task(engine._make_request(client, url))
+                await asyncio.sleep(0.2)
+                assert throttle.in_flight == 1
+                request.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await request
+                return throttle.in_flight, (throttle.rate, throttle.concurrency) == (rate, concurrency)
+        finally:
+            server.close()
+
+    in_flight, unchanged = asyncio.run(run())
+    assert in_flight == 0
+    assert unchanged
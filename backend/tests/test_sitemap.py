@@ -0,0 +1,57 @@
+import asyncio
+import gzip
+
+from api.v1.services.sitemap import SitemapDiscovery
+from api.v1.services.website_scraper import WebsiteScraperService
+
+BASE = 'https://shop.example.com'
+NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def urlset(paths, host=BASE) -> bytes:
+    items = ''.join(f'<url><loc>{host}{path}</loc><priority>0.8</priority></url>' for path in paths)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{NAMESPACE}">{items}</urlset>'.encode()
+
+
+def discover(documents, max_urls=500, max_bytes=5 * 1024 * 1024, robots_sitemaps=None):
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url)
+        return documents.get(url)
+
+    discovery = SitemapDiscovery(WebsiteScraperService(BASE), fetch, max_urls=max_urls, max_bytes=max_bytes)
+    entries = asyncio.run(discovery.discover(robots_sitemaps))
+    return entries, fetched
+
+
+def test_index_with_gzipped_children():
+    index = (f'<sitemapindex xmlns="{NAMESPACE}"><sitemap><loc>{BASE}/a.xml.gz</loc></sitemap>'
+             f'<sitemap><loc>{BASE}/b.xml</loc></sitemap></sitemapindex>').encode()
+    entries, fetched = discover({
+        f'{BASE}/sitemap.xml': index,
+        f'{BASE}/a.xml.gz': gzip.compress(urlset(['/p1', '/p2'])),
+        f'{BASE}/b.xml': urlset(['/p2', '/p3']) + urlset(['/elsewhere'], 'https://other.example.com'),
+    })
+    assert [entry['url'] for entry in entries] == [f'{BASE}/p1', f'{BASE}/p2', f'{BASE}/p3']
+    assert entries[0]['priority'] == 0.8
+    assert fetched == [f'{BASE}/sitemap.xml', f'{BASE}/a.xml.gz', f'{BASE}/b.xml']
+
+
+def test_stops_at_max_urls():
+    entries, fetched = discover({
+        f'{BASE}/one.xml': urlset([f'/p{i}' for i in range(10_000)]),
+        f'{BASE}/two.xml': urlset(['/never']),
+    }, max_urls=5, robots_sitemaps=[f'{BASE}/one.xml', f'{BASE}/two.xml'])
+    assert [entry['url'] for entry in entries] == [f'{BASE}/p{i}' for i in range(5)]
+    assert fetched == [f'{BASE}/one.xml']
+
+
+def test_truncated_and_malformed_sitemaps():
+    document = urlset([f'/p{i}' for i in range(100)])
+    entries, _ = discover({
+        f'{BASE}/cut.xml.gz': gzip.compress(document),
+        f'{BASE}/broken.xml': b'<html><body>Not a sitemap',
+    }, max_bytes=len(document) // 2, robots_sitemaps=[f'{BASE}/cut.xml.gz', f'{BASE}/broken.xml'])
+    # The entries before the cut are still read
+    assert 0 < len(entries) < 100